@@ -20,10 +20,8 @@ with a doc2vec model trained on ECSS requirements. The vectors of each requireme
 similarity. The closer the requirements sets, the closer the cosine similarity is to 1.
 
 Pre-requisite:
-- For preprocessing, use the NLP_pipeline.py and DEA_methods respectively found on
-git smart-nlp/SpaceLexiconGenerator/NLPPipeline/ and smart-nlp/tree/master/SpaceLexiconGenerator
-and update import link from line 45. Load the files from smart-nlp/SpaceLexiconGenerator/NLPPipeline/NLPInputs/
-Also update relevant filepaths in NLP_Pipeline.py, DEA_methods.py
+- For preprocessing, the 'requirements' profile of smart-nlp/SpaceLexiconGenerator/NLPPipeline/preprocessingCore.py,
+with the input files of smart-nlp/SpaceLexiconGenerator/NLPPipeline/NLPInputs/ (imported from the repository)
 - Grakn 1.8.0 installed (https://grakn.ai/),
 - Grakn Workbase 1.3.0 (https://grakn.ai/),
 - Grakn server running,
@@ -41,14 +39,15 @@ import collections
 import time
 import statistics
 import json
-sys.path.append("..")
 
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the three toolboxes
+sys.path.append(parentDir + '/SpaceLexiconGenerator')
 
 from grakn.client import GraknClient
-from NLP_Pipeline import *
+from NLPPipeline.preprocessingCore import loadPreprocessor
 from gensim.models.doc2vec import Doc2Vec, TaggedDocument
 from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
 from sklearn.model_selection import train_test_split
 from tqdm import tqdm
 import pickle
@@ -66,41 +65,21 @@ doEvaluationNewModel = 0 # To save time, set to O and evaluate your new model wi
 # -------------------------------------------------------------
 # Methods
 # -------------------------------------------------------------
-def preprocessData(sen, ecssMultiwords, stopset):
-        listReplacementMW=[]
-        # Tokenize
-        tokens = word_tokenize(sen)
-        # Trim - remove empty space start/end word
-        tokens = [word.strip() for word in tokens]
-        # Remove tokens with special characters: /,%
-        tokens = [x for x in tokens if not re.findall('/%', x)]
-        # Remove Empty tokens
-        tokens = [x for x in tokens if x]
-        # Replace - by _ to homogenize multi words
-        tokens = [token.replace('-', '_') for token in tokens]
-        # Normalise Text
-        tokens = [w.lower() for w in tokens]
-        # Replace multi words
-        tokens, listReplacementMW = replaceMultiwords(tokens, listReplacementMW, ecssMultiwords)
-        # Remove stopwords + punctuation
-        tokens = [w for w in tokens if w not in stopset]
-
-        #if listReplacementMW:
-        #        print("MultiWords found:", listReplacementMW)
-
-        return tokens
+def preprocessData(sen, preprocessor):
+        '''
+        Requirements pre-processing: tokenize, trim, remove tokens with '/%', replace - by _, lower case, replace ECSS
+        multi words, remove stopwords + punctuation
+        Input: requirements text, Preprocessor of the 'requirements' profile
+        Output: list of tokens
+        '''
+        return preprocessor.process(sen)
 
 
 # -------------------------------------------------------------
 # Main
 # -------------------------------------------------------------
-# Load data for Preprocessing
-stopset = stopwords.words('english')
-with open("NLPInputs/non_character_words.txt", encoding="utf-8") as Punctuation:
-        filterPunctuation = word_tokenize(Punctuation.read())
-for i in filterPunctuation:
-        stopset.append(i)
-acronyms, exp, ecssMultiwords, ecssMultiwordsWithAcronyms = loadAcronymsMW()
+# Load data for Preprocessing: English stopwords, punctuation and ECSS multi words of the Space Lexicon Generator
+preprocessor = loadPreprocessor('requirements')
 
 # Retrieve all requirements per iteration from Grakn KG through Python Client
 importedData=[]
@@ -187,7 +166,7 @@ if trainNewModel:
     print('Testing set size:', len(testing_set))
 
     print("Start of Model training...")
-    corpus_training=[TaggedDocument(words=preprocessData(_d, ecssMultiwords, stopset), tags=[i]) for i, _d in enumerate(training_set)]
+    corpus_training=[TaggedDocument(words=preprocessData(_d, preprocessor), tags=[i]) for i, _d in enumerate(training_set)]
     model = gensim.models.doc2vec.Doc2Vec(vector_size=300, min_count=1, epochs=400, window=15, dm=0, negative= 5, sample= 1e-5)
     model.build_vocab(corpus_training)
     model.train(corpus_training, total_examples=model.corpus_count, epochs=model.epochs)
@@ -237,11 +216,11 @@ print("\nPart III: Embed Spacecrafts' Requirements Set with Doc2Vec and compare
 print('-------------------------------- \n')
 for item in importedData:
     req = ''.join(item["Requirements"])
-    req1= preprocessData(req, ecssMultiwords, stopset)
+    req1= preprocessData(req, preprocessor)
 
     for itemTocompare in importedData:
         reqToCompare = ''.join(itemTocompare["Requirements"])
-        req2 = preprocessData(reqToCompare, ecssMultiwords, stopset)
+        req2 = preprocessData(reqToCompare, preprocessor)
         sim = model.docvecs.similarity_unseen_docs(model, req1, req2, alpha=None, min_alpha=None, steps=None)
         # Results
         print('Similarity between', item["Spacecraft"], item["Iteration Number"], ' and ', itemTocompare["Spacecraft"], itemTocompare["Iteration Number"], ': ', sim)
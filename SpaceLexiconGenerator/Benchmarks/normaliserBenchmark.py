@@ -0,0 +1,114 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+normaliserBenchmark.py is a micro-benchmark of the NLP pipeline token normalisation (all steps following the
+tokenization of a sentence), measured in tokens/sec:
+- before: step by step list comprehensions, string regex patterns, new WordNet lemmatizer per sentence
+- after: preprocessing core 'lexicon' profile, precompiled patterns and fused memoised token steps
+Both outputs are checked to be identical. Tokenization is done beforehand and is not measured.
+
+Run from the SpaceLexiconGenerator directory:
+python Benchmarks/normaliserBenchmark.py [corpus path, default /Corpora/Wiki/] [number of documents, default all]
+'''
+
+import json
+import os
+import re
+import sys
+import time
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+sys.path.append(parentDir)
+
+from os import listdir
+from os.path import isfile, join
+from nltk.tokenize import word_tokenize
+from nltk.stem import WordNetLemmatizer
+from NLPPipeline.NLP_Pipeline import splitSentences, acronymExpansion, replaceMultiwords
+from NLPPipeline.pipelineResources import loadPipelineResources
+from NLPPipeline.preprocessingCore import Preprocessor
+
+
+def legacyNormalise(tokens, resources, listReplacementMW, listReplacementAcc):
+    '''
+    NLP pipeline steps following tokenization, one list comprehension per step (reference implementation)
+    Input: tokens of one sentence, PipelineResources, lists of replacements done so far
+    Output: normalised tokens
+    '''
+    stopset = resources.stopset
+    tokens = [word.strip() for word in tokens]
+    tokens = [x for x in tokens if re.findall('[a-zA-Z]', x)]
+    tokens = [x for x in tokens if not re.findall('[0-9]', x)]
+    tokens = [re.sub(r'www.*[\r\n]*', '', token) for token in tokens]
+    tokens = [re.sub('[^A-Za-z0-9_\-/]+', '', token) for token in tokens]
+    tokens = [x for x in tokens if x]
+    tokens, listReplacementAcc = acronymExpansion(tokens, listReplacementAcc, resources.acronymExpander)
+    tokens = [w.lower() for w in tokens]
+    tokens, listReplacementMW = replaceMultiwords(tokens, listReplacementMW, resources.multiwordMatcher)
+    tokens = [w for w in tokens if w not in stopset]
+    wnl = WordNetLemmatizer()
+    tokens = [wnl.lemmatize(word) for word in tokens]
+    tokens = [w for w in tokens if w not in stopset]
+    tokens = [x for x in tokens if len(x) > 2]
+    return tokens
+
+
+def run(normalise, tokenizedSentences):
+    '''
+    Normalise all sentences
+    Input: normalisation function, list of tokenized sentences
+    Output: normalised sentences, multi words and acronyms replaced, elapsed time in seconds
+    '''
+    listReplacementMW = []
+    listReplacementAcc = []
+    start = time.perf_counter()
+    outputs = [normalise(tokens, listReplacementMW, listReplacementAcc) for tokens in tokenizedSentences]
+    return outputs, listReplacementMW, listReplacementAcc, time.perf_counter() - start
+
+
+def normaliserBenchmark(path='/Corpora/Wiki/', maxDocuments=None):
+    '''
+    Compare the step by step and single-pass normalisations on a corpus
+    Input: corpus path (relative to SpaceLexiconGenerator), maximum number of documents
+    Output: dictionary of tokens/sec before and after
+    '''
+    resources = loadPipelineResources()
+
+    documents = sorted([f for f in listdir(parentDir + path) if isfile(join(parentDir + path, f))])
+    documents = documents[:maxDocuments]
+    tokenizedSentences = []
+    for d in documents:
+        with open(parentDir + path + d, 'r') as infile:
+            content = json.load(infile)["content"]
+        tokenizedSentences.extend([word_tokenize(sen) for sen in splitSentences(content)])
+    numberOfTokens = sum(len(tokens) for tokens in tokenizedSentences)
+    print(len(documents), 'documents,', len(tokenizedSentences), 'sentences,', numberOfTokens, 'tokens')
+
+    before = run(lambda tokens, mw, acc: legacyNormalise(tokens, resources, mw, acc), tokenizedSentences)
+    # cold: empty caches, warm: caches filled by the cold run
+    normaliser = Preprocessor('lexicon', resources)
+    cold = run(normaliser.normalise, tokenizedSentences)
+    warm = run(normaliser.normalise, tokenizedSentences)
+
+    if before[:3] != cold[:3] or before[:3] != warm[:3]:
+        raise AssertionError('Single-pass normalisation differs from the step by step normalisation')
+
+    results = {'tokens': numberOfTokens,
+               'before': round(numberOfTokens / before[3]),
+               'afterCold': round(numberOfTokens / cold[3]),
+               'afterWarm': round(numberOfTokens / warm[3])}
+    print('Tokens/sec before:', results['before'])
+    print('Tokens/sec after (empty caches):', results['afterCold'], '- x', round(before[3] / cold[3], 1))
+    print('Tokens/sec after (warm caches):', results['afterWarm'], '- x', round(before[3] / warm[3], 1))
+    return results
+
+
+if __name__ == '__main__':
+    normaliserBenchmark(sys.argv[1] if len(sys.argv) > 1 else '/Corpora/Wiki/',
+                        int(sys.argv[2]) if len(sys.argv) > 2 else None)
@@ -0,0 +1,466 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+stageBenchmark.py is an end-to-end benchmark of the Space Lexicon Generator stages:
+- nlp: applyNLPPipeline on parsed documents (Corpora)
+- entities: ontologyEntityDefinition on pre-processed documents (preprocessedCorpora)
+- word2vec: wordtovec, training of a new model on pre-processed documents (candidate entities: most frequent tokens)
+
+Each stage is run on fixed subsets of the shipped Books and Wiki corpora:
+- '10', '50', '100': 10%, 50% and 100% of the documents of each corpus, evenly spaced in documents names order
+- 'x2', 'x4', ...: synthetic up-scaled corpora, all documents copied 2, 4, ... times
+
+Runs are done in a temporary copy of the Space Lexicon Generator (code + corpus subset), so that the Outputs directory
+is left untouched, and each run is a new process, so that its peak memory is measured alone. The NLP pipeline
+resources cache is cleared before each nlp run.
+Per run are recorded: wall time, documents/sec, tokens/sec (pre-processed tokens: output tokens for nlp, input tokens
+for entities and word2vec) and peak RSS. Results are saved as .json and can be compared to a previous results file
+(baseline): a run slower or using more memory than the baseline, beyond a tolerance, is flagged as a regression.
+
+Startup time is tracked as well: main.py and the module of each stage are imported in a new process with
+python -X importtime, and their import time (median of the runs), the heavy modules they load (HEAVY_MODULES) and their
+slowest imported packages are recorded. Importing main.py must stay within the startup budget: below STARTUP_BUDGET
+seconds and without any heavy module, these are only imported by the stage which needs them.
+
+Run from the SpaceLexiconGenerator directory, e.g.:
+python Benchmarks/stageBenchmark.py
+python Benchmarks/stageBenchmark.py --stages nlp --subsets 10 50 --baseline Benchmarks/results/baseline.json
+python Benchmarks/stageBenchmark.py --imports-only --repeat 5
+'''
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from os import listdir
+from os.path import isfile, join
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+
+STAGES = ['nlp', 'entities', 'word2vec']
+SUBSETS = ['10', '50', '100', 'x2']
+CORPORA = ['Books', 'Wiki']
+RESULTS_DIRECTORY = fileDir + '/results/'
+
+# Module imported by each entry point, for the import time measurements
+ENTRY_POINTS = {'main': 'main', 'nlp': 'NLPPipeline.NLP_Pipeline',
+                'entities': 'OntologyEntitiesFinder.ontologyEntityDefinition', 'word2vec': 'SynonymLayer.wordtovec'}
+HEAVY_MODULES = ['gensim', 'matplotlib', 'nltk', 'pandas', 'scipy', 'sklearn', 'spacy']
+STARTUP_BUDGET = 0.5  # seconds, import of main.py
+IMPORT_SLACK = 0.05  # seconds, import time increases below this value are not regressions (measurement noise)
+
+# Directories of the Space Lexicon Generator not copied in the benchmark workspace
+NOT_COPIED = {'Corpora', 'preprocessedCorpora', 'Outputs', 'OutputsExample', 'Benchmarks', 'Savedword2vecmodels',
+              'cache', '__pycache__'}
+OUTPUT_DIRECTORIES = ['/Outputs/NLPOutputs', '/Outputs/Figures', '/Outputs/entityFinderOutputs',
+                      '/Outputs/synonymLayerOutputs', '/SynonymLayer/Savedword2vecmodels']
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                 Workspace
+# ----------------------------------------------------------------------------------------------------------------------
+
+def selectDocuments(directory, subset):
+    '''
+    Fixed selection of the documents of a corpus
+    Input: corpus directory, subset ('10', '50', '100': percentage of documents, 'x2', 'x4'...: up-scaling factor)
+    Output: list of (document name, name of the copy in the subset)
+    '''
+    documents = sorted([f for f in listdir(directory) if isfile(join(directory, f))])
+
+    if subset.startswith('x'):
+        return [(d, 'copy' + str(k) + '_' + d if k else d) for k in range(int(subset[1:])) for d in documents]
+
+    # evenly spaced documents, from the first one
+    fraction = float(subset) / 100
+    n = max(1, int(round(fraction * len(documents))))
+    return [(documents[int(i * len(documents) / n)],) * 2 for i in range(n)]
+
+
+def createWorkspace(subset, corpora):
+    '''
+    Copy the Space Lexicon Generator code and a corpus subset into a temporary directory
+    Input: subset, list of corpora names
+    Output: workspace directory, subset name used in the workspace, number of parsed and pre-processed documents
+    '''
+    workspace = tempfile.mkdtemp(prefix='slgBenchmark_')
+    os.rmdir(workspace)
+    shutil.copytree(parentDir, workspace, ignore=lambda directory, names: [n for n in names if n in NOT_COPIED])
+    for directory in OUTPUT_DIRECTORIES:
+        os.makedirs(workspace + directory)
+    # preprocessedCorpora modules
+    os.makedirs(workspace + '/preprocessedCorpora')
+    for f in listdir(parentDir + '/preprocessedCorpora'):
+        if f.endswith('.py'):
+            shutil.copy(join(parentDir, 'preprocessedCorpora', f), workspace + '/preprocessedCorpora')
+
+    subsetName = 'Subset' + subset
+    counts = []
+    for corpusDirectory in ['/Corpora/', '/preprocessedCorpora/']:
+        target = workspace + corpusDirectory + subsetName + '/'
+        os.makedirs(target)
+        n = 0
+        for corpus in corpora:
+            source = parentDir + corpusDirectory + corpus + '/'
+            for d, copy in selectDocuments(source, subset):
+                shutil.copy(source + d, target + corpus + '_' + copy)
+                n = n + 1
+        counts.append(n)
+    return workspace, subsetName, counts[0], counts[1]
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                 Stage run (child process)
+# ----------------------------------------------------------------------------------------------------------------------
+
+def peakRSS():
+    '''
+    Output: peak resident memory in MB of the current process and of its terminated children (e.g., NLP pipeline
+    workers), None if not available on this platform
+    '''
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # bytes on macOS, kilobytes on Linux
+    if sys.platform == 'darwin':
+        return round(peak / 2 ** 20, 1)
+    return round(peak / 2 ** 10, 1)
+
+
+def runStage(workspace, stage, subsetName, workers):
+    '''
+    Run one stage in the workspace, in the current process
+    Input: workspace directory, stage, subset name, number of workers (NLP pipeline processes, processes reading the
+    pre-processed documents of the entities stage)
+    Output: dictionary of the run measurements
+    '''
+    os.chdir(workspace)
+    sys.path.insert(0, workspace)
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    from preprocessedCorpora.tokenStore import corpusCounts
+
+    corpusPath = '/Corpora/' + subsetName + '/'
+    preprocessedPath = '/preprocessedCorpora/' + subsetName + '/'
+
+    if stage == 'nlp':
+        from NLPPipeline.NLP_Pipeline import applyNLPPipeline
+        documents = len(listdir(workspace + corpusPath))
+        start = time.perf_counter()
+        applyNLPPipeline([corpusPath], workers=workers)
+        wallTime = time.perf_counter() - start
+        tokens = corpusCounts('/Outputs/NLPOutputs/')[3]
+
+    elif stage == 'entities':
+        from OntologyEntitiesFinder.ontologyEntityDefinition import ontologyEntityDefinition
+        tokenCounts, df, documents, tokens = corpusCounts(preprocessedPath)
+        start = time.perf_counter()
+        ontologyEntityDefinition([preprocessedPath], ['/Outputs/entityFinderOutputs/benchmark.json'], workers=workers)
+        wallTime = time.perf_counter() - start
+
+    elif stage == 'word2vec':
+        from SynonymLayer.wordtovec import wordtovec
+        tokenCounts, df, documents, tokens = corpusCounts(preprocessedPath)
+        candidatesFile = '/Outputs/entityFinderOutputs/benchmarkCandidates.json'
+        with open(workspace + candidatesFile, 'w') as outfile:
+            json.dump({'candidateFreq': [token for token, count in tokenCounts.most_common(200)]}, outfile)
+        start = time.perf_counter()
+        wordtovec(candidatesFile, preprocessedPath, 0.9, 1)
+        wallTime = time.perf_counter() - start
+
+    else:
+        raise ValueError('Unknown stage ' + stage)
+
+    return {'documents': documents, 'tokens': tokens, 'wallTime': round(wallTime, 3),
+            'docsPerSec': round(documents / wallTime, 2), 'tokensPerSec': round(tokens / wallTime),
+            'peakRSSMB': peakRSS()}
+
+
+def runChild(workspace, stage, subsetName, workers, resultFile):
+    '''
+    Child process entry point: run one stage and save its measurements, or the error raised, in resultFile
+    '''
+    try:
+        result = runStage(workspace, stage, subsetName, workers)
+        result['status'] = 'ok'
+    except Exception as e:
+        # error message on one line, NLTK data lookup errors span many lines
+        result = {'status': 'error', 'error': (type(e).__name__ + ': ' + ' '.join(str(e).split()))[:300]}
+    with open(resultFile, 'w') as outfile:
+        json.dump(result, outfile)
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                 Import time
+# ----------------------------------------------------------------------------------------------------------------------
+
+def importTime(module):
+    '''
+    Import a module in a new process, with python -X importtime, from the SpaceLexiconGenerator directory
+    Input: module name
+    Output: dictionary of the import measurements: import time of the module (s), heavy modules loaded, cumulative
+    import time per top level package (s)
+    '''
+    environment = dict(os.environ, MPLBACKEND='Agg')
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import ' + module], cwd=parentDir,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, universal_newlines=True,
+                             env=environment)
+    lines = process.stderr.strip().split('\n')
+    if process.returncode != 0:
+        return {'status': 'error', 'error': lines[-1][:300]}
+
+    # lines 'import time: self [us] | cumulative [us] | package', nested imports are indented and listed before the
+    # package importing them, interpreter startup imports (site...) are not counted
+    root = module.split('.')[0]
+    moduleTime = 0
+    packages = {}
+    nested = []
+    for line in lines:
+        fields = line[len('import time:'):].split('|')
+        if not line.startswith('import time:') or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2][1:]
+        if name.startswith(' '):
+            nested.append((name.strip().split('.')[0], int(fields[1])))
+            continue
+        if name.split('.')[0] == root:
+            moduleTime = moduleTime + int(fields[1])
+            for package, cumulative in nested:
+                packages[package] = max(packages.get(package, 0), cumulative)
+        nested = []
+
+    packages.pop(root, None)
+    return {'status': 'ok', 'importTime': round(moduleTime / 10 ** 6, 3),
+            'heavyModules': sorted(package for package in packages if package in HEAVY_MODULES),
+            'packages': {package: round(t / 10 ** 6, 3) for package, t in packages.items()}}
+
+
+def importBenchmark(entryPoints, repeat=1, top=5):
+    '''
+    Import time of the Space Lexicon Generator entry points
+    Input: list of entry points (keys of ENTRY_POINTS), number of measurements per entry point (median is kept),
+    number of slowest packages recorded
+    Output: list of results, one per entry point
+    '''
+    results = []
+    for entryPoint in entryPoints:
+        # first import compiles the .pyc files, not measured
+        importTime(ENTRY_POINTS[entryPoint])
+        runs = [importTime(ENTRY_POINTS[entryPoint]) for i in range(repeat)]
+        failed = [run for run in runs if run['status'] != 'ok']
+        if failed:
+            result = failed[0]
+        else:
+            result = sorted(runs, key=lambda run: run['importTime'])[(len(runs) - 1) // 2]
+            slowest = sorted(result.pop('packages').items(), key=lambda item: item[1], reverse=True)[:top]
+            result['slowestPackages'] = [[package, t] for package, t in slowest]
+        result.update({'entryPoint': entryPoint, 'module': ENTRY_POINTS[entryPoint], 'runs': repeat})
+        printImport(result)
+        results.append(result)
+    return results
+
+
+def printImport(result):
+    '''
+    Print the import measurements of one entry point
+    '''
+    if result['status'] != 'ok':
+        print('   import', result['module'], ': failed,', result['error'])
+        return
+    print('   import', result['module'], ':', result['importTime'], 's, heavy modules', result['heavyModules'],
+          ', slowest packages', result['slowestPackages'])
+
+
+def checkStartupBudget(imports, budget=STARTUP_BUDGET):
+    '''
+    Check that main.py is imported within the startup budget: below budget seconds and without heavy modules
+    Input: import results, budget in seconds
+    Output: list of budget violations, [entry point, measurement, budget, value]
+    '''
+    violations = []
+    for result in imports:
+        if result['entryPoint'] != 'main' or result['status'] != 'ok':
+            continue
+        if result['importTime'] > budget:
+            violations.append(['main', 'importTime', budget, result['importTime']])
+        if result['heavyModules']:
+            violations.append(['main', 'heavyModules', [], result['heavyModules']])
+
+    print('\nStartup budget (' + str(budget), 's, no heavy modules):', len(violations), 'violation(s)')
+    for violation in violations:
+        print('  ', violation[0], violation[1], ': budget', violation[2], '->', violation[3], '<-- OVER BUDGET')
+    return violations
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                 Benchmark main
+# ----------------------------------------------------------------------------------------------------------------------
+
+def runIsolated(workspace, stage, subsetName, workers, verbose):
+    '''
+    Run one stage in a new process
+    Output: dictionary of the run measurements
+    '''
+    if stage == 'nlp':
+        shutil.rmtree(workspace + '/NLPPipeline/cache', ignore_errors=True)
+    resultFile = join(workspace, 'benchmarkResult.json')
+    command = [sys.executable, os.path.abspath(__file__), '--child', workspace, stage, subsetName, str(workers),
+               resultFile]
+    output = None if verbose else subprocess.DEVNULL
+    subprocess.run(command, stdout=output, stderr=output)
+    if not isfile(resultFile):
+        return {'status': 'error', 'error': 'benchmark process did not complete'}
+    with open(resultFile, 'r') as infile:
+        result = json.load(infile)
+    os.remove(resultFile)
+    return result
+
+
+def stageBenchmark(stages=STAGES, subsets=SUBSETS, corpora=CORPORA, repeat=1, workers=1, verbose=False):
+    '''
+    Benchmark the Space Lexicon Generator stages on corpus subsets
+    Input: list of stages, list of subsets, list of corpora, number of runs per stage and subset (median wall time is
+    kept), number of NLP pipeline and entities stage workers, verbose: show stages outputs
+    Output: benchmark results (environment + one entry per stage and subset)
+    '''
+    results = []
+    for subset in subsets:
+        workspace, subsetName, nParsed, nPreprocessed = createWorkspace(subset, corpora)
+        print('Subset', subset, ':', nParsed, 'parsed documents,', nPreprocessed, 'pre-processed documents')
+        try:
+            for stage in stages:
+                runs = [runIsolated(workspace, stage, subsetName, workers, verbose) for i in range(repeat)]
+                failed = [run for run in runs if run['status'] != 'ok']
+                if failed:
+                    result = failed[0]
+                else:
+                    # median run (by wall time), peak memory over all runs
+                    result = sorted(runs, key=lambda run: run['wallTime'])[(len(runs) - 1) // 2]
+                    peaks = [run['peakRSSMB'] for run in runs if run['peakRSSMB'] is not None]
+                    result['peakRSSMB'] = max(peaks) if peaks else None
+                result.update({'stage': stage, 'subset': subset, 'runs': repeat})
+                printResult(result)
+                results.append(result)
+        finally:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    return {'environment': benchmarkEnvironment(corpora, workers), 'results': results}
+
+
+def benchmarkEnvironment(corpora, workers):
+    '''
+    Output: description of the benchmark environment
+    '''
+    return {'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': platform.python_version(),
+            'platform': platform.platform(), 'cpus': os.cpu_count(), 'corpora': corpora, 'workers': workers}
+
+
+def printResult(result):
+    '''
+    Print the measurements of one run
+    '''
+    if result['status'] != 'ok':
+        print('  ', result['stage'], '-', result['subset'], ': failed,', result['error'])
+        return
+    print('  ', result['stage'], '-', result['subset'], ':', result['wallTime'], 's,', result['docsPerSec'],
+          'docs/s,', result['tokensPerSec'], 'tokens/s, peak RSS', result['peakRSSMB'], 'MB')
+
+
+def compareToBaseline(results, baseline, tolerance=0.1):
+    '''
+    Compare benchmark results to a baseline, runs of the same stage and subset, and imports of the same entry point, are
+    compared
+    Input: benchmark results, baseline results, tolerance: relative increase of wall time, peak RSS or import time
+    accepted
+    Output: list of regressions, [stage, subset, measurement, baseline value, new value] ('import' stage and entry point
+    as subset for the imports)
+    '''
+    reference = {(run['stage'], run['subset']): run for run in baseline['results'] if run['status'] == 'ok'}
+    regressions = []
+
+    print('\nComparison to baseline of', baseline['environment']['date'], '(tolerance', tolerance, ')')
+    for run in results['results']:
+        previous = reference.get((run['stage'], run['subset']))
+        if run['status'] != 'ok' or previous is None:
+            continue
+        for measurement in ['wallTime', 'peakRSSMB']:
+            if run[measurement] is None or previous[measurement] is None:
+                continue
+            ratio = run[measurement] / previous[measurement]
+            flag = ''
+            if ratio > 1 + tolerance:
+                flag = '<-- REGRESSION'
+                regressions.append([run['stage'], run['subset'], measurement, previous[measurement], run[measurement]])
+            print('  ', run['stage'], '-', run['subset'], measurement, ':', previous[measurement], '->',
+                  run[measurement], '(x' + str(round(ratio, 2)) + ')', flag)
+
+    referenceImports = {run['entryPoint']: run for run in baseline.get('imports', []) if run['status'] == 'ok'}
+    for run in results.get('imports', []):
+        previous = referenceImports.get(run['entryPoint'])
+        if run['status'] != 'ok' or previous is None:
+            continue
+        flag = ''
+        if (run['importTime'] > (1 + tolerance) * previous['importTime']
+                and run['importTime'] - previous['importTime'] > IMPORT_SLACK):
+            flag = '<-- REGRESSION'
+            regressions.append(['import', run['entryPoint'], 'importTime', previous['importTime'], run['importTime']])
+        print('   import', run['module'], 'importTime :', previous['importTime'], '->', run['importTime'], flag)
+
+    print(len(regressions), 'regression(s)')
+    return regressions
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        runChild(sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5]), sys.argv[6])
+        sys.exit(0)
+
+    parser = argparse.ArgumentParser(description='End-to-end benchmark of the Space Lexicon Generator stages')
+    parser.add_argument('--stages', nargs='+', default=STAGES, choices=STAGES)
+    parser.add_argument('--subsets', nargs='+', default=SUBSETS,
+                        help="percentages of documents (e.g., 10 50 100) or up-scaling factors (e.g., x2 x4)")
+    parser.add_argument('--corpora', nargs='+', default=CORPORA)
+    parser.add_argument('--repeat', type=int, default=1, help='runs per stage and subset, median wall time is kept')
+    parser.add_argument('--workers', type=int, default=1, help='NLP pipeline and entities stage workers')
+    parser.add_argument('--output', help='results file, default: Benchmarks/results/stageBenchmark_<date>.json')
+    parser.add_argument('--baseline', help='results file to compare to, regressions give exit code 1')
+    parser.add_argument('--tolerance', type=float, default=0.1)
+    parser.add_argument('--verbose', action='store_true', help='show stages outputs')
+    parser.add_argument('--imports-only', action='store_true', help='only measure the import time of the entry points')
+    parser.add_argument('--startup-budget', type=float, default=STARTUP_BUDGET,
+                        help='maximum import time of main.py in seconds, violations give exit code 1')
+    args = parser.parse_args()
+
+    if args.imports_only:
+        results = {'environment': benchmarkEnvironment(args.corpora, args.workers), 'results': []}
+    else:
+        results = stageBenchmark(args.stages, args.subsets, args.corpora, args.repeat, args.workers, args.verbose)
+    print('Import time')
+    results['imports'] = importBenchmark(['main'] + args.stages, args.repeat)
+    violations = checkStartupBudget(results['imports'], args.startup_budget)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+        output = RESULTS_DIRECTORY + 'stageBenchmark_' + time.strftime('%Y%m%d_%H%M%S') + '.json'
+    with open(output, 'w') as outfile:
+        json.dump(results, outfile, indent=1)
+    print('Results saved in', output)
+
+    if args.baseline:
+        with open(args.baseline, 'r') as infile:
+            baseline = json.load(infile)
+        if compareToBaseline(results, baseline, args.tolerance):
+            sys.exit(1)
+    if violations:
+        sys.exit(1)
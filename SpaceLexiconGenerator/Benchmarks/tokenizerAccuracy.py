@@ -0,0 +1,184 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+tokenizerAccuracy.py compares a tokenizer backend of the preprocessing core, 'regex' (NLPPipeline/regexTokenizer.py,
+default) or 'spacy' (NLPPipeline/spacyBackend.py, batched), to nltk.word_tokenize on the shipped corpora, to trade
+exactness for throughput knowingly. Per corpus are reported:
+- throughput of each tokenizer (tokens/sec) and speed-up
+- tokens: share of sentences tokenized identically, precision/recall of the candidate tokens (aligned with the
+  word_tokenize tokens of the same sentence)
+- pipeline: same measures on the NLP pipeline outputs ('lexicon' profile, i.e., after filters, acronyms, multiwords,
+  stop words and lemmatization), the differences which actually reach the lexicon
+- most frequent differences, word_tokenize tokens -> candidate tokens
+
+Sentences are split as in the NLP pipeline (one sentence per line, split on . ? !), unless --documents is given, in
+which case whole documents are tokenized, as in the Topic Modeling NLPPipe.
+
+Run from the SpaceLexiconGenerator directory, e.g.:
+python Benchmarks/tokenizerAccuracy.py
+python Benchmarks/tokenizerAccuracy.py --corpora /Corpora/Wiki/ --max-documents 20 --documents
+python Benchmarks/tokenizerAccuracy.py --candidate spacy
+'''
+
+import argparse
+import json
+import os
+import sys
+import time
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+sys.path.append(parentDir)
+
+from collections import Counter
+from difflib import SequenceMatcher
+from os import listdir
+from os.path import isfile, join
+from NLPPipeline.NLP_Pipeline import splitSentences
+from NLPPipeline.pipelineResources import loadPipelineResources
+from NLPPipeline.preprocessingCore import Preprocessor
+
+CORPORA = ['/Corpora/Books/', '/Corpora/Wiki/']
+RESULTS_DIRECTORY = fileDir + '/results/'
+
+
+def readUnits(path, maxDocuments=None, documents=False):
+    '''
+    Input: corpus path (relative to SpaceLexiconGenerator), maximum number of documents, documents: if True whole
+    documents are returned instead of sentences
+    Output: list of texts to tokenize, number of documents read
+    '''
+    names = sorted([f for f in listdir(parentDir + path) if isfile(join(parentDir + path, f))])[:maxDocuments]
+    units = []
+    for d in names:
+        with open(parentDir + path + d, 'r') as infile:
+            content = json.load(infile)["content"]
+        if documents:
+            units.append(content)
+        else:
+            units.extend(splitSentences(content))
+    return units, len(names)
+
+
+def timeTokenizer(preprocessor, units):
+    '''
+    Input: Preprocessor, texts
+    Output: list of tokens per text, list of lemmas given by the spaCy pipeline per text (None otherwise), elapsed
+    time in seconds
+    '''
+    start = time.perf_counter()
+    if preprocessor.spacyBackend is not None:
+        analysed = list(preprocessor.spacyBackend.pipe(units))
+    else:
+        analysed = [(preprocessor.tokenize(unit), None) for unit in units]
+    elapsed = time.perf_counter() - start
+    return [tokens for tokens, lemmas in analysed], [lemmas for tokens, lemmas in analysed], elapsed
+
+
+def agreement(reference, candidate, differences=None):
+    '''
+    Compare two tokenizations of the same texts, tokens are aligned text by text
+    Input: reference and candidate lists of tokens per text, Counter of differences to update (optional)
+    Output: dictionary of identical texts share, precision and recall of the candidate tokens
+    '''
+    identical = 0
+    matched = 0
+    for ref, cand in zip(reference, candidate):
+        if ref == cand:
+            identical = identical + 1
+            matched = matched + len(ref)
+            continue
+        matcher = SequenceMatcher(None, ref, cand, autojunk=False)
+        matched = matched + sum(block.size for block in matcher.get_matching_blocks())
+        if differences is not None:
+            for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+                if tag != 'equal':
+                    differences[' '.join(ref[i1:i2]) + ' -> ' + ' '.join(cand[j1:j2])] += 1
+
+    numberOfReference = sum(len(tokens) for tokens in reference)
+    numberOfCandidate = sum(len(tokens) for tokens in candidate)
+    return {'identical': round(identical / len(reference), 4) if reference else 1.0,
+            'precision': round(matched / numberOfCandidate, 4) if numberOfCandidate else 1.0,
+            'recall': round(matched / numberOfReference, 4) if numberOfReference else 1.0}
+
+
+def tokenizerAccuracy(path, maxDocuments=None, documents=False, candidate='regex', topDifferences=20):
+    '''
+    Compare a tokenizer backend to word_tokenize on a corpus
+    Input: corpus path, maximum number of documents, documents: tokenize whole documents instead of sentences,
+    candidate tokenizer backend ('regex' or 'spacy'), number of most frequent differences reported
+    Output: dictionary of results
+    '''
+    units, numberOfDocuments = readUnits(path, maxDocuments, documents)
+    if documents:
+        units = [unit.lower() for unit in units]
+
+    resources = loadPipelineResources()
+    nltkPipeline = Preprocessor('lexicon', resources, tokenizer='nltk')
+    candidatePipeline = Preprocessor('lexicon', resources, tokenizer=candidate)
+
+    nltkTokens, nltkLemmas, nltkTime = timeTokenizer(nltkPipeline, units)
+    candidateTokens, candidateLemmas, candidateTime = timeTokenizer(candidatePipeline, units)
+    numberOfTokens = sum(len(tokens) for tokens in nltkTokens)
+
+    differences = Counter()
+    tokens = agreement(nltkTokens, candidateTokens, differences)
+
+    # Differences left after the NLP pipeline steps
+    pipeline = agreement([nltkPipeline.normalise(t) for t in nltkTokens],
+                         [candidatePipeline.normalise(t, lemmas=lemmas)
+                          for t, lemmas in zip(candidateTokens, candidateLemmas)])
+
+    result = {'corpus': path,
+              'unit': 'document' if documents else 'sentence',
+              'candidate': candidate,
+              'documents': numberOfDocuments,
+              'units': len(units),
+              'tokens': numberOfTokens,
+              'nltkTokensPerSec': round(numberOfTokens / nltkTime) if nltkTime else None,
+              'candidateTokensPerSec': round(numberOfTokens / candidateTime) if candidateTime else None,
+              'speedUp': round(nltkTime / candidateTime, 1) if candidateTime else None,
+              'tokenAgreement': tokens,
+              'pipelineAgreement': pipeline,
+              'differences': differences.most_common(topDifferences)}
+    printResult(result)
+    return result
+
+
+def printResult(result):
+    print('\n' + result['corpus'] + ':', result['documents'], 'documents,', result['units'], result['unit'] + 's,',
+          result['tokens'], 'tokens')
+    print('  word_tokenize:', result['nltkTokensPerSec'], 'tokens/sec,', result['candidate'] + ':',
+          result['candidateTokensPerSec'], 'tokens/sec - x', result['speedUp'])
+    for name in ['tokenAgreement', 'pipelineAgreement']:
+        a = result[name]
+        print('  ' + name + ': identical', result['unit'] + 's', str(round(100 * a['identical'], 2)) + '%,',
+              'precision', str(round(100 * a['precision'], 2)) + '%,', 'recall', str(round(100 * a['recall'], 2)) + '%')
+    print('  most frequent differences (word_tokenize -> ' + result['candidate'] + '):')
+    for difference, count in result['differences']:
+        print('   ', count, ':', difference)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Agreement and throughput of a tokenizer backend vs word_tokenize')
+    parser.add_argument('--corpora', nargs='+', default=CORPORA, help='corpus paths, relative to SpaceLexiconGenerator')
+    parser.add_argument('--candidate', default='regex', choices=['regex', 'spacy'])
+    parser.add_argument('--max-documents', type=int, help='maximum number of documents per corpus')
+    parser.add_argument('--documents', action='store_true', help='tokenize whole lower cased documents (NLPPipe)')
+    parser.add_argument('--output', help='results file, default: Benchmarks/results/tokenizerAccuracy_<date>.json')
+    args = parser.parse_args()
+
+    results = [tokenizerAccuracy(path, args.max_documents, args.documents, args.candidate) for path in args.corpora]
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIRECTORY, exist_ok=True)
+        output = RESULTS_DIRECTORY + 'tokenizerAccuracy_' + time.strftime('%Y%m%d_%H%M%S') + '.json'
+    with open(output, 'w') as outfile:
+        json.dump(results, outfile, indent=1)
+    print('Results saved in', output)
@@ -6,24 +6,25 @@
 # ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
 import math
 import os
-import nltk
 
-from scipy.spatial import distance
-from nltk.corpus import wordnet as wn
-from numpy import dot
-from numpy.linalg import norm
 from os import listdir
 from os.path import isfile, join
 
 '''
 ---> Methods summary <---
 
+NLTK (and its WordNet corpus) is only imported when a method using it is called, so that importing this module, e.g.,
+for cleanPreviousOutputs, stays fast.
+
 NLP Pipeline methods:
     - tagger: Part-Of-Speech Tagging, with nltk tagger
  
 WordNet related methods:
     - check_wordNet: Check how many items from a word list are in WordNet or not
     - findWordNetSynonyms: Returns synonyms of word x by using WordNet database
+
+ECSS related methods:
+    - loadEcssGlossary: ECSS glossary of terms and acronyms, multiwords joined with '_'
     
 Miscellaneous:
     - cleanPreviousOutputs: clear previous Outputs (only .json files)
@@ -41,6 +42,7 @@ def tagger(tokens):
     Input: list of tokens to tag
     Outputs: tags per tokens
     '''
+    import nltk
 
     taggedWords = nltk.pos_tag(tokens)
 
@@ -65,6 +67,8 @@ def check_wordNet(dictionary):
     DESCRIPTION: Check how many items from a word list are in WordNet or not
     INPUT: list of terms (dictionary) to check
     OUTPUT: list of terms found in WordNet and list of terms not found in WordNet  '''
+    from nltk.corpus import wordnet as wn
+
     notInWordNet = []
     inWordNet = []
 
@@ -84,12 +88,44 @@ def findWordNetSynonyms(x):
     DESCRIPTION: Returns synonyms of word x by using WordNet database
     INPUT: term to check
     OUTPUT: list of term's WordNet synonyms  '''
+    from nltk.corpus import wordnet as wn
+
     synonyms = []
     for syn in wn.synsets(x):
         for l in syn.lemmas():
             synonyms.append(l.name())
     return synonyms
 
+#######################################################################################
+# ECSS related methods
+#######################################################################################
+
+# ECSS glossary of terms and acronyms files, in NLPPipeline/NLPInputs
+ecssDirectory = os.path.dirname(os.path.abspath(__file__)) + '/NLPPipeline/NLPInputs/'
+ECSS_GLOSSARY = ['ecss_1grams.txt', 'ecss_2grams.txt', 'ecss_3grams.txt', 'ecss_4grams.txt', 'ecss_5grams.txt',
+                 'ecss_6grams.txt', 'ecss_9grams.txt', 'ecss_all_acronyms.txt', 'ecss_validated_expansions.txt']
+
+def loadEcssGlossary():
+    '''
+    DESCRIPTION: Load the ECSS glossary of terms and acronyms, the words of a multiword are joined with '_' as in the
+    pre-processed corpora
+    INPUT: None, the glossary files are read from NLPPipeline/NLPInputs (files which are missing are skipped)
+    OUTPUT: list of glossary terms, in files order (a term can appear several times) '''
+    from nltk.tokenize import word_tokenize
+
+    ecssMultiwords = []
+    for file in ECSS_GLOSSARY:
+        if not isfile(ecssDirectory + file):
+            print('ECSS glossary file', file, 'not found, skipped')
+            continue
+        with open(ecssDirectory + file, 'r') as input:
+            words = input.read().split('\n')
+            words = [x for x in words if x]
+            for w in words:
+                ecssMultiwords.append(word_tokenize(w))
+
+    return ['_'.join(item) for item in ecssMultiwords]
+
 #######################################################################################
 # Miscellaneous
 #######################################################################################
@@ -15,19 +15,21 @@ https://ecss.nl/home/ecss-glossary-terms/
 https://ecss.nl/home/ecss-glossary-abbreviations/
 '''
 
-import pandas
 import json
 import re
 import os
-import itertools
 
 
 from DEA_methods import *
-from nltk.tokenize import word_tokenize
-from nltk.corpus import stopwords
-from sklearn.feature_extraction.text import TfidfVectorizer
-from nltk.stem import WordNetLemmatizer
+from NLPPipeline.boilerplateFilter import corpusBoilerplate
+from NLPPipeline.pipelineResources import loadPipelineResources
+from NLPPipeline.preprocessingCore import loadPreprocessor, SPACY_BATCH_SIZE, SPACY_PROCESSES
+from NLPPipeline.documentStream import streamSentences, writeTokenLists
+from NLPPipeline.instrumentation import Metrics, stepTimer, timedIterator
+from NLPPipeline.pipelineManifest import fileHash, configKey, newManifest, loadManifest, saveManifest
 from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from os import listdir
 from os.path import isfile, join
 
@@ -37,26 +39,24 @@ parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
 # ----------------------------------------------------------------------------------------------------------------------
 #                                                 NLP METHODS
 # ----------------------------------------------------------------------------------------------------------------------
-def acronymExpansion(tokens, listReplacements, acronyms, exp):
+def acronymExpansion(tokens, listReplacements, acronymExpander):
     '''
     Search for acronyms within tokens, expand if acronyms are found
-    Input: tokens, listReplacements: list all replacements done so far within the document
-    Outputs: tokens with expanded acronyms when applicable, new replacements done added to list
+    Input: tokens, listReplacements: list all replacements done so far within the document,
+    AcronymExpander built from the acronyms list
+    Outputs: tokens with expanded acronyms when applicable (every occurrence), new replacements done added to list
     '''
 
-    for word in acronyms:
-        if word in tokens:
-            # Replace by acronym expansion
-            expansionToUse = exp[acronyms.index(word)]
-            tokens[tokens.index(word)] = expansionToUse
-            listReplacements.append(word)
+    tokens, found = acronymExpander.expand(tokens)
+    listReplacements.extend(found)
     return tokens, listReplacements
 
-def replaceMultiwords(tokens, listReplacements, ecssMultiwords):
+def replaceMultiwords(tokens, listReplacements, multiwordMatcher):
     '''
     Find all multiwords in a list of tokens
     the multiwords list is based on the ECSS glossary and on the additional multiwords found in the Wiki corpus
-    Input: list of tokens, listReplacements: list all replacements done so far within the document
+    Input: list of tokens, listReplacements: list all replacements done so far within the document,
+    MultiwordMatcher built from the multiwords list
     Output: new list of tokens including multiwords, new replacements done added to list
     '''
 
@@ -64,61 +64,28 @@ def replaceMultiwords(tokens, listReplacements, ecssMultiwords):
     #                  USING ECSS GLOSSARY & ADDITIONAL VALIDATED TERMS
     #----------------------------------------------------------------------------------
 
-    # Find and replace within corpus:
-    for word in ecssMultiwords:
-        # Look if an ecss multiword can be found in the tokens
-        if word[0] in tokens:
-            i = 1
-            wordIndex = tokens.index(word[0])
-            if wordIndex != len(tokens) - 1 and len(word) != 1:
-                while i <= len(word)-1:
-                    if word[i] == tokens[wordIndex+i] and wordIndex + i < len(tokens)-1:
-                        ecssWords = True
-                        i = i + 1
-                    else:
-                        ecssWords = False
-                        break
-
-                # If a multiword has been found, replace within tokens
-                if ecssWords == True:
-                    tokens = replacementAction(word, tokens)
-                    listReplacements.append('_'.join(word))
+    # Find and replace within corpus, every occurrence, longest multiword first
+    tokens, found = multiwordMatcher.replace(tokens)
+    listReplacements.extend(found)
 
     return tokens, listReplacements
 
-def replacementAction(multiword, tokens):
-    '''
-    Replace tokens in a list of tokens by the equivalent multi word,
-    provided the multi word is known to be within the tokens list
-
-    Input: multi word, list of tokens
-    Output: new list of tokens where the tokens of interest have been replaced by the multi word
-    '''
-    new_token = '_'.join(multiword)
-    wordIndex = tokens.index(multiword[0])
-    tokens[wordIndex] = new_token
-    indices = []
-    for item in multiword[1:len(multiword)]:
-        indices.append(tokens.index(item))
-    tokens = [v for i, v in enumerate(tokens) if i not in indices]
-    return tokens
-
-def tf_idf(tokensPerDoc):
+def tf_idf(vocabulary, documentTermMatrix):
     '''
     Generates the tf-idf ranking of each corpus dictionary item, used to filter out words with lowest tf-idf
-    Input: tokens
+    Input: vocabulary and document-term matrix of the corpus (see preprocessedCorpora/tokenStore.py: corpusMatrix,
+    tokenListsMatrix)
     Outputs: .txt file with tf-idf ranking per words, starting from lowest tf-idf
     '''
+    # pandas and scikit-learn are only imported when the ranking is generated (slow imports)
+    import pandas
+    from sklearn.feature_extraction.text import TfidfTransformer
 
-    # tfidf needs a list of sentences, one sentence = one document
-    vectorizer = TfidfVectorizer()
-    tfidf_vectorizer_vectors = vectorizer.fit_transform(tokensPerDoc)
-
-    terms = vectorizer.get_feature_names()
-    sums = tfidf_vectorizer_vectors.sum(axis=0)
+    # tf-idf weights of each document (TfidfVectorizer weighting), summed over all documents
+    sums = TfidfTransformer().fit_transform(documentTermMatrix).sum(axis=0)
 
     data = []
-    for col, term in enumerate(terms):
+    for col, term in enumerate(vocabulary):
         data.append((term, sums[0, col]))
 
     pandas.set_option('display.max_rows', 4000)
@@ -133,42 +100,31 @@ def tf_idf(tokensPerDoc):
         f.write(onlyTerms.to_string(header=True, index=False))
     return
 
-def NLPPipeline(docName, path, acronyms, exp, ecssMultiwords):
+def documentName(docName):
     '''
-    Application of NLP pipeline
-    Input: path to file text
-    Outputs: list of pre-processed tokens, divided by sentences, and file name
+    Name of a document, as used for its NLP pipeline output file: only letters, digits and '_' are kept
+    Input: document file name
+    Output: name
     '''
+    regex_name = '([\w])'
+    name_file = re.findall(regex_name, docName)
+    return "".join(name_file)
 
-    # Import Stop Words
-    with open(parentDir+"/NLPPipeline/NLPInputs/non_character_words.txt", encoding="utf-8") as Punctuation:
-        filterPunctuation = word_tokenize(Punctuation.read())
-
-    # Common words
-    with open(parentDir+"/NLPPipeline/NLPInputs/common_words.txt", encoding="utf-8") as CommonWords:
-        filterCommonWords = word_tokenize(CommonWords.read())
-
-    # Manually validate extra common words -specific to study corpora
-    with open(parentDir + "/NLPPipeline/NLPInputs/corpora_common_words.txt", encoding="utf-8") as CommonWords:
-        filterAdditional = word_tokenize(CommonWords.read())
-
-    stopset = stopwords.words('english')
-
-    for i in filterPunctuation:
-        stopset.append(i)
-
-    for i in filterCommonWords:
-        stopset.append(i)
-
-    for i in filterAdditional:
-        stopset.append(i)
-
-    # Load file
-    with open(parentDir+path + docName, 'r') as infile:
-        input = json.load(infile)
+def outputFileName(docName):
+    '''
+    Name of the NLP pipeline output file of a document
+    Input: document file name
+    Output: output file name
+    '''
+    return str(documentName(docName)) + '_AfterNLPPipeline.json'
 
-    # Divide text into sentences
-    sentences = (input["content"]).split('\n')  # string
+def splitSentences(content):
+    '''
+    Divide text into sentences: one sentence per line, lines separated based on punctuation
+    Input: text
+    Output: list of sentences
+    '''
+    sentences = content.split('\n')  # string
     sentences = [x for x in sentences if x != '']  # remove empty lines
     sentences = [re.split(r'[.?!]\s*', x) for x in sentences]  # separate sentences based on punctuation
     filtered = []
@@ -178,159 +134,268 @@ def NLPPipeline(docName, path, acronyms, exp, ecssMultiwords):
             if i:
                 filtered.append(i)
 
-    sentences = filtered
-
-    # Process each sentence
-    tokenPerSentence = []
-    listReplacementMW=[]
-    listReplacementAcc=[]
-
-    print('number of sentences to analyse:', len(sentences))
-    for sen in sentences:
-
-        # Tokenize
-        tokens = word_tokenize(sen)
-
-        # Trim
-        tokens = [word.strip() for word in tokens]
-
-        # Remove tokens that are only numbers
-        tokens = [x for x in tokens if re.findall('[a-zA-Z]', x)]
-
-        # Remove tokens mixing characters and numbers
-        tokens = [x for x in tokens if not re.findall('[0-9]', x)]
+    return filtered
 
-        # Remove urls
-        tokens = [re.sub(r'www.*[\r\n]*', '', token) for token in tokens]
-
-        # Remove non English/number characters:
-        tokens = [re.sub('[^A-Za-z0-9_\-/]+', '', token) for token in tokens]
+def processSentences(sentences, resources, listReplacementMW, listReplacementAcc, metrics=None, tokenizer='nltk',
+                     spacyBatchSize=SPACY_BATCH_SIZE, spacyProcesses=SPACY_PROCESSES):
+    '''
+    Apply the NLP pipeline to sentences, one sentence at a time
+    Input: iterable of sentences, PipelineResources, lists of all multi words and acronyms replacements done so far
+    within the document, Metrics to time each step (None: instrumentation disabled), tokenizer backend ('nltk':
+    word_tokenize, 'regex': faster regular expression tokenizer, 'spacy': sentences tokenized and lemmatised in
+    batches), sentences per nlp.pipe batch and processes used by nlp.pipe (spaCy backend only)
+    Outputs: generator of pre-processed tokens per sentence (sentences left empty are skipped), new replacements done
+    added to lists
+    '''
+    # Tokenize, trim, filters, acronyms, lower case, multi words, stop words, lemmatization ('lexicon' profile)
+    preprocessor = loadPreprocessor('lexicon', resources, tokenizer, spacyBatchSize, spacyProcesses)
 
-        # Remove Empty tokens
-        tokens = [x for x in tokens if x]
+    if metrics is not None:
+        sentences = timedIterator(sentences, metrics, 'readSentences')
 
-        # Replace acronyms
-        tokens, listReplacementAcc = acronymExpansion(tokens, listReplacementAcc, acronyms, exp)
+    for tokens in preprocessor.processBatch(sentences, listReplacementMW, listReplacementAcc, metrics):
 
-        # Normalise Text
-        tokens = [w.lower() for w in tokens]
+        if metrics is not None:
+            metrics.count('sentences')
 
-        # Replace multi words
-        tokens, listReplacementMW = replaceMultiwords(tokens, listReplacementMW, ecssMultiwords)
+        # Tokens Output
+        if tokens:
+            yield tokens
 
-        # Remove stopwords + punctuation
-        tokens = [w for w in tokens if w not in stopset]
+def streamNLPPipeline(docName, path, resources, listReplacementMW, listReplacementAcc, metrics=None,
+                      tokenizer='nltk', boilerplate=None, spacyBatchSize=SPACY_BATCH_SIZE,
+                      spacyProcesses=SPACY_PROCESSES):
+    '''
+    Application of NLP pipeline, streaming mode: the document is read incrementally and processed sentences are
+    yielded one by one, the memory used does not depend on the document size
+    Input: path to file text, PipelineResources, lists of all multi words and acronyms replacements done so far within
+    the document, Metrics (None: instrumentation disabled), tokenizer backend, BoilerplateFilter of the corpus
+    (None: all sentences are processed), nlp.pipe batch size and processes (spaCy backend only)
+    Outputs: generator of pre-processed tokens per sentence, new replacements done added to lists
+    '''
+    sentences = streamSentences(parentDir + path + docName)
+    if boilerplate is not None:
+        sentences = boilerplate.filterSentences(sentences, metrics)
+    return processSentences(sentences, resources, listReplacementMW, listReplacementAcc, metrics, tokenizer,
+                            spacyBatchSize, spacyProcesses)
+
+def NLPPipeline(docName, path, resources, metrics=None, tokenizer='nltk', spacyBatchSize=SPACY_BATCH_SIZE,
+                spacyProcesses=SPACY_PROCESSES):
+    '''
+    Application of NLP pipeline
+    Input: path to file text, PipelineResources (stop words, acronyms, multiwords) shared by all documents, Metrics to
+    time each step (None: instrumentation disabled), tokenizer backend, nlp.pipe batch size and processes (spaCy
+    backend only)
+    Outputs: list of pre-processed tokens, divided by sentences, and file name
+    '''
 
-        # Lemmatization - currently based on wordnet
-        wnl = WordNetLemmatizer()
-        tokens = [wnl.lemmatize(word) for word in tokens]
+    with stepTimer(metrics, 'readSentences'):
+        # Load file
+        with open(parentDir+path + docName, 'r') as infile:
+            input = json.load(infile)
 
-        # Remove stopwords + punctuation
-        tokens = [w for w in tokens if w not in stopset]
+        # Divide text into sentences
+        sentences = splitSentences(input["content"])
 
-        # Remove very short tokens
-        tokens = [x for x in tokens if len(x) > 2]
+    # Process each sentence
+    listReplacementMW=[]
+    listReplacementAcc=[]
 
-        # Tokens Output
-        if tokens:
-            tokenPerSentence.append(tokens)
+    print('number of sentences to analyse:', len(sentences))
+    tokenPerSentence = list(processSentences(sentences, resources, listReplacementMW, listReplacementAcc, metrics,
+                                             tokenizer, spacyBatchSize, spacyProcesses))
 
     # ------------------------------------------------------------------------------
     # Save Pre-processed Text
     # ------------------------------------------------------------------------------
 
     # Get name file
-    regex_name = '([\w])'
-    name_file = re.findall(regex_name, docName)
-    name_file = "".join(name_file)
+    name_file = documentName(docName)
 
     return tokenPerSentence, name_file, listReplacementMW, listReplacementAcc
 
+# Increment when the NLP pipeline steps change, invalidates the outputs of the incremental mode
+NLP_PIPELINE_VERSION = 1
+
+def pipelineConfig(tokenizer='nltk', spacyBatchSize=SPACY_BATCH_SIZE, spacyProcesses=SPACY_PROCESSES):
+    '''
+    Configuration parameters of the NLP pipeline affecting its outputs, used to identify outdated outputs
+    Input: tokenizer backend, nlp.pipe batch size and processes (spaCy backend only)
+    Output: dictionary of parameters
+    '''
+    config = {'version': NLP_PIPELINE_VERSION, 'tokenizer': tokenizer}
+    if tokenizer == 'spacy':
+        # spaCy is an optional dependency, only imported when used
+        from NLPPipeline.spacyBackend import loadSpacyBackend
+        config['spacyPipeline'] = loadSpacyBackend(batchSize=spacyBatchSize, nProcess=spacyProcesses).name
+        config['spacyBatchSize'] = spacyBatchSize
+        config['spacyProcesses'] = spacyProcesses
+    return config
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                 NLP Pipeline workers
+# ----------------------------------------------------------------------------------------------------------------------
+# Resources and boilerplate filters of a worker process, set once per worker by initWorker
+workerResources = None
+workerBoilerplate = None
+
+def initWorker(resources, boilerplate=None):
+    '''
+    Initialise a worker process of the NLP pipeline pool, resources are received once per worker
+    Input: PipelineResources, dictionary of corpus path -> BoilerplateFilter
+    '''
+    global workerResources, workerBoilerplate
+    workerResources = resources
+    workerBoilerplate = boilerplate
+
+def processDocument(document, resources=None, instrument=False, tokenizer='nltk', boilerplate=None,
+                    spacyBatchSize=SPACY_BATCH_SIZE, spacyProcesses=SPACY_PROCESSES):
+    '''
+    Apply the NLP pipeline to one document, in streaming mode, and save its output as a .json file, sentence by
+    sentence
+    Input: (document name, path to document directory), PipelineResources (worker resources and boilerplate filters if
+    None), instrument: if True each step is timed, tokenizer backend, dictionary of corpus path -> BoilerplateFilter
+    (documents of other corpora are not filtered), nlp.pipe batch size and processes (spaCy backend only)
+    Outputs: multi words and acronyms replaced in document, document metrics (None if instrument is False)
+    '''
+    eachDoc, path = document
+    if resources is None:
+        resources = workerResources
+        boilerplate = workerBoilerplate
+    metrics = Metrics() if instrument else None
+
+    MW = []
+    Acc = []
+    tokensPerSentence = streamNLPPipeline(eachDoc, path, resources, MW, Acc, metrics, tokenizer,
+                                          (boilerplate or {}).get(path), spacyBatchSize, spacyProcesses)
+
+    # Save Preprocessed text as .json file, one per document
+    n = writeTokenLists(tokensPerSentence, parentDir+'/Outputs/NLPOutputs/'+outputFileName(eachDoc))
+    print('number of sentences analysed in', eachDoc, ':', n)
+
+    if metrics is not None:
+        metrics.count('sentencesKept', n)
+        metrics = metrics.asDict()
+    return MW, Acc, metrics
+
 # ----------------------------------------------------------------------------------------------------------------------
 #                                                 NLP Pipeline main
 # ----------------------------------------------------------------------------------------------------------------------
 
-def applyNLPPipeline(inputPath):
+def applyNLPPipeline(inputPath, workers=1, incremental=False, instrumentation=None, tokenizer='nltk',
+                     boilerplate=None, spacyBatchSize=SPACY_BATCH_SIZE, spacyProcesses=SPACY_PROCESSES):
     '''
     Pre-processing of parsed text
-    Input: .json files containing parsed text per corpus element
+    Input: .json files containing parsed text per corpus element, workers: number of processes the documents are
+    spread over (1: documents processed one at a time in the current process), incremental: if True only new or
+    changed documents are processed, outputs of removed documents are deleted (see Outputs/NLPManifest.json),
+    instrumentation: Instrumentation collecting the time spent per step for each processed document (None: disabled),
+    tokenizer: tokenizer backend, 'nltk' (word_tokenize), 'regex' (faster, see NLPPipeline/regexTokenizer.py) or
+    'spacy' (batched tokenization and lemmatisation, see NLPPipeline/spacyBackend.py), boilerplate: paths of inputPath
+    whose boilerplate sentences (page chrome, footers... repeated across the documents, see
+    NLPPipeline/boilerplateFilter.py) are removed before the NLP pipeline (None: no filtering), spacyBatchSize:
+    sentences per nlp.pipe batch and spacyProcesses: processes used by nlp.pipe (spaCy backend only, keep 1 process when
+    the documents are spread over workers)
     Outputs: .json files containing preprocessed text per corpus element
     '''
 
     fileDir = os.path.dirname(os.path.abspath(__file__))  #
     parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
 
-    # clear previous raw text extraction Outputs
     targetDirectory = parentDir + "/Outputs/NLPOutputs/"
-    cleanPreviousOutputs(targetDirectory)
-
-    # Load acronyms list, manually defined and validated
-    acronymsList = []
-    with open(parentDir + '/NLPPipeline/NLPInputs/acronyms.txt', 'r',
-              encoding="utf-8") as inputFile:
-        acLine = inputFile.read().split('\n')
-        for line in acLine:
-            if line:
-                acronymsList.append(line.split(' | '))
-    acronyms = [x[0] for x in acronymsList]
-    expansions = [word_tokenize(x[1]) for x in acronymsList]
-    exp= []
-    for item in expansions:
-        item = ' '.join(item)
-        item = item.replace("-", "_")
-        item = item.replace(" ", "_")
-        exp.append(item)
-
-    # Load multiwords
-    # Get ECSS multiwords + additional validated terms
-    inputFiles = [parentDir + '/NLPPipeline/NLPInputs/ecss_2grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_3grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_4grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_5grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_6grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_9grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/spacemissiondesign_ngrams.txt']
-    ecssMultiwords = []
-    for file in inputFiles:
-        with open(file, 'r') as input:
-            words = input.read().split('\n')
-            words = [x for x in words if x]
-            for w in words:
-                ecssMultiwords.append(word_tokenize(w))
-
-    # To store list of multi words and acronyms found in the processed corpus
-    replacementListMW=[]
-    replacementListAcc=[]
+    manifestFile = parentDir + "/Outputs/NLPManifest.json"
+
+    # Load stop words, acronyms and multiwords once for all documents
+    resources = loadPipelineResources()
+    pipelineKey = configKey(resources.key, pipelineConfig(tokenizer, spacyBatchSize, spacyProcesses))
 
     # Extract file names
+    documents = []
     for path in inputPath:
-        documents = [f for f in listdir(parentDir+path) if isfile(join(parentDir+path, f))]
-
-        # Apply NLP pipeline to each document
-        allTokens=[]
+        docNames = [f for f in listdir(parentDir+path) if isfile(join(parentDir+path, f))]
+        print('doc number', len(docNames))
+        documents.extend([(eachDoc, path) for eachDoc in docNames])
 
+    # Boilerplate of the selected corpora, found across all their documents
+    filters = {}
+    for path in inputPath:
+        if path in (boilerplate or []):
+            filters[path] = corpusBoilerplate(path)
+            filters[path].summary(path)
+    if filters:
+        with open(parentDir + '/Outputs/boilerplateReport.json', 'w') as outfile:
+            json.dump({path: f.statistics for path, f in filters.items()}, outfile, indent=1)
+
+    # Outputs generated with other resources or configuration are all reprocessed
+    manifest = loadManifest(manifestFile)
+    if not incremental or manifest['configKey'] != pipelineKey:
+        # clear previous raw text extraction Outputs
+        cleanPreviousOutputs(targetDirectory)
+        manifest = newManifest(pipelineKey)
+    entries = manifest['documents']
+
+    # Remove outputs of documents no longer in corpus
+    sources = [path + eachDoc for (eachDoc, path) in documents]
+    currentSources = set(sources)
+    currentOutputs = set(outputFileName(eachDoc) for (eachDoc, path) in documents)
+    stale = [source for source in entries if source not in currentSources]
+    for source in stale:
+        output = entries.pop(source)['output']
+        if output not in currentOutputs and isfile(targetDirectory + output):
+            os.remove(targetDirectory + output)
+
+    # Only process new or changed documents (or documents whose boilerplate changed)
+    sourceHashes = {source: fileHash(parentDir + source) for source in sources}
+    boilerplateHashes = {path + eachDoc: filters[path].documentHash(parentDir + path + eachDoc)
+                         for (eachDoc, path) in documents if path in filters}
+    toProcess = []
+    for document, source in zip(documents, sources):
+        entry = entries.get(source)
+        if (entry is None or entry['sourceHash'] != sourceHashes[source]
+                or entry.get('boilerplateHash') != boilerplateHashes.get(source)
+                or not isfile(targetDirectory + entry['output'])):
+            toProcess.append(document)
+    if incremental:
+        print(len(documents) - len(toProcess), 'unchanged documents skipped,', len(toProcess), 'documents to process,',
+              len(stale), 'removed documents')
+
+    # Apply NLP pipeline to each document
+    if workers > 1 and len(toProcess) > 1:
+        print('Applying NLP Pipeline to', len(toProcess), 'documents with', workers, 'workers')
+        with ProcessPoolExecutor(max_workers=workers, initializer=initWorker,
+                                 initargs=(resources, filters)) as executor:
+            # results are returned in documents order, whatever the order in which documents are completed
+            results = list(executor.map(partial(processDocument, instrument=instrumentation is not None,
+                                                tokenizer=tokenizer, spacyBatchSize=spacyBatchSize,
+                                                spacyProcesses=spacyProcesses), toProcess))
+    else:
+        results = []
         c = 1
-        print('doc number', len(documents))
-        for eachDoc in documents:
-            print('\n ------- \n Applying NLP Pipeline to doc number', c,':', eachDoc)
-            tokensPerDocument, name_file, MW, Acc = NLPPipeline(eachDoc, path, acronyms, exp, ecssMultiwords)
-            replacementListMW.append(MW)
-            replacementListAcc.append(Acc)
-            # Save Preprocessed text as .json file, one per document
-            with open(parentDir+'/Outputs/NLPOutputs/'+str(name_file)+'_AfterNLPPipeline.json','w') as outfile:
-                json.dump(tokensPerDocument, outfile)
-
-            tokensPerDocument=list(itertools.chain.from_iterable(tokensPerDocument))
-            allTokens.append(' '.join(tokensPerDocument))
+        for document in toProcess:
+            print('\n ------- \n Applying NLP Pipeline to doc number', c,':', document[0])
+            results.append(processDocument(document, resources, instrumentation is not None, tokenizer, filters,
+                                           spacyBatchSize, spacyProcesses))
             c=c+1
 
-    # Summary of NLP processing per document:
-    replacementListMW=list(itertools.chain.from_iterable(replacementListMW))
-    replacementListAcc=list(itertools.chain.from_iterable(replacementListAcc))
-    countAcc=Counter(replacementListAcc)
-    countMW=Counter(replacementListMW)
-    print('Multi Words replaced in document:', Counter(replacementListMW))
-    print('Acronyms replaced in document:', Counter(replacementListAcc))
+    # Record processed documents in manifest
+    for (eachDoc, path), (MW, Acc, metrics) in zip(toProcess, results):
+        source = path + eachDoc
+        entries[source] = {'sourceHash': sourceHashes[source], 'output': outputFileName(eachDoc),
+                           'MW': Counter(MW), 'Acc': Counter(Acc)}
+        if source in boilerplateHashes:
+            entries[source]['boilerplateHash'] = boilerplateHashes[source]
+        if instrumentation is not None:
+            instrumentation.addDocument(source, metrics)
+    saveManifest(manifest, manifestFile)
+
+    # Summary of NLP processing per document, merged in documents order:
+    countMW = Counter()
+    countAcc = Counter()
+    for source in sources:
+        countMW.update(entries[source]['MW'])
+        countAcc.update(entries[source]['Acc'])
+    print('Multi Words replaced in document:', countMW)
+    print('Acronyms replaced in document:', countAcc)
 
     #Save in text document
     with open(parentDir+'/Outputs/foundMW.txt', 'w') as f:
@@ -342,7 +407,7 @@ def applyNLPPipeline(inputPath):
             f.write(str(key) + ':' + str(value) +'\n')
 
     # Optional - perform tf-idf analysis to rank low informative words and manually add them to stop word list
-    #tf_idf(allTokens)
+    #from preprocessedCorpora.tokenStore import corpusMatrix
+    #tf_idf(*corpusMatrix('/Outputs/NLPOutputs/'))
 
     return
-
@@ -0,0 +1,91 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+acronymExpander.py expands acronyms (e.g., ECSS glossary of abbreviations) in a list of tokens. Acronyms are stored
+in a dictionary, acronym -> list of expansion tokens, and a list of tokens is expanded in one pass: every occurrence
+of every acronym is replaced and the output list is built once.
+
+Acronyms files are read once per process (see loadAcronymExpander).
+'''
+
+from nltk.tokenize import word_tokenize
+
+# Acronym expanders already loaded in this process, per (file, separator, joinExpansion)
+loadedExpanders = {}
+
+
+class AcronymExpander:
+    '''
+    Dictionary-based acronyms expansion
+    Input: dictionary of acronyms and their expansion as a list of tokens, e.g., {'AC': ['alternating_current']} or
+    {'tcs': ['thermal', 'control', 'system']}
+    '''
+
+    def __init__(self, acronyms):
+        self.acronyms = acronyms
+
+    def __len__(self):
+        return len(self.acronyms)
+
+    def expand(self, tokens):
+        '''
+        Replace every acronym found in a list of tokens by its expansion
+        Input: list of tokens
+        Output: new list of tokens with expanded acronyms, list of acronyms found (one item per occurrence)
+        '''
+        get = self.acronyms.get
+        newTokens = []
+        found = []
+
+        for token in tokens:
+            expansion = get(token)
+            if expansion is None:
+                newTokens.append(token)
+            else:
+                newTokens.extend(expansion)
+                found.append(token)
+
+        return newTokens, found
+
+
+def readAcronyms(file, separator=' | ', joinExpansion=True):
+    '''
+    Read an acronyms file, one acronym per line: 'acronym' + separator + 'expansion'
+    If an acronym is defined twice the first expansion is kept
+    Input: file path, separator, joinExpansion: if True the expansion is one token joined with '_' (multiword style),
+    e.g., 'alternating_current', otherwise the expansion is a list of tokens
+    Output: dictionary of acronyms and their expansion as a list of tokens
+    '''
+    acronyms = {}
+    with open(file, 'r', encoding="utf-8") as inputFile:
+        acLine = inputFile.read().split('\n')
+
+    for line in acLine:
+        if line:
+            acronymsList = line.split(separator)
+            expansion = word_tokenize(acronymsList[1])
+            if joinExpansion:
+                exp = ' '.join(expansion)
+                exp = exp.replace("-", "_")
+                exp = exp.replace(" ", "_")
+                expansion = [exp]
+            acronyms.setdefault(acronymsList[0].strip(), expansion)
+
+    return acronyms
+
+
+def loadAcronymExpander(file, separator=' | ', joinExpansion=True):
+    '''
+    Load an acronyms file into an AcronymExpander, the file is only read the first time it is requested in a process
+    Input: file path, separator, joinExpansion (see readAcronyms)
+    Output: AcronymExpander
+    '''
+    key = (file, separator, joinExpansion)
+    if key not in loadedExpanders:
+        loadedExpanders[key] = AcronymExpander(readAcronyms(file, separator, joinExpansion))
+    return loadedExpanders[key]
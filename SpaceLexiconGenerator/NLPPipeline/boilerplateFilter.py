@@ -0,0 +1,285 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+boilerplateFilter.py finds the boilerplate of a corpus of parsed documents, before the NLP pipeline: web page chrome
+('Jump to navigation', 'Privacy policy', language links...), footers and reference notes repeated across the
+documents ('This page was last edited on 5 March 2019, at 10:03 (UTC)', 'Archived from the original on ...'). Without
+this stage, each copy is tokenized, lemmatised and counted once per document, which skews the frequency statistics of
+the lexicon.
+
+Each line of the documents is split into sentences as by the NLP pipeline (NLP_Pipeline.splitSentences), and each
+sentence is fingerprinted by its key: lower case, numbers replaced by 0, white spaces collapsed. A sentence is
+boilerplate if, across the corpus, it is found in at least DOCUMENT_SHARE of the documents (and MIN_DOCUMENTS):
+- exact duplicates: same key
+- near duplicates: keys of at least MIN_WORDS words with an estimated Jaccard similarity of their word bigrams of at
+  least NEAR_DUPLICATE_THRESHOLD, found with MinHash signatures and locality sensitive hashing (LSH bands); a group of
+  near duplicates is boilerplate if its sentences together are found in enough documents
+Sentences without any word of 2 letters or more ('s' of 'U.S.', '[1]', '=') are never boilerplate.
+
+The number of sentences and tokens (white space separated, before the NLP pipeline) removed are reported.
+
+Report of the boilerplate of a corpus, from the SpaceLexiconGenerator directory:
+python NLPPipeline/boilerplateFilter.py /Corpora/Wiki/
+'''
+
+import hashlib
+import os
+import re
+import sys
+import zlib
+
+import numpy as np
+
+from os import listdir
+from os.path import isfile, join
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+sys.path.append(parentDir)
+
+from NLPPipeline.documentStream import streamSentences
+
+DOCUMENT_SHARE = 0.25  # share of the documents of the corpus a boilerplate sentence is found in
+MIN_DOCUMENTS = 3
+NEAR_DUPLICATE_THRESHOLD = 0.6  # estimated Jaccard similarity of the word bigrams
+MIN_WORDS = 4  # shorter sentences are only compared exactly
+NUMBER_OF_HASHES = 64  # MinHash signature length
+ROWS_PER_BAND = 4  # LSH: signatures sharing one band of ROWS_PER_BAND hashes are compared
+SHINGLES_PER_BATCH = 1 << 16  # word bigrams hashed at a time
+
+number = re.compile(r'\d+')
+word = re.compile(r'[^\W\d_]{2}')
+sentenceSeparator = re.compile(r'([.?!]\s*)')
+
+
+def sentenceKey(sentence):
+    '''
+    Fingerprint of a sentence: lower case, numbers replaced by 0, white spaces collapsed
+    Input: sentence
+    Output: key, None if the sentence has no word of 2 letters or more
+    '''
+    key = ' '.join(number.sub('0', sentence.lower()).split())
+    if not word.search(key):
+        return None
+    return key
+
+
+def minHashSignatures(keys, numberOfHashes=NUMBER_OF_HASHES, seed=0):
+    '''
+    MinHash signatures of the word bigrams of keys, hash functions h(x) = (a * x + b) mod 2^64 >> 32 (a odd)
+    Input: list of keys (at least 2 words each), signature length, seed of the hash functions
+    Output: uint64 array (number of keys x numberOfHashes)
+    '''
+    random = np.random.RandomState(seed)
+    a = (random.randint(0, 2 ** 62, numberOfHashes, dtype=np.int64).astype(np.uint64) * np.uint64(2)
+         + np.uint64(1))[:, None]
+    b = random.randint(0, 2 ** 62, numberOfHashes, dtype=np.int64).astype(np.uint64)[:, None]
+
+    signatures = np.empty((len(keys), numberOfHashes), dtype=np.uint64)
+    wordHashes = {}
+    start = 0
+    while start < len(keys):
+        # keys of the batch, hashes of their words in one array, offsets of the first word of each key
+        words = []
+        offsets = []
+        end = start
+        while end < len(keys) and (end == start or len(words) < SHINGLES_PER_BATCH):
+            offsets.append(len(words))
+            for w in keys[end].split():
+                h = wordHashes.get(w)
+                if h is None:
+                    h = wordHashes[w] = zlib.crc32(w.encode('utf-8'))
+                words.append(h)
+            end = end + 1
+        # bigram hash of each word and the next one, the last word of each key starts no bigram
+        words = np.array(words, dtype=np.uint64)
+        bigrams = words[:-1] * np.uint64(0x100000001B3) + words[1:]
+        keep = np.ones(len(bigrams), dtype=bool)
+        keep[np.array(offsets[1:], dtype=np.int64) - 1] = False
+        bigrams = bigrams[keep]
+        bigramOffsets = np.array(offsets) - np.arange(len(offsets))
+        hashes = (a * bigrams + b) >> np.uint64(32)
+        signatures[start:end] = np.minimum.reduceat(hashes, bigramOffsets, axis=1).T
+        start = end
+    return signatures
+
+
+def nearDuplicateGroups(signatures, threshold=NEAR_DUPLICATE_THRESHOLD, rowsPerBand=ROWS_PER_BAND):
+    '''
+    Groups of near duplicates: signatures sharing a band are candidates, merged if the share of equal hashes (estimated
+    Jaccard similarity) is above threshold
+    Input: MinHash signatures, similarity threshold, hashes per LSH band
+    Output: group of each signature (index of a signature of its group)
+    '''
+    group = list(range(len(signatures)))
+
+    def root(i):
+        while group[i] != i:
+            group[i] = group[group[i]]
+            i = group[i]
+        return i
+
+    for band in range(0, signatures.shape[1], rowsPerBand):
+        # bucket of each signature: its first signature with the same band (hashes of the band mixed in one
+        # integer, collisions are removed by the similarity check)
+        bucket = signatures[:, band]
+        for row in range(band + 1, min(band + rowsPerBand, signatures.shape[1])):
+            bucket = bucket * np.uint64(0x100000001B3) + signatures[:, row]
+        unique, first, inverse = np.unique(bucket, return_index=True, return_inverse=True)
+        first = first[inverse.ravel()]
+        candidates = np.nonzero(first != np.arange(len(signatures)))[0]
+        similar = (signatures[candidates] == signatures[first[candidates]]).mean(axis=1) >= threshold
+        for i, j in zip(candidates[similar].tolist(), first[candidates[similar]].tolist()):
+            if root(i) != root(j):
+                group[root(i)] = root(j)
+
+    return [root(i) for i in range(len(signatures))]
+
+
+class BoilerplateFilter:
+    '''
+    Boilerplate sentences of a corpus, see findBoilerplate
+    keys: set of boilerplate sentence keys, documentKeys: file -> boilerplate keys found in the file, statistics:
+    dictionary of the corpus and boilerplate counts
+    '''
+
+    def __init__(self, keys, documentKeys, statistics):
+        self.keys = keys
+        self.documentKeys = documentKeys
+        self.statistics = statistics
+
+    def isBoilerplate(self, sentence):
+        return sentenceKey(sentence) in self.keys
+
+    def filterSentences(self, sentences, metrics=None):
+        '''
+        Input: iterable of sentences, Metrics counting the sentences removed (None: disabled)
+        Output: generator of the sentences which are not boilerplate
+        '''
+        for sentence in sentences:
+            if sentenceKey(sentence) in self.keys:
+                if metrics is not None:
+                    metrics.count('boilerplateSentences')
+                continue
+            yield sentence
+
+    def clean(self, content):
+        '''
+        Remove the boilerplate sentences of a whole text, the other sentences and their punctuation are kept
+        Input: text
+        Output: text without boilerplate
+        '''
+        lines = []
+        for line in content.split('\n'):
+            pieces = sentenceSeparator.split(line)
+            # sentences (even positions) followed by their separator (odd positions)
+            kept = ''.join(pieces[i] + (pieces[i + 1] if i + 1 < len(pieces) else '')
+                           for i in range(0, len(pieces), 2) if sentenceKey(pieces[i]) not in self.keys)
+            if kept or not line:
+                lines.append(kept)
+        return '\n'.join(lines)
+
+    def documentHash(self, file):
+        '''
+        Input: document file, as given to findBoilerplate
+        Output: hash of the boilerplate keys removed from the document, changes when the boilerplate of the document
+        changes
+        '''
+        h = hashlib.sha1()
+        for key in sorted(self.documentKeys.get(file, ())):
+            h.update(key.encode('utf-8') + b'\n')
+        return h.hexdigest()
+
+    def summary(self, name=''):
+        s = self.statistics
+        print('Boilerplate', name + ':', s['boilerplateKeys'], 'boilerplate sentences (' + str(s['exactKeys']),
+              'exact,', s['nearDuplicateKeys'], 'near duplicates) in', s['documents'], 'documents')
+        print('   removed', s['removedSentences'], '/', s['sentences'], 'sentences,', s['removedTokens'], '/',
+              s['tokens'], 'tokens (' + str(round(100 * s['removedTokens'] / max(s['tokens'], 1), 2)) + '% saved)')
+
+
+def findBoilerplate(files, documentShare=DOCUMENT_SHARE, minDocuments=MIN_DOCUMENTS,
+                    threshold=NEAR_DUPLICATE_THRESHOLD, top=50):
+    '''
+    Find the boilerplate sentences of a corpus
+    Input: list of parsed documents files (.json, text under "content"), minimum share of the documents and number of
+    documents a boilerplate sentence (or group of near duplicates) is found in, near duplicates similarity threshold,
+    number of most frequent boilerplate sentences kept in the statistics
+    Output: BoilerplateFilter
+    '''
+    # Exact fingerprints: documents, occurrences and tokens of each sentence key
+    keyIds = {}
+    keyDocuments = []
+    keyOccurrences = []
+    keyTokens = []
+    numberOfSentences = 0
+    numberOfTokens = 0
+    for d, file in enumerate(files):
+        for sentence in streamSentences(file):
+            numberOfSentences = numberOfSentences + 1
+            tokens = len(sentence.split())
+            numberOfTokens = numberOfTokens + tokens
+            key = sentenceKey(sentence)
+            if key is None:
+                continue
+            k = keyIds.setdefault(key, len(keyIds))
+            if k == len(keyDocuments):
+                keyDocuments.append({d})
+                keyOccurrences.append(0)
+                keyTokens.append(0)
+            keyDocuments[k].add(d)
+            keyOccurrences[k] = keyOccurrences[k] + 1
+            keyTokens[k] = keyTokens[k] + tokens
+
+    keys = list(keyIds)
+    required = max(minDocuments, documentShare * len(files))
+    boilerplate = set(k for k in range(len(keys)) if len(keyDocuments[k]) >= required)
+    numberOfExact = len(boilerplate)
+
+    # Near duplicates of the longer sentences
+    candidates = [k for k in range(len(keys)) if len(keys[k].split()) >= MIN_WORDS]
+    if len(candidates) > 1:
+        groups = {}
+        for k, g in zip(candidates, nearDuplicateGroups(minHashSignatures([keys[k] for k in candidates]), threshold)):
+            groups.setdefault(g, []).append(k)
+        for members in groups.values():
+            if len(members) > 1 and len(set().union(*(keyDocuments[k] for k in members))) >= required:
+                boilerplate.update(members)
+
+    documentKeys = {}
+    for k in boilerplate:
+        for d in keyDocuments[k]:
+            documentKeys.setdefault(files[d], set()).add(keys[k])
+
+    mostFrequent = sorted(boilerplate, key=lambda k: (-len(keyDocuments[k]), keys[k]))[:top]
+    statistics = {'documents': len(files), 'sentences': numberOfSentences, 'tokens': numberOfTokens,
+                  'boilerplateKeys': len(boilerplate), 'exactKeys': numberOfExact,
+                  'nearDuplicateKeys': len(boilerplate) - numberOfExact,
+                  'removedSentences': sum(keyOccurrences[k] for k in boilerplate),
+                  'removedTokens': sum(keyTokens[k] for k in boilerplate),
+                  'mostFrequent': [[keys[k], len(keyDocuments[k])] for k in mostFrequent]}
+    return BoilerplateFilter(set(keys[k] for k in boilerplate), documentKeys, statistics)
+
+
+def corpusBoilerplate(path, **parameters):
+    '''
+    Input: corpus path (relative to SpaceLexiconGenerator), findBoilerplate parameters
+    Output: BoilerplateFilter of the corpus documents
+    '''
+    corpusDirectory = parentDir + path
+    documents = sorted(f for f in listdir(corpusDirectory) if isfile(join(corpusDirectory, f)))
+    return findBoilerplate([join(corpusDirectory, d) for d in documents], **parameters)
+
+
+if __name__ == '__main__':
+    for corpusPath in sys.argv[1:]:
+        boilerplateFilter = corpusBoilerplate(corpusPath)
+        boilerplateFilter.summary(corpusPath)
+        print('   most frequent boilerplate sentences (documents):')
+        for key, n in boilerplateFilter.statistics['mostFrequent'][:20]:
+            print('     ', n, ':', key)
@@ -0,0 +1,285 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+documentStream.py reads the corpus .json files incrementally, so that the memory used does not depend on the size of
+a document (e.g., multi-hundred-MB technical manuals):
+
+1. streamSentences: sentences of a parsed document ({"content": "...", ...}), read chunk by chunk, same sentences as
+   NLP_Pipeline.splitSentences applied to the whole content
+2. streamTokenLists: tokenized sentences of a pre-processed document (NLP pipeline output, list of lists of tokens)
+3. CorpusSentences: re-iterable stream of all tokenized sentences of a pre-processed corpus directory, e.g., as input
+   of word2vec
+4. writeTokenLists: write tokenized sentences one by one, same file as json.dump of the list of all sentences
+'''
+
+import json
+import re
+
+from os import listdir
+from os.path import isfile, join
+
+CHUNK_SIZE = 1 << 20  # characters read at a time
+
+# JSON strings may contain raw control characters in some parsed documents
+decoder = json.JSONDecoder(strict=False)
+sentenceSeparator = re.compile(r'[.?!]\s*')
+
+
+class JsonStreamReader:
+    '''
+    Minimal incremental JSON reader over a text file, only the characters of the current value are kept in memory
+    Input: opened text file
+    '''
+
+    def __init__(self, infile, chunkSize=CHUNK_SIZE):
+        self.infile = infile
+        self.chunkSize = chunkSize
+        self.buf = ''
+        self.pos = 0
+
+    def fill(self):
+        '''
+        Read the next chunk of the file, characters already read are dropped
+        Output: False at the end of the file
+        '''
+        chunk = self.infile.read(self.chunkSize)
+        if not chunk:
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        '''
+        Skip white spaces
+        Output: next character (not consumed), None at the end of the file
+        '''
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in ' \t\r\n':
+                self.pos = self.pos + 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, character):
+        '''
+        Consume the next non white space character, which must be the given character
+        '''
+        if self.peek() != character:
+            raise ValueError('Expected ' + repr(character) + ' in JSON stream')
+        self.pos = self.pos + 1
+
+    def iterString(self):
+        '''
+        Decode the string starting at the current position (opening quote consumed) piece by piece
+        Output: generator of decoded pieces of the string
+        '''
+        while True:
+            # Look for the closing quote, i.e., preceded by an even number of backslashes
+            k = self.buf.find('"', self.pos)
+            while k != -1:
+                b = k - 1
+                while b >= self.pos and self.buf[b] == '\\':
+                    b = b - 1
+                if (k - 1 - b) % 2 == 0:
+                    break
+                k = self.buf.find('"', k + 1)
+
+            if k != -1:
+                piece = self.buf[self.pos:k]
+                self.pos = k + 1
+                if piece:
+                    yield decoder.decode('"' + piece + '"')
+                return
+
+            # String continues in next chunk: decode all complete escape sequences
+            piece, tail = splitEscapes(self.buf[self.pos:])
+            if piece:
+                yield decoder.decode('"' + piece + '"')
+            self.buf = tail
+            self.pos = 0
+            if not self.fill():
+                raise ValueError('Unterminated string in JSON stream')
+
+    def readValue(self):
+        '''
+        Decode the (small) value starting at the current position
+        Output: value
+        '''
+        self.peek()
+        while True:
+            try:
+                value, end = decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                # value incomplete in buffer
+                if not self.fill():
+                    raise
+                continue
+            # a number could continue in the next chunk
+            if end == len(self.buf) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+    def iterObjectKeys(self):
+        '''
+        Iterate over the keys of the object starting at the current position, the value of each key must be read (or
+        skipped) before asking for the next key
+        Output: generator of keys
+        '''
+        self.expect('{')
+        if self.peek() == '}':
+            self.pos = self.pos + 1
+            return
+        while True:
+            self.expect('"')
+            key = ''.join(self.iterString())
+            self.expect(':')
+            yield key
+            if self.peek() == ',':
+                self.pos = self.pos + 1
+            else:
+                self.expect('}')
+                return
+
+    def iterArray(self):
+        '''
+        Iterate over the values of the array starting at the current position
+        Output: generator of values
+        '''
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos = self.pos + 1
+            return
+        while True:
+            yield self.readValue()
+            if self.peek() == ',':
+                self.pos = self.pos + 1
+            else:
+                self.expect(']')
+                return
+
+
+def splitEscapes(raw):
+    '''
+    Split raw JSON string characters into a part ending with complete escape sequences and an incomplete tail
+    Input: raw characters of a JSON string
+    Output: complete part, incomplete tail
+    '''
+    p = len(raw)
+    i = raw.rfind('\\')
+    if i != -1 and isEscapeStart(raw, i):
+        escape = raw[i:]
+        if len(escape) < 2 or (escape[1] == 'u' and len(escape) < 6):
+            p = i
+
+    # a high surrogate needs the following low surrogate
+    if p >= 6 and raw[p - 6:p - 4] == '\\u' and isEscapeStart(raw, p - 6):
+        try:
+            if 0xD800 <= int(raw[p - 4:p], 16) <= 0xDBFF:
+                p = p - 6
+        except ValueError:
+            pass
+
+    return raw[:p], raw[p:]
+
+
+def isEscapeStart(raw, i):
+    '''
+    Check if the backslash at position i starts an escape sequence, i.e., is preceded by an even number of backslashes
+    Input: raw characters of a JSON string, position of a backslash
+    Output: True/False
+    '''
+    b = i - 1
+    while b >= 0 and raw[b] == '\\':
+        b = b - 1
+    return (i - 1 - b) % 2 == 0
+
+
+def streamJsonStringField(file, field='content'):
+    '''
+    Read the string value of a key of a .json object, piece by piece
+    Input: file path, key
+    Output: generator of decoded pieces of the value
+    '''
+    with open(file, 'r') as infile:
+        reader = JsonStreamReader(infile)
+        for key in reader.iterObjectKeys():
+            if key == field:
+                reader.expect('"')
+                for piece in reader.iterString():
+                    yield piece
+                return
+            reader.readValue()
+    raise KeyError(field)
+
+
+def streamSentences(file):
+    '''
+    Sentences of a parsed document, read incrementally
+    Input: .json file path, text stored under "content"
+    Output: generator of sentences
+    '''
+    partialLine = ''
+    for piece in streamJsonStringField(file, 'content'):
+        lines = (partialLine + piece).split('\n')
+        partialLine = lines.pop()
+        for line in lines:
+            for sentence in sentenceSeparator.split(line):
+                if sentence:
+                    yield sentence
+    for sentence in sentenceSeparator.split(partialLine):
+        if sentence:
+            yield sentence
+
+
+def streamTokenLists(file):
+    '''
+    Tokenized sentences of a pre-processed document, read incrementally
+    Input: .json file path (NLP pipeline output)
+    Output: generator of lists of tokens
+    '''
+    with open(file, 'r') as infile:
+        for tokens in JsonStreamReader(infile).iterArray():
+            yield tokens
+
+
+def writeTokenLists(tokenLists, file):
+    '''
+    Write tokenized sentences one by one, the file is identical to json.dump(list(tokenLists))
+    Input: iterable of lists of tokens, .json file path
+    Output: number of sentences written
+    '''
+    n = 0
+    with open(file, 'w') as outfile:
+        outfile.write('[')
+        for tokens in tokenLists:
+            if n:
+                outfile.write(', ')
+            outfile.write(json.dumps(tokens))
+            n = n + 1
+        outfile.write(']')
+    return n
+
+
+class CorpusSentences:
+    '''
+    Re-iterable stream of the tokenized sentences of all documents of a pre-processed corpus directory, only one
+    sentence is in memory at a time
+    Input: directory path
+    '''
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.documents = [f for f in listdir(directory) if isfile(join(directory, f))]
+
+    def __iter__(self):
+        for d in self.documents:
+            for tokens in streamTokenLists(join(self.directory, d)):
+                yield tokens
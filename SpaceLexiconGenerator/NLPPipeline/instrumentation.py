@@ -0,0 +1,241 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+instrumentation.py measures where the time of an NLP pipeline run goes, per step (tokenise, regex filters, acronyms,
+multiwords, stopwords, lemmatise...) and counts what the steps do (sentences, tokens, acronyms expanded...).
+
+- Metrics: timers (context managers, total seconds and number of calls per step) and counters, for one document
+- Instrumentation: Metrics of each document of a run and of the whole run, exported as .json or Prometheus text
+
+Instrumentation is disabled by default: the pipelines receive metrics=None and skip all measurements (no timer object
+created, no clock read). Use stepTimer where a branch per step would clutter the code, it returns a shared no-op
+timer when metrics is None.
+
+Usage:
+instrumentation = Instrumentation()
+applyNLPPipeline(inputPath, instrumentation=instrumentation)
+instrumentation.save('NLPMetrics.json')
+instrumentation.save('NLPMetrics.prom')
+'''
+
+import json
+import time
+
+from collections import OrderedDict
+
+
+class Timer:
+    '''
+    Context manager adding the time spent in its block to a timer of a Metrics
+    '''
+    __slots__ = ('timers', 'name', 'start')
+
+    def __init__(self, timers, name):
+        self.timers = timers
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        timer = self.timers.get(self.name)
+        if timer is None:
+            self.timers[self.name] = [elapsed, 1]
+        else:
+            timer[0] = timer[0] + elapsed
+            timer[1] = timer[1] + 1
+        return False
+
+
+class NoTimer:
+    '''
+    Context manager doing nothing, used when instrumentation is disabled
+    '''
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NO_TIMER = NoTimer()
+
+
+class Metrics:
+    '''
+    Timers and counters of one document (or of a run, once documents are merged)
+    timers: step -> [total seconds, number of calls], counters: name -> value
+    '''
+
+    def __init__(self, timers=None, counters=None):
+        self.timers = OrderedDict() if timers is None else timers
+        self.counters = OrderedDict() if counters is None else counters
+
+    def timer(self, name):
+        return Timer(self.timers, name)
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def merge(self, other):
+        '''
+        Add the timers and counters of another Metrics
+        '''
+        for name, (seconds, calls) in other.timers.items():
+            timer = self.timers.setdefault(name, [0.0, 0])
+            timer[0] = timer[0] + seconds
+            timer[1] = timer[1] + calls
+        for name, value in other.counters.items():
+            self.count(name, value)
+
+    def asDict(self):
+        '''
+        Output: {'timers': {step: {'seconds', 'calls'}}, 'counters': {name: value}}, picklable and .json serialisable
+        '''
+        return {'timers': OrderedDict((name, {'seconds': round(seconds, 6), 'calls': calls})
+                                      for name, (seconds, calls) in self.timers.items()),
+                'counters': OrderedDict(self.counters)}
+
+    @classmethod
+    def fromDict(cls, d):
+        return cls(OrderedDict((name, [t['seconds'], t['calls']]) for name, t in d['timers'].items()),
+                   OrderedDict(d['counters']))
+
+
+def stepTimer(metrics, name):
+    '''
+    Input: Metrics or None (instrumentation disabled), step name
+    Output: timer of the step, no-op timer if metrics is None
+    '''
+    if metrics is None:
+        return NO_TIMER
+    return metrics.timer(name)
+
+
+def timedIterator(iterable, metrics, name):
+    '''
+    Time the production of each item of an iterable (e.g., sentences read from a document), as one step
+    Input: iterable, Metrics, step name
+    Output: generator of the items
+    '''
+    iterator = iter(iterable)
+    while True:
+        with metrics.timer(name):
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+        yield item
+
+
+class Instrumentation:
+    '''
+    Metrics of an NLP pipeline run, aggregated per document and for the whole run
+    Input: name of the pipeline, used in exported metrics names
+    '''
+
+    def __init__(self, pipeline='nlp_pipeline'):
+        self.pipeline = pipeline
+        self.documents = OrderedDict()
+        self.run = Metrics()
+        self.start = time.perf_counter()
+
+    def newDocument(self):
+        '''
+        Output: empty Metrics, to fill while processing a document and to add with addDocument
+        '''
+        return Metrics()
+
+    def addDocument(self, name, metrics):
+        '''
+        Add the metrics of a processed document to the run
+        Input: document name, Metrics (or its asDict form, e.g., returned by a worker process)
+        '''
+        if isinstance(metrics, dict):
+            metrics = Metrics.fromDict(metrics)
+        if name in self.documents:
+            self.documents[name].merge(metrics)
+        else:
+            self.documents[name] = metrics
+        self.run.merge(metrics)
+
+    def asDict(self):
+        '''
+        Output: run metrics, steps share of the measured time, documents metrics
+        '''
+        run = self.run.asDict()
+        measured = sum(seconds for (seconds, calls) in self.run.timers.values())
+        share = OrderedDict((name, round(seconds / measured, 4) if measured else 0.0)
+                            for name, (seconds, calls) in sorted(self.run.timers.items(), key=lambda t: -t[1][0]))
+        return {'pipeline': self.pipeline,
+                'wallTime': round(time.perf_counter() - self.start, 6),
+                'documents': len(self.documents),
+                'run': run,
+                'stepsShare': share,
+                'perDocument': OrderedDict((name, metrics.asDict()) for name, metrics in self.documents.items())}
+
+    def toPrometheus(self):
+        '''
+        Output: run metrics in Prometheus text exposition format (per document metrics are only exported as .json, to
+        keep the number of series bounded)
+        '''
+        prefix = self.pipeline
+        timers = self.run.timers.items()
+        lines = ['# HELP ' + prefix + '_step_seconds_total Time spent per step.',
+                 '# TYPE ' + prefix + '_step_seconds_total counter']
+        lines += [prefix + '_step_seconds_total' + labels('step', name) + ' ' + repr(round(seconds, 6))
+                  for name, (seconds, calls) in timers]
+        lines += ['# HELP ' + prefix + '_step_calls_total Number of times each step ran.',
+                  '# TYPE ' + prefix + '_step_calls_total counter']
+        lines += [prefix + '_step_calls_total' + labels('step', name) + ' ' + str(calls)
+                  for name, (seconds, calls) in timers]
+        lines += ['# HELP ' + prefix + '_events_total Counters (sentences, tokens, replacements...).',
+                  '# TYPE ' + prefix + '_events_total counter']
+        lines += [prefix + '_events_total' + labels('counter', name) + ' ' + str(value)
+                  for name, value in self.run.counters.items()]
+        lines += ['# HELP ' + prefix + '_documents Number of documents processed.',
+                  '# TYPE ' + prefix + '_documents gauge',
+                  prefix + '_documents ' + str(len(self.documents))]
+        return '\n'.join(lines) + '\n'
+
+    def save(self, file):
+        '''
+        Export metrics, Prometheus text if the file extension is .prom, .json otherwise
+        Input: file path
+        '''
+        with open(file, 'w', encoding="utf-8") as outfile:
+            if file.endswith('.prom'):
+                outfile.write(self.toPrometheus())
+            else:
+                json.dump(self.asDict(), outfile, indent=1)
+        return
+
+    def summary(self):
+        '''
+        Print the time spent per step over the run, most expensive step first
+        '''
+        measured = sum(seconds for (seconds, calls) in self.run.timers.values()) or 1
+        print('NLP pipeline steps over', len(self.documents), 'documents:')
+        for name, (seconds, calls) in sorted(self.run.timers.items(), key=lambda t: -t[1][0]):
+            print('  ', name, ':', round(seconds, 3), 's', '(' + str(round(100 * seconds / measured, 1)) + '%)')
+        for name, value in self.run.counters.items():
+            print('  ', name, ':', value)
+
+
+def labels(key, value):
+    '''
+    Prometheus label of a metric
+    Input: label key and value
+    Output: label string, e.g., {step="tokenise"}
+    '''
+    value = value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + key + '="' + value + '"}'
@@ -0,0 +1,85 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+multiwordMatcher.py identifies multiwords (e.g., ECSS glossary terms) in a list of tokens with a token-level trie.
+A sentence is read once, from left to right: at each position the longest known multiword starting there is replaced
+by its '_' joined form, e.g., ['attitude', 'control', 'system'] -> ['attitude_control_system'], and reading resumes
+after the match. The cost depends on the sentence length (times the longest multiword length), not on the number of
+multiwords in the glossary.
+'''
+
+# Trie node key marking the end of a multiword, cannot collide with a token
+END = None
+
+
+class MultiwordMatcher:
+    '''
+    Token-level trie of multiwords
+    Input: list of tokenized multiwords, e.g., [['attitude', 'control'], ['attitude', 'control', 'system']]
+    '''
+
+    def __init__(self, multiwords=()):
+        self.root = {}
+        self.size = 0
+        self.maxLength = 0
+        for multiword in multiwords:
+            self.add(multiword)
+
+    def __len__(self):
+        return self.size
+
+    def add(self, multiword):
+        '''
+        Add a tokenized multiword to the trie, single tokens are ignored
+        Input: list of tokens
+        '''
+        multiword = list(multiword)
+        if len(multiword) < 2:
+            return
+        node = self.root
+        for token in multiword:
+            node = node.setdefault(token, {})
+        if END not in node:
+            node[END] = '_'.join(multiword)
+            self.size = self.size + 1
+            self.maxLength = max(self.maxLength, len(multiword))
+
+    def replace(self, tokens):
+        '''
+        Replace every occurrence of the known multiwords in a list of tokens, longest match first
+        Input: list of tokens
+        Output: new list of tokens including multiwords, list of multiwords found (one item per occurrence)
+        '''
+        root = self.root
+        newTokens = []
+        found = []
+        i = 0
+        n = len(tokens)
+
+        while i < n:
+            node = root.get(tokens[i])
+            match = None
+            j = i + 1
+            while node is not None:
+                if END in node:
+                    match = node[END]
+                    end = j
+                if j == n:
+                    break
+                node = node.get(tokens[j])
+                j = j + 1
+
+            if match is None:
+                newTokens.append(tokens[i])
+                i = i + 1
+            else:
+                newTokens.append(match)
+                found.append(match)
+                i = end
+
+        return newTokens, found
@@ -0,0 +1,87 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+pipelineManifest.py records what the NLP pipeline outputs were generated from, to only reprocess new or changed
+documents (incremental mode of applyNLPPipeline).
+
+The manifest is a .json file:
+{'configKey': hash of the pipeline resources and configuration,
+ 'documents': {source document (path + name): {'sourceHash': hash of the source document,
+                                               'output': NLP pipeline output file name,
+                                               'MW': multi words replaced in document and their count,
+                                               'Acc': acronyms replaced in document and their count,
+                                               'boilerplateHash': hash of the boilerplate sentences removed from the
+                                               document, only if its corpus is filtered (see boilerplateFilter.py)}}}
+'''
+
+import hashlib
+import json
+import os
+
+
+def fileHash(file):
+    '''
+    Hash of a file content
+    Input: file path
+    Output: hexadecimal hash
+    '''
+    h = hashlib.sha1()
+    with open(file, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    return h.hexdigest()
+
+
+def configKey(resourcesKey, config):
+    '''
+    Hash of the pipeline resources and configuration, outputs generated with another key are all reprocessed
+    Input: PipelineResources key, dictionary of configuration parameters affecting the outputs
+    Output: hexadecimal hash
+    '''
+    h = hashlib.sha1()
+    h.update(resourcesKey.encode('utf-8'))
+    h.update(json.dumps(config, sort_keys=True).encode('utf-8'))
+    return h.hexdigest()
+
+
+def newManifest(key):
+    '''
+    Empty manifest
+    Input: configuration key
+    Output: manifest
+    '''
+    return {'configKey': key, 'documents': {}}
+
+
+def loadManifest(manifestFile):
+    '''
+    Load a manifest, an empty manifest is returned if the file does not exist or cannot be read
+    Input: manifest file path
+    Output: manifest
+    '''
+    if os.path.isfile(manifestFile):
+        try:
+            with open(manifestFile, 'r', encoding="utf-8") as infile:
+                manifest = json.load(infile)
+            if 'configKey' in manifest and 'documents' in manifest:
+                return manifest
+        except ValueError:
+            pass
+    return newManifest(None)
+
+
+def saveManifest(manifest, manifestFile):
+    '''
+    Save a manifest, the previous manifest is only replaced once the new one is completely written
+    Input: manifest, manifest file path
+    '''
+    tmpFile = manifestFile + '.tmp'
+    with open(tmpFile, 'w', encoding="utf-8") as outfile:
+        json.dump(manifest, outfile, indent=1)
+    os.replace(tmpFile, manifestFile)
+    return
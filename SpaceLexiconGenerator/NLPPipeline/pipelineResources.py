@@ -0,0 +1,145 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+pipelineResources.py gathers the resources shared by all documents processed by the NLP pipeline: stop words set,
+acronyms dictionary and expander, ECSS multi words and their matcher. The resources are built once per run and saved
+as a binary (pickle) cache, keyed by the hash of the input files, so that warm runs skip the NLTK tokenisation of the
+resource files.
+'''
+
+import hashlib
+import pickle
+import os
+import nltk
+
+from nltk.tokenize import word_tokenize
+from nltk.corpus import stopwords
+from NLPPipeline.multiwordMatcher import MultiwordMatcher
+from NLPPipeline.acronymExpander import AcronymExpander, readAcronyms
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+
+# Increment when the content of PipelineResources changes, invalidates previous caches
+CACHE_VERSION = 3
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                 INPUT FILES
+# ----------------------------------------------------------------------------------------------------------------------
+# Stop words: punctuation, common words, manually validated extra common words -specific to study corpora
+stopwordsFiles = [parentDir + '/NLPPipeline/NLPInputs/non_character_words.txt',
+                  parentDir + '/NLPPipeline/NLPInputs/common_words.txt',
+                  parentDir + '/NLPPipeline/NLPInputs/corpora_common_words.txt']
+
+# Acronyms list, manually defined and validated
+acronymsFile = parentDir + '/NLPPipeline/NLPInputs/acronyms.txt'
+
+# ECSS multiwords + additional validated terms
+multiwordsFiles = [parentDir + '/NLPPipeline/NLPInputs/ecss_2grams.txt',
+                   parentDir + '/NLPPipeline/NLPInputs/ecss_3grams.txt',
+                   parentDir + '/NLPPipeline/NLPInputs/ecss_4grams.txt',
+                   parentDir + '/NLPPipeline/NLPInputs/ecss_5grams.txt',
+                   parentDir + '/NLPPipeline/NLPInputs/ecss_6grams.txt',
+                   parentDir + '/NLPPipeline/NLPInputs/ecss_9grams.txt',
+                   parentDir + '/NLPPipeline/NLPInputs/spacemissiondesign_ngrams.txt']
+
+cacheFile = parentDir + '/NLPPipeline/cache/pipelineResources.pkl'
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                 RESOURCES
+# ----------------------------------------------------------------------------------------------------------------------
+class PipelineResources:
+    '''
+    Resources of the NLP pipeline, built once per run
+    stopset: frozenset of English stop words, punctuation, common words and corpora common words
+    acronyms: dictionary of acronyms and their expansion, e.g., 'AC': ['alternating_current']
+    acronymExpander: AcronymExpander built from acronyms
+    multiwords: list of tokenized ECSS multiwords + additional validated terms
+    multiwordMatcher: MultiwordMatcher (token trie) built from multiwords
+    key: hash of the input files the resources were built from
+    '''
+
+    def __init__(self, stopset, acronyms, multiwords, key):
+        self.stopset = stopset
+        self.acronyms = acronyms
+        self.acronymExpander = AcronymExpander(acronyms)
+        self.multiwords = multiwords
+        self.multiwordMatcher = MultiwordMatcher(multiwords)
+        self.key = key
+
+
+def resourcesKey(files):
+    '''
+    Hash of the resources input files, NLTK version and cache version, identifies a valid cache
+    Input: list of input files
+    Output: hexadecimal hash
+    '''
+    h = hashlib.sha1()
+    h.update(str(CACHE_VERSION).encode('utf-8'))
+    h.update(nltk.__version__.encode('utf-8'))
+    for file in files:
+        with open(file, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+
+def buildPipelineResources(key):
+    '''
+    Read and tokenize the resources input files
+    Input: hash of the input files
+    Output: PipelineResources
+    '''
+
+    # Stop words
+    stopset = set(stopwords.words('english'))
+    for file in stopwordsFiles:
+        with open(file, encoding="utf-8") as inputFile:
+            stopset.update(word_tokenize(inputFile.read()))
+
+    # Acronyms, expansions joined as one token, e.g., 'alternating_current'
+    acronyms = readAcronyms(acronymsFile, separator=' | ', joinExpansion=True)
+
+    # Multiwords
+    multiwords = []
+    for file in multiwordsFiles:
+        with open(file, 'r') as inputFile:
+            words = inputFile.read().split('\n')
+            words = [x for x in words if x]
+            for w in words:
+                multiwords.append(word_tokenize(w))
+
+    return PipelineResources(frozenset(stopset), acronyms, multiwords, key)
+
+
+def loadPipelineResources(useCache=True):
+    '''
+    Load the NLP pipeline resources from the binary cache if the input files have not changed since the cache was
+    saved, otherwise build the resources and update the cache
+    Input: useCache, if False resources are always rebuilt
+    Output: PipelineResources
+    '''
+    key = resourcesKey(stopwordsFiles + [acronymsFile] + multiwordsFiles)
+
+    if useCache and os.path.isfile(cacheFile):
+        try:
+            with open(cacheFile, 'rb') as f:
+                resources = pickle.load(f)
+            if resources.key == key:
+                return resources
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            pass
+
+    resources = buildPipelineResources(key)
+
+    if useCache:
+        os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+        with open(cacheFile, 'wb') as f:
+            pickle.dump(resources, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return resources
@@ -0,0 +1,535 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+preprocessingCore.py is the preprocessing engine shared by the three toolboxes, one step profile per toolbox:
+
+- 'lexicon': Space Lexicon Generator NLP pipeline (NLP_Pipeline.py), applied per sentence
+- 'topic': Topic Modeling NLP pipeline (TopicModeling/NLPpipeline.py, NLPPipe), applied per document
+- 'requirements': requirements pre-processing of EngineeringModelsMigration/assessMissionSimilarity.py
+
+A profile is an ordered list of steps (see STEPS and PROFILES):
+- token steps transform one token at a time (e.g., strip, removeUrls, acronyms, lemmatise), consecutive token steps
+  are fused into one function memoised per token (bounded LRU cache), since the same tokens keep coming back
+- sequence steps need the whole list of tokens (multiwords, collocations)
+
+The tokenizer is selectable (see TOKENIZERS): 'nltk' (word_tokenize, default), 'regex' (regexTokenizer.py, faster,
+tokens almost identical, see Benchmarks/tokenizerAccuracy.py) or 'spacy' (spacyBackend.py, optional, texts tokenized
+and lemmatised in batches by processBatch).
+
+The outputs of each profile are identical to the step by step list comprehensions of the pipeline it replaces.
+When instrumentation is enabled (metrics given, see instrumentation.py), the steps are applied one at a time to the
+whole list of tokens instead, each step being timed, with the same outputs.
+
+Usage:
+preprocessor = loadPreprocessor('topic')
+tokens = preprocessor.process(text)
+'''
+
+import os
+import re
+
+from functools import lru_cache
+from nltk import collocations
+from nltk.collocations import BigramCollocationFinder, TrigramCollocationFinder
+from nltk.corpus import stopwords
+from nltk.stem import WordNetLemmatizer
+from nltk.tokenize import word_tokenize
+from NLPPipeline.acronymExpander import AcronymExpander, readAcronyms
+from NLPPipeline.instrumentation import timedIterator
+from NLPPipeline.multiwordMatcher import MultiwordMatcher
+from NLPPipeline.pipelineResources import loadPipelineResources, resourcesKey
+from NLPPipeline.regexTokenizer import regexTokenize
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+repositoryDir = os.path.dirname(parentDir)  # Directory of the three toolboxes
+
+# Precompiled patterns
+hasLetter = re.compile('[a-zA-Z]').search
+hasDigit = re.compile('[0-9]').search
+urlPattern = re.compile(r'www.*[\r\n]*')
+nonWordPattern = re.compile('[^A-Za-z0-9_\-/]+')
+percentPathPattern = re.compile('/%').search
+trailingUnderscorePattern = re.compile('_$')
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                 STEPS AND PROFILES
+# ----------------------------------------------------------------------------------------------------------------------
+TOKEN = 'token'  # token -> token, None if the token is removed
+EXPAND = 'expand'  # token -> list of tokens (acronyms expansion), None if the token is kept as is
+SEQUENCE = 'sequence'  # list of tokens -> list of tokens
+
+# step name: (kind, metric name used when instrumented)
+STEPS = {'strip': (TOKEN, 'regexFilters'),
+         'requireLetter': (TOKEN, 'regexFilters'),
+         'rejectDigit': (TOKEN, 'regexFilters'),
+         'rejectLatex': (TOKEN, 'regexFilters'),
+         'rejectPercentPath': (TOKEN, 'regexFilters'),
+         'removeUrls': (TOKEN, 'regexFilters'),
+         'removeNonWord': (TOKEN, 'regexFilters'),
+         'rejectPunctuation': (TOKEN, 'regexFilters'),
+         'wikiClean': (TOKEN, 'regexFilters'),
+         'hyphenToUnderscore': (TOKEN, 'regexFilters'),
+         'rejectEmpty': (TOKEN, 'regexFilters'),
+         'lowercase': (TOKEN, 'lowercase'),
+         'acronyms': (EXPAND, 'acronyms'),
+         'multiwords': (SEQUENCE, 'multiwords'),
+         'collocations': (SEQUENCE, 'collocations'),
+         'stopwords': (TOKEN, 'stopwords'),
+         'lemmatise': (TOKEN, 'lemmatise'),
+         'minLength': (TOKEN, 'stopwords')}
+
+# lowercaseText: the whole text is lower cased before tokenization
+PROFILES = {'lexicon': {'lowercaseText': False,
+                        'steps': ['strip', 'requireLetter', 'rejectDigit', 'removeUrls', 'removeNonWord', 'rejectEmpty',
+                                  'acronyms', 'lowercase', 'multiwords', 'stopwords', 'lemmatise', 'stopwords',
+                                  'minLength']},
+            'topic': {'lowercaseText': True,
+                      'steps': ['strip', 'requireLetter', 'rejectLatex', 'removeUrls', 'removeNonWord',
+                                'rejectPunctuation', 'wikiClean', 'rejectEmpty', 'acronyms', 'multiwords',
+                                'stopwords', 'collocations', 'stopwords', 'lemmatise']},
+            'requirements': {'lowercaseText': False,
+                             'steps': ['strip', 'rejectPercentPath', 'rejectEmpty', 'hyphenToUnderscore', 'lowercase',
+                                       'multiwords', 'stopwords']}}
+
+# Tokenizer backends: name -> function, text -> list of tokens ('spacy': SpacyBackend, loaded when used)
+TOKENIZERS = {'nltk': word_tokenize,
+              'regex': regexTokenize,
+              'spacy': None}
+
+# nlp.pipe settings of the spaCy backend: texts per batch, processes (keep 1 when the documents are already spread over
+# workers), defaults of spacyBackend.py
+SPACY_BATCH_SIZE = 1000
+SPACY_PROCESSES = 1
+
+# Resources already loaded and preprocessors already built in this process
+loadedResources = {}
+loadedPreprocessors = {}
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                 RESOURCES
+# ----------------------------------------------------------------------------------------------------------------------
+# Topic Modeling input files
+topicInputs = repositoryDir + '/TopicModeling/inputs4NLP/'
+topicPunctuationFile = topicInputs + 'non_character_words.txt'
+topicCommonWordsFile = topicInputs + 'wiki_common_words.txt'
+topicAcronymsFile = topicInputs + 'acronyms.txt'
+topicMultiwordsFiles = [topicInputs + 'ecss_2grams.txt',
+                        topicInputs + 'ecss_3grams.txt',
+                        topicInputs + 'ecss_4grams.txt',
+                        topicInputs + 'ecss_6grams.txt',
+                        topicInputs + 'ecss_9grams.txt',
+                        topicInputs + 'spacemissiondesign_ngrams.txt']
+
+# Requirements: punctuation of the Space Lexicon Generator, ECSS multiwords of the Space Lexicon Generator resources
+requirementsPunctuationFile = parentDir + '/NLPPipeline/NLPInputs/non_character_words.txt'
+
+
+class ProfileResources:
+    '''
+    Resources of a preprocessing profile, same attributes as PipelineResources (resources of the 'lexicon' profile)
+    stopset: frozenset of stop words, punctuation: frozenset of punctuation tokens, acronyms: dictionary of acronyms
+    and their expansion, multiwordMatcher: MultiwordMatcher, key: hash of the input files
+    '''
+
+    def __init__(self, stopset, punctuation, acronyms, multiwords, key):
+        self.stopset = stopset
+        self.punctuation = punctuation
+        self.acronyms = acronyms
+        self.acronymExpander = AcronymExpander(acronyms)
+        self.multiwords = multiwords
+        self.multiwordMatcher = MultiwordMatcher(multiwords)
+        self.key = key
+
+
+def readTokens(file):
+    '''
+    Input: text file path
+    Output: list of tokens of the file
+    '''
+    with open(file, encoding="utf-8") as inputFile:
+        return word_tokenize(inputFile.read())
+
+
+def readMultiwords(files):
+    '''
+    Input: multiwords files, one multiword per line
+    Output: list of tokenized multiwords
+    '''
+    multiwords = []
+    for file in files:
+        with open(file, 'r') as inputFile:
+            words = inputFile.read().split('\n')
+            words = [x for x in words if x]
+            for w in words:
+                multiwords.append(word_tokenize(w))
+    return multiwords
+
+
+def buildTopicResources():
+    '''
+    Output: ProfileResources of the 'topic' profile, stop words: English, punctuation and wiki common words
+    '''
+    punctuation = readTokens(topicPunctuationFile)
+    stopset = set(stopwords.words('english'))
+    stopset.update(punctuation)
+    stopset.update(readTokens(topicCommonWordsFile))
+    acronyms = readAcronyms(topicAcronymsFile, separator=', ', joinExpansion=False)
+    key = resourcesKey([topicPunctuationFile, topicCommonWordsFile, topicAcronymsFile] + topicMultiwordsFiles)
+    return ProfileResources(frozenset(stopset), frozenset(punctuation), acronyms,
+                            readMultiwords(topicMultiwordsFiles), key)
+
+
+def buildRequirementsResources():
+    '''
+    Output: ProfileResources of the 'requirements' profile, stop words: English and punctuation
+    '''
+    punctuation = readTokens(requirementsPunctuationFile)
+    lexiconResources = loadProfileResources('lexicon')
+    stopset = set(stopwords.words('english'))
+    stopset.update(punctuation)
+    key = resourcesKey([requirementsPunctuationFile]) + lexiconResources.key
+    resources = ProfileResources(frozenset(stopset), frozenset(punctuation), {}, [], key)
+    resources.multiwords = lexiconResources.multiwords
+    resources.multiwordMatcher = lexiconResources.multiwordMatcher
+    return resources
+
+
+def loadProfileResources(profile):
+    '''
+    Resources of a profile, loaded once per process ('lexicon': PipelineResources, from its binary cache)
+    Input: profile name
+    Output: PipelineResources or ProfileResources
+    '''
+    if profile not in loadedResources:
+        if profile == 'lexicon':
+            loadedResources[profile] = loadPipelineResources()
+        elif profile == 'topic':
+            loadedResources[profile] = buildTopicResources()
+        elif profile == 'requirements':
+            loadedResources[profile] = buildRequirementsResources()
+        else:
+            raise ValueError('Unknown preprocessing profile ' + str(profile) + ', profiles: ' + ', '.join(PROFILES))
+    return loadedResources[profile]
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                 SEQUENCE STEPS
+# ----------------------------------------------------------------------------------------------------------------------
+def replaceCollocations(tokens):
+    '''
+    Find new multiwords with NLTK collocations (5 best trigrams then 3 best bigrams, likelihood ratio, appearing at
+    least 10 times) and replace every occurrence
+    Input: list of tokens
+    Output: new list of tokens including collocations
+    '''
+    # Trigrams
+    finder = TrigramCollocationFinder.from_words(tokens)
+    finder.apply_freq_filter(10)
+    trigrams = finder.nbest(collocations.TrigramAssocMeasures().likelihood_ratio, 5)
+    if trigrams:
+        tokens, found = MultiwordMatcher(trigrams).replace(tokens)
+
+    # Bigrams
+    finder = BigramCollocationFinder.from_words(tokens)
+    finder.apply_freq_filter(10)
+    bigrams = finder.nbest(collocations.BigramAssocMeasures().likelihood_ratio, 3)
+    if bigrams:
+        tokens, found = MultiwordMatcher(bigrams).replace(tokens)
+
+    return tokens
+
+# ----------------------------------------------------------------------------------------------------------------------
+#                                                 PREPROCESSOR
+# ----------------------------------------------------------------------------------------------------------------------
+class Preprocessor:
+    '''
+    Preprocessing engine of a profile
+    Input: profile name, resources of the profile (stopset, punctuation, acronyms, multiwordMatcher, key), cacheSize:
+    maximum number of tokens memoised per fused token steps, tokenizer backend ('nltk', 'regex' or 'spacy', see
+    TOKENIZERS), texts per nlp.pipe batch and processes used by nlp.pipe (spaCy backend only)
+    '''
+
+    def __init__(self, profile, resources, cacheSize=2 ** 17, tokenizer='nltk', spacyBatchSize=SPACY_BATCH_SIZE,
+                 spacyProcesses=SPACY_PROCESSES):
+        if profile not in PROFILES:
+            raise ValueError('Unknown preprocessing profile ' + str(profile) + ', profiles: ' + ', '.join(PROFILES))
+        if tokenizer not in TOKENIZERS:
+            raise ValueError('Unknown tokenizer ' + str(tokenizer) + ', tokenizers: ' + ', '.join(TOKENIZERS))
+        self.profile = profile
+        self.resources = resources
+        self.tokenizer = tokenizer
+        self.spacyBackend = None
+        if tokenizer == 'spacy':
+            # optional dependency, only imported when used
+            from NLPPipeline.spacyBackend import loadSpacyBackend
+            self.spacyBackend = loadSpacyBackend(batchSize=spacyBatchSize, nProcess=spacyProcesses)
+            self.tokenizerFunction = self.spacyBackend.tokenize
+        else:
+            self.tokenizerFunction = TOKENIZERS[tokenizer]
+        self.lowercaseText = PROFILES[profile]['lowercaseText']
+        self.steps = PROFILES[profile]['steps']
+        self.stepFunctions = self.buildStepFunctions(resources, cacheSize)
+
+        # Lemmas given by the spaCy pipeline depend on the text: lemmatisation becomes a sequence step
+        self.stepKinds = {name: STEPS[name][0] for name in self.steps}
+        if self.spacyBackend is not None and self.spacyBackend.contextLemmas and 'lemmatise' in self.stepKinds:
+            self.stepKinds['lemmatise'] = SEQUENCE
+
+        # Fused and memoised token steps, sequence steps in between
+        self.segments = []
+        chain = []
+        for name in self.steps:
+            kind = self.stepKinds[name]
+            if kind == SEQUENCE:
+                if chain:
+                    self.segments.append((TOKEN, self.fuse(chain, cacheSize)))
+                    chain = []
+                self.segments.append((SEQUENCE, self.stepFunctions[name]))
+            else:
+                chain.append((kind, self.stepFunctions[name]))
+        if chain:
+            self.segments.append((TOKEN, self.fuse(chain, cacheSize)))
+
+        # Token steps memoised one by one, for the instrumented mode
+        self.instrumentedSteps = []
+        for name in self.steps:
+            kind, metric = self.stepKinds[name], STEPS[name][1]
+            function = self.stepFunctions[name]
+            if kind != SEQUENCE:
+                function = lru_cache(maxsize=cacheSize)(function)
+            self.instrumentedSteps.append((name, kind, metric, function))
+
+    def buildStepFunctions(self, resources, cacheSize):
+        '''
+        Input: resources of the profile, cache size of the WordNet lemmatizer used with spaCy lemmas
+        Output: dictionary of step functions, token steps: token -> token, sequence steps: (tokens, list of multi
+        words replacements, lemmas of the text or None) -> tokens
+        '''
+        stopset = resources.stopset
+        punctuation = getattr(resources, 'punctuation', frozenset())
+        acronyms = resources.acronyms
+        multiwordMatcher = resources.multiwordMatcher
+        lemmatizer = WordNetLemmatizer()
+
+        def removeDigits(token):
+            return ''.join(s for s in token if not s.isdigit())
+
+        def wikiClean(token):
+            # Additional cleaning - for wikipedia
+            token = token.replace("'", "")
+            token = token.replace("\\", "")
+            token = token.replace("title=", "")
+            token = trailingUnderscorePattern.sub('', token)
+            token = token.replace('-', '_')
+            return removeDigits(token)
+
+        def replaceMultiwords(tokens, listReplacementMW, lemmas):
+            tokens, found = multiwordMatcher.replace(tokens)
+            listReplacementMW.extend(found)
+            return tokens
+
+        # Lemmatisation: WordNet, spaCy lookup table or lemmas of the text given by the spaCy pipeline (WordNet for the
+        # tokens spaCy did not see, e.g., multiwords)
+        lemmatise = lemmatizer.lemmatize
+        if self.spacyBackend is not None and self.spacyBackend.lemmatize is not None:
+            lemmatise = self.spacyBackend.lemmatize
+        elif self.spacyBackend is not None and self.spacyBackend.contextLemmas:
+            wordnetLemmatize = lru_cache(maxsize=cacheSize)(lemmatizer.lemmatize)
+
+            def lemmatise(tokens, listReplacementMW, lemmas):
+                if not lemmas:
+                    return [wordnetLemmatize(t) for t in tokens]
+                return [lemmas.get(t) or wordnetLemmatize(t) for t in tokens]
+
+        return {'strip': str.strip,
+                'requireLetter': lambda token: token if hasLetter(token) else None,
+                'rejectDigit': lambda token: None if hasDigit(token) else token,
+                'rejectLatex': lambda token: None if token in ('\\mathbf', '\\displaystyle') else token,
+                'rejectPercentPath': lambda token: None if percentPathPattern(token) else token,
+                'removeUrls': lambda token: urlPattern.sub('', token),
+                'removeNonWord': lambda token: nonWordPattern.sub('', token),
+                'rejectPunctuation': lambda token: None if token in punctuation else token,
+                'wikiClean': wikiClean,
+                'hyphenToUnderscore': lambda token: token.replace('-', '_'),
+                'rejectEmpty': lambda token: token if token else None,
+                'lowercase': str.lower,
+                'acronyms': acronyms.get,
+                'multiwords': replaceMultiwords,
+                'collocations': lambda tokens, listReplacementMW, lemmas: replaceCollocations(tokens),
+                'stopwords': lambda token: None if token in stopset else token,
+                'lemmatise': lemmatise,
+                'minLength': lambda token: token if len(token) > 2 else None}
+
+    @staticmethod
+    def fuse(chain, cacheSize):
+        '''
+        Fuse consecutive token steps into one function memoised per token
+        Input: list of (kind, step function), cache size
+        Output: function, token -> (tuple of output tokens, tuple of acronyms expanded or None)
+        '''
+        def fused(token):
+            tokens = [token]
+            found = []
+            for kind, function in chain:
+                if kind == TOKEN:
+                    tokens = [t for t in map(function, tokens) if t is not None]
+                else:
+                    expanded = []
+                    for t in tokens:
+                        expansion = function(t)
+                        if expansion is None:
+                            expanded.append(t)
+                        else:
+                            expanded.extend(expansion)
+                            found.append(t)
+                    tokens = expanded
+                if not tokens:
+                    break
+            return tuple(tokens), (tuple(found) if found else None)
+
+        return lru_cache(maxsize=cacheSize)(fused)
+
+    def tokenize(self, text):
+        '''
+        Input: text (sentence or document)
+        Output: list of tokens
+        '''
+        if self.lowercaseText:
+            text = text.lower()
+        return self.tokenizerFunction(text)
+
+    def normalise(self, tokens, listReplacementMW=None, listReplacementAcc=None, metrics=None, lemmas=None):
+        '''
+        Apply the profile steps to tokens
+        Input: tokens, lists of all multi words and acronyms replacements done so far (optional), Metrics to time each
+        step (None: instrumentation disabled), lemmas of the text given by the spaCy pipeline (optional)
+        Output: normalised tokens, new replacements done added to lists
+        '''
+        if listReplacementMW is None:
+            listReplacementMW = []
+        if listReplacementAcc is None:
+            listReplacementAcc = []
+        if metrics is not None:
+            return self.normaliseSteps(tokens, listReplacementMW, listReplacementAcc, metrics, lemmas)
+
+        for kind, function in self.segments:
+            if kind == SEQUENCE:
+                tokens = function(tokens, listReplacementMW, lemmas)
+                continue
+            output = []
+            for token in tokens:
+                newTokens, found = function(token)
+                if newTokens:
+                    output.extend(newTokens)
+                if found is not None:
+                    listReplacementAcc.extend(found)
+            tokens = output
+
+        return tokens
+
+    def normaliseSteps(self, tokens, listReplacementMW, listReplacementAcc, metrics, lemmas=None):
+        '''
+        Apply the profile steps one at a time to all tokens, each step being timed, same output as normalise
+        Input: tokens, lists of all multi words and acronyms replacements done so far, Metrics, lemmas of the text
+        (optional)
+        Output: normalised tokens, new replacements done added to lists
+        '''
+        metrics.count('tokens', len(tokens))
+        numberOfMW = len(listReplacementMW)
+        numberOfAcc = len(listReplacementAcc)
+
+        for name, kind, metric, function in self.instrumentedSteps:
+            with metrics.timer(metric):
+                if kind == TOKEN:
+                    tokens = [t for t in map(function, tokens) if t is not None]
+                elif kind == EXPAND:
+                    expanded = []
+                    for t in tokens:
+                        expansion = function(t)
+                        if expansion is None:
+                            expanded.append(t)
+                        else:
+                            expanded.extend(expansion)
+                            listReplacementAcc.append(t)
+                    tokens = expanded
+                else:
+                    tokens = function(tokens, listReplacementMW, lemmas)
+
+        metrics.count('acronymsExpanded', len(listReplacementAcc) - numberOfAcc)
+        metrics.count('multiwordsReplaced', len(listReplacementMW) - numberOfMW)
+        metrics.count('tokensKept', len(tokens))
+        return tokens
+
+    def process(self, text, listReplacementMW=None, listReplacementAcc=None, metrics=None):
+        '''
+        Tokenize and normalise a text
+        Input: text, lists of all multi words and acronyms replacements done so far (optional), Metrics (optional)
+        Output: normalised tokens, new replacements done added to lists
+        '''
+        if metrics is None:
+            tokens, lemmas = self.analyse(text)
+        else:
+            with metrics.timer('tokenise'):
+                tokens, lemmas = self.analyse(text)
+        return self.normalise(tokens, listReplacementMW, listReplacementAcc, metrics, lemmas)
+
+    def analyse(self, text):
+        '''
+        Input: text (sentence or document)
+        Output: list of tokens, lemmas of the text given by the spaCy pipeline (None with the other tokenizers)
+        '''
+        if self.spacyBackend is None:
+            return self.tokenize(text), None
+        if self.lowercaseText:
+            text = text.lower()
+        return self.spacyBackend.process(text)
+
+    def processBatch(self, texts, listReplacementMW=None, listReplacementAcc=None, metrics=None):
+        '''
+        Tokenize and normalise texts, with the spaCy backend the texts are tokenized in batches (nlp.pipe), one at a
+        time otherwise. With the spaCy backend, the 'tokenise' timer includes the time spent reading the texts.
+        Input: iterable of texts, lists of all multi words and acronyms replacements done so far (optional), Metrics
+        (optional)
+        Output: generator of normalised tokens per text (empty lists included), in texts order, new replacements done
+        added to lists
+        '''
+        if listReplacementMW is None:
+            listReplacementMW = []
+        if listReplacementAcc is None:
+            listReplacementAcc = []
+
+        if self.spacyBackend is None:
+            for text in texts:
+                yield self.process(text, listReplacementMW, listReplacementAcc, metrics)
+            return
+
+        if self.lowercaseText:
+            texts = (text.lower() for text in texts)
+        analysed = self.spacyBackend.pipe(texts)
+        if metrics is not None:
+            analysed = timedIterator(analysed, metrics, 'tokenise')
+        for tokens, lemmas in analysed:
+            yield self.normalise(tokens, listReplacementMW, listReplacementAcc, metrics, lemmas)
+
+
+def loadPreprocessor(profile, resources=None, tokenizer='nltk', spacyBatchSize=SPACY_BATCH_SIZE,
+                     spacyProcesses=SPACY_PROCESSES):
+    '''
+    Preprocessor of a profile, built once per process so that its caches are shared by all documents
+    Input: profile name ('lexicon', 'topic' or 'requirements'), resources of the profile (default: loaded from the
+    profile input files), tokenizer backend ('nltk', 'regex' or 'spacy'), texts per nlp.pipe batch and processes used
+    by nlp.pipe (spaCy backend only)
+    Output: Preprocessor
+    '''
+    if resources is None:
+        resources = loadProfileResources(profile)
+    key = (profile, resources.key, tokenizer, spacyBatchSize, spacyProcesses)
+    if key not in loadedPreprocessors:
+        loadedPreprocessors[key] = Preprocessor(profile, resources, tokenizer=tokenizer, spacyBatchSize=spacyBatchSize,
+                                                spacyProcesses=spacyProcesses)
+    return loadedPreprocessors[key]
@@ -0,0 +1,68 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+regexTokenizer.py is a fast alternative to nltk.word_tokenize (Punkt sentence splitting + Treebank regex cascade):
+one precompiled regular expression read once over the text, tuned to the technical text of the corpora.
+
+Tokens are the same as word_tokenize for most of the text:
+- hyphenated terms, paths and units are kept whole: 'x-band', 'i/o-boards', '10km', '-5', '0.1'
+- commas and colons inside numbers are kept: '1,000', '12:30'
+- punctuation is separated: ; @ # $ % & ? ! * ( ) [ ] { } < > , : -- ... and quotes
+- clitics are separated: "don't" -> 'do', "n't", "it's" -> 'it', "'s", 'cannot' -> 'can', 'not'
+- a final period is separated, except after abbreviations and initials ('e.g.', 'U.S.', 'etc.', 'J.') which keep it
+  unless they end the text
+- double quotes become `` (opening) and '' (closing)
+
+Known differences: Punkt learned abbreviations (only the common ones of ABBREVIATIONS are known) and some rare
+contractions ('gonna', "'tis"...). Benchmarks/tokenizerAccuracy.py measures the agreement with word_tokenize on the
+corpora.
+
+Usage:
+tokens = regexTokenize(text)
+'''
+
+import re
+
+# Abbreviations keeping their final period when followed by more text
+ABBREVIATIONS = ['etc', 'vs', 'fig', 'figs', 'eq', 'eqs', 'ref', 'refs', 'approx', 'no', 'nos', 'vol', 'al', 'ch',
+                 'sec', 'dr', 'mr', 'mrs', 'ms', 'prof', 'jr', 'sr', 'st', 'inc', 'ltd', 'co', 'corp', 'dept', 'min',
+                 'max', 'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec']
+
+# Characters always separated from words (double quotes, Unicode quotes, backticks and dashes included)
+SPLIT = r';@#$%&?!*()\[\]{}<>"`«»“”‘’„‒-―'
+
+CLITIC = r"(?:[sSmMdD]|ll|LL|re|RE|ve|VE)\b"
+
+# Characters of a word: commas and colons followed by a digit, periods inside the word, single hyphens, apostrophes
+# inside the word (not at its start, not starting a clitic)
+WORD_CHARACTER = r'''(?:[^\s''' + SPLIT + r''',:.\-'nN]|[nN](?!'[tT]\b)|[,:](?=\d)|\.(?=[^\s.])|-(?!-))'''
+
+TOKEN_PATTERN = re.compile(r'''
+    (?:(?i:''' + '|'.join(sorted(ABBREVIATIONS, key=len, reverse=True)) + r''')    # abbreviations
+       |[^\W\d_](?:\.[^\W\d_])+|[A-Z])\.(?=\s+\S)                # e.g., U.S., initials
+  | (?i:can)(?=(?i:not)\b)                                       # can|not
+  | \.\.+                                                        # ellipsis
+  | --                                                           # double dash
+  | [nN]'[tT]\b                                                  # clitics
+  | ''' + "'" + CLITIC + r'''
+  | ``|''                                                        # quotes
+  | ''' + WORD_CHARACTER + '(?:' + WORD_CHARACTER + "|'(?!" + CLITIC + r''')(?=[^\W_]))*    # words
+  | \S                                                           # any other character
+''', re.VERBOSE)
+
+openingQuote = re.compile(r'(^|[ (\[{<])"')
+
+
+def regexTokenize(text):
+    '''
+    Input: text (sentence or document)
+    Output: list of tokens
+    '''
+    if '"' in text:
+        text = openingQuote.sub(r'\1 `` ', text).replace('"', " '' ")
+    return TOKEN_PATTERN.findall(text)
@@ -0,0 +1,141 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+spacyBackend.py is the optional spaCy backend of the preprocessing core (tokenizer='spacy'): texts are tokenized and
+lemmatised in batches with nlp.pipe(batch_size=batchSize, n_process=nProcess) instead of one word_tokenize call per
+sentence, batchSize and nProcess are set by the pipelines (spacyBatchSize, spacyProcesses). The acronyms, multiwords
+and stop words steps of the profile are applied afterwards, as with the other tokenizers.
+
+spaCy pipeline used, first available of:
+1. SPACY_MODEL (e.g., en_core_web_sm, installed with python -m spacy download en_core_web_sm), parser and named
+   entities disabled: tagger + rule-based lemmatizer, lemmas depend on the context of each token
+2. blank English pipeline (tokenizer only) + lemma lookup table of spaCy (requires the spacy-lookups-data package),
+   lemmas do not depend on the context
+3. blank English pipeline, tokenizer only: the WordNet lemmatizer of the profile is kept
+
+Unlike the spaCy default, hyphens and slashes between letters are not split, so that 'x-band' or 'i/o-boards' are kept
+whole and still match the ECSS multiwords, as with word_tokenize.
+
+spaCy is only imported when this backend is used.
+'''
+
+import spacy
+
+from spacy.lang.char_classes import ALPHA, ALPHA_LOWER, ALPHA_UPPER, CONCAT_QUOTES, LIST_ELLIPSES, LIST_ICONS
+from spacy.lookups import load_lookups
+from spacy.util import compile_infix_regex
+from NLPPipeline.preprocessingCore import SPACY_BATCH_SIZE, SPACY_PROCESSES
+
+SPACY_MODEL = 'en_core_web_sm'
+BATCH_SIZE = SPACY_BATCH_SIZE  # texts per batch
+N_PROCESS = SPACY_PROCESSES  # processes used by nlp.pipe
+MAX_LENGTH = 10 ** 7  # characters per text (whole documents are processed by the Topic Modeling pipeline)
+
+# spaCy English infixes, without hyphens and slashes between letters
+INFIXES = (LIST_ELLIPSES + LIST_ICONS +
+           [r'(?<=[0-9])[+\-\*^](?=[0-9-])',
+            r'(?<=[{al}{q}])\.(?=[{au}{q}])'.format(al=ALPHA_LOWER, au=ALPHA_UPPER, q=CONCAT_QUOTES),
+            r'(?<=[{a}]),(?=[{a}])'.format(a=ALPHA),
+            r'(?<=[{a}])(?:--|[‒-―])(?=[{a}])'.format(a=ALPHA),
+            r'(?<=[{a}0-9])[:<>=](?=[{a}])'.format(a=ALPHA)])
+
+# Backends already loaded in this process
+loadedBackends = {}
+
+
+def loadSpacyPipeline(model=SPACY_MODEL):
+    '''
+    Input: name of an installed spaCy English pipeline, None for a blank pipeline
+    Output: spaCy Language, description of the pipeline (name and version), lemma lookup table (None if the pipeline
+    has its own lemmatizer or if no table is installed)
+    '''
+    if model is not None:
+        try:
+            nlp = spacy.load(model, exclude=['parser', 'ner', 'senter'])
+            return nlp, model + '-' + nlp.meta.get('version', ''), None
+        except OSError:
+            print('spaCy pipeline', model, 'is not installed, blank English pipeline used')
+
+    nlp = spacy.blank('en')
+    name = 'blank_en-' + spacy.__version__
+    try:
+        lemmaTable = load_lookups('en', ['lemma_lookup']).get_table('lemma_lookup')
+        name = name + '-lookup'
+    except ValueError:
+        # spacy-lookups-data not installed
+        lemmaTable = None
+    return nlp, name, lemmaTable
+
+
+class SpacyBackend:
+    '''
+    Batched tokenization and lemmatisation with spaCy
+    Input: spaCy pipeline name (None: blank English pipeline), texts per batch, processes used by nlp.pipe
+    contextLemmas: True if the lemmas of each text are given by the pipeline, lemmatize: lemma of a lower cased token
+    when the lemmas do not depend on the context (lookup table), None otherwise
+    '''
+
+    def __init__(self, model=SPACY_MODEL, batchSize=BATCH_SIZE, nProcess=N_PROCESS):
+        self.nlp, self.name, lemmaTable = loadSpacyPipeline(model)
+        self.nlp.max_length = max(self.nlp.max_length, MAX_LENGTH)
+        self.nlp.tokenizer.infix_finditer = compile_infix_regex(INFIXES).finditer
+        self.batchSize = batchSize
+        self.nProcess = nProcess
+        self.contextLemmas = 'lemmatizer' in self.nlp.pipe_names
+        self.lemmatize = None
+        if lemmaTable is not None:
+            self.lemmatize = lambda token: lemmaTable.get(token, token)
+
+    def analyse(self, doc):
+        '''
+        Input: spaCy Doc
+        Output: list of tokens, dictionary of lower cased tokens and their lemma in this text (None if the lemmas do
+        not depend on the context)
+        '''
+        tokens = [token.text for token in doc if not token.is_space]
+        if not self.contextLemmas:
+            return tokens, None
+        lemmas = {}
+        for token in doc:
+            if token.lemma_ and token.lemma_ != '-PRON-':
+                lemmas.setdefault(token.lower_, token.lemma_.lower())
+        return tokens, lemmas
+
+    def tokenize(self, text):
+        '''
+        Input: text
+        Output: list of tokens
+        '''
+        return self.analyse(self.nlp(text))[0]
+
+    def process(self, text):
+        '''
+        Input: text
+        Output: list of tokens, dictionary of lemmas (or None)
+        '''
+        return self.analyse(self.nlp(text))
+
+    def pipe(self, texts):
+        '''
+        Input: iterable of texts, read batch by batch
+        Output: generator of (list of tokens, dictionary of lemmas or None), in texts order
+        '''
+        for doc in self.nlp.pipe(texts, batch_size=self.batchSize, n_process=self.nProcess):
+            yield self.analyse(doc)
+
+
+def loadSpacyBackend(model=SPACY_MODEL, batchSize=BATCH_SIZE, nProcess=N_PROCESS):
+    '''
+    SpacyBackend built once per process
+    Input: spaCy pipeline name, texts per batch, processes used by nlp.pipe
+    Output: SpacyBackend
+    '''
+    key = (model, batchSize, nProcess)
+    if key not in loadedBackends:
+        loadedBackends[key] = SpacyBackend(model, batchSize, nProcess)
+    return loadedBackends[key]
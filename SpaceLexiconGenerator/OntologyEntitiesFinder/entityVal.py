@@ -8,10 +8,8 @@
 
 import os
 import json
-import nltk
 
-from nltk.tokenize import word_tokenize
-from DEA_methods import *
+from OntologyEntitiesFinder.membershipIndex import loadMembershipIndex, saveMembershipIndex
 
 fileDir = os.path.dirname(os.path.abspath(__file__))  #
 parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
@@ -28,73 +26,58 @@ def entityVal(entityFinderOutput):
     with open(parentDir + entityFinderOutput, 'r') as input:
         candidates = json.load(input)
 
-    # load glossary of terms
-    inputFiles = [parentDir + '/NLPPipeline/NLPInputs/ecss_1grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_2grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_3grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_4grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_5grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_6grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_9grams.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_all_acronyms.txt',
-                  parentDir + '/NLPPipeline/NLPInputs/ecss_validated_expansions.txt']
-
-    ecssMultiwords = []
-
-    for file in inputFiles:
-        with open(file, 'r') as input:
-            words = input.read().split('\n')
-            words = [x for x in words if x]
-            for w in words:
-                ecssMultiwords.append(word_tokenize(w))
-
-    ecssMultiwords = ['_'.join(item) for item in ecssMultiwords]
+    # load WordNet and glossary of terms membership index (see membershipIndex.py)
+    index = loadMembershipIndex()
 
 
     # for each run runVal to compare to Wordnet and ECSS glossary
     print('\n ---------- \n Results for Dictionary based on Frequency only')
     cF=candidates['candidateFreq']
-    runVal(cF, ecssMultiwords)
+    runVal(cF, index)
 
     print('\n ---------- \n Results for Dictionary based on Frequency + TF-IDF')
     rTR=candidates['candidateTFIDF']
     cTF=[word for (word, tfidf) in rTR]
-    runVal(cTF, ecssMultiwords)
+    runVal(cTF, index)
 
     print('\n ---------- \n Results for Dictionary based on Frequency + Weirdness Index')
     cW=candidates['candidateWeird']
-    runVal(cW, ecssMultiwords)
+    runVal(cW, index)
 
+    # words checked with WordNet for the first time are kept for the next validations
+    saveMembershipIndex(index)
     return
 
 
-def runVal(entities, ecssMultiwords):
+def runVal(entities, index):
     '''
     Compare a lexicon to a general lexicon (WordNet) and a domain-specific dictionary (ECSS Glossary of Terms and Acronyms)
-    Input: lexicon to check
+    Input: lexicon to check, WordNet and ECSS membership index (see membershipIndex.py)
     Output: number and percentage of common items in-between lexicon to check and WordNet or ECSS Terms/Acronyms
     '''
 
     print('Number of input entities:', len(entities))
 
-    # Comparison with WordNet
-    notInWordNet, inWordNet = check_wordNet(entities)
+    # Comparison with WordNet, WordNet only queried for the words never checked
+    notInWordNet, inWordNet = index.checkWordNet(entities)
     #print('Comparison to general dictionary:')
     #print('elements of the first dictionary NOT FOUND in Wordnet:', len(notInWordNet), '(', round(len(notInWordNet)/len(entities)*100,1), '%)')
     print('FOUND in Wordnet:', len(inWordNet), '(', round(len(inWordNet)/len(entities)*100,1), '%)')
 
     # Comparison with ECSS glossary of terms
+    ecssMultiwords = index.ecssMultiwords
+    ecssWords = index.ecssWords(entities)
     notInECSS = []
     inECSS = []
     for i in entities:
-        if i not in ecssMultiwords:
+        if i not in ecssWords:
             notInECSS.append(i)
         else:
             inECSS.append(i)
 
     ecssF=[]
     for i in ecssMultiwords:
-        if i in entities:
+        if i in ecssWords:
             ecssF.append(i)
 
     #print('\n Comparison to domain-specific dictionary:')
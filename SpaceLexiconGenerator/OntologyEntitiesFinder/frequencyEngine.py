@@ -0,0 +1,110 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+frequencyEngine.py is the counting engine of the lexicon generator (ontologyEntityDefinition): the tokens of the
+pre-processed corpora are interned once to integer ids, and all frequency statistics are NumPy arrays indexed by id,
+so that filtering and ranking the corpus dictionary are array operations instead of list searches.
+
+- CorpusFrequencies: vocabulary (token of each id, ids in order of first appearance in the corpora) and sparse
+  document-term matrix (scipy CSR, built once while the corpora load), from which the number of occurrences, of
+  documents and the tf-idf of ids are computed
+- loadCorpusFrequencies: CorpusFrequencies of several pre-processed corpora, from their token stores if up to date, or
+  from their lexicon statistics updated with the documents changes (incremental runs)
+- frequencyRanking: ids sorted by decreasing frequency, ties in order of first appearance (as Counter.most_common)
+- tfIdf: tf-idf of ids, computed as tf * math.log10(numberOfDocuments / df), as the scalar computation
+'''
+
+import math
+
+import numpy as np
+
+from preprocessedCorpora.tokenStore import corpusMatrix, mergeMatrices
+from OntologyEntitiesFinder.lexiconStatistics import updateLexiconStatistics
+
+
+class CorpusFrequencies:
+    '''
+    Token counts of a corpus by integer id
+    Input: vocabulary (list of tokens, a token id is its index), scipy.sparse.csr_matrix (documents x token ids) of
+    the number of occurrences of each id per document
+    '''
+
+    def __init__(self, vocabulary, documentTermMatrix):
+        self.vocabulary = vocabulary
+        self.ids = {token: i for i, token in enumerate(vocabulary)}
+        self.documentTermMatrix = documentTermMatrix
+        self.tokenCounts = np.asarray(documentTermMatrix.sum(axis=0)).ravel()
+        self.documentFrequencies = np.bincount(documentTermMatrix.indices, minlength=len(vocabulary))
+        self.numberOfDocuments = documentTermMatrix.shape[0]
+        self.numberOfTokens = int(self.tokenCounts.sum())
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    def mask(self, tokens):
+        '''
+        Input: iterable of tokens
+        Output: boolean array, True for the ids of the tokens (tokens not in the vocabulary are ignored)
+        '''
+        mask = np.zeros(len(self.vocabulary), dtype=bool)
+        mask[[self.ids[token] for token in tokens if token in self.ids]] = True
+        return mask
+
+    def tokens(self, ids):
+        '''
+        Input: array of ids
+        Output: list of tokens
+        '''
+        vocabulary = self.vocabulary
+        return [vocabulary[i] for i in ids.tolist()]
+
+    def tfIdf(self, ids):
+        '''
+        Input: array of ids
+        Output: float array of the tf-idf of the ids over the corpus
+        '''
+        return tfIdf(self.tokenCounts[ids], self.documentFrequencies[ids], self.numberOfDocuments)
+
+
+def loadCorpusFrequencies(paths, incremental=False, workers=1):
+    '''
+    Document-term matrices of pre-processed corpora, merged, from the corpus token stores if available, otherwise
+    streamed from the .json files
+    Input: list of pre-processed corpus paths, incremental: if True the matrices are rebuilt from the corpus lexicon
+    statistics, updated with the documents added, changed or removed since the last run (see lexiconStatistics.py),
+    number of processes reading the .json files (see tokenStore.corpusStatistics)
+    Output: CorpusFrequencies
+    '''
+    parts = []
+    for path in paths:
+        if incremental:
+            parts.append(updateLexiconStatistics(path).corpusMatrix())
+        else:
+            parts.append(corpusMatrix(path, workers))
+    vocabulary, matrix = mergeMatrices(parts)
+    return CorpusFrequencies(vocabulary, matrix)
+
+
+def frequencyRanking(ids, counts):
+    '''
+    Input: array of ids (in order of first appearance), their counts
+    Output: ids and counts sorted by decreasing count, equal counts kept in ids order
+    '''
+    order = np.argsort(-counts, kind='stable')
+    return ids[order], counts[order]
+
+
+def tfIdf(termFrequencies, documentFrequencies, numberOfDocuments):
+    '''
+    Input: arrays of term frequencies and document frequencies (at least 1), number of documents
+    Output: float array of tf-idf, tf * log10(numberOfDocuments / df), each idf computed once per df value with
+    math.log10, so that values are identical to the scalar computation
+    '''
+    idf = np.array([math.log10(numberOfDocuments / df) if df else 0.0
+                    for df in range(int(documentFrequencies.max(initial=0)) + 1)])
+    return termFrequencies * idf[documentFrequencies]
@@ -0,0 +1,286 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+lexiconStatistics.py keeps the statistics of a pre-processed corpus used by the lexicon generator
+(ontologyEntityDefinition) between runs, updated by document deltas instead of re-reading the whole corpus:
+
+<corpus directory name>_lexiconStatistics/
+    vocabulary.json: list of tokens, a token id is its index (append only, ids of removed tokens are kept)
+    counts.npy: int64 array (2 x vocabulary size), number of occurrences and of documents of each token id
+    documents/<document>_<size>_<modification time>.npy: int64 array (2 x document vocabulary size), token ids of the
+        document in order of first appearance and their number of occurrences in the document
+    state.json: version, vocabulary size and number of tokens (checked when loaded), documents names, sizes and
+        modification times (written last)
+
+addDocuments/removeDocuments update the statistics in time proportional to the documents added or removed, update
+applies the changes of the corpus directory since the last update (new, changed and removed .json files). The corpus
+document-term matrix is then rebuilt from the documents counts (see corpusMatrix), identical to the matrix built
+from the .json files, so that the Frequency, TF-IDF and Weirdness lexica are regenerated without reading the corpus.
+
+Update the statistics of a corpus, from the SpaceLexiconGenerator directory:
+python OntologyEntitiesFinder/lexiconStatistics.py /preprocessedCorpora/BooksWiki/
+'''
+
+import json
+import os
+import sys
+
+import numpy as np
+
+from collections import Counter
+from os import listdir
+from os.path import isfile, join
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+sys.path.append(parentDir)
+
+from NLPPipeline.documentStream import streamTokenLists
+
+# Increment when the content of the statistics changes, invalidates previous statistics
+STATE_VERSION = 1
+STATE_SUFFIX = '_lexiconStatistics'
+
+
+class LexiconStatistics:
+    '''
+    Token statistics of a pre-processed corpus, updated document by document
+    Input: pre-processed corpus path, e.g., /preprocessedCorpora/BooksWiki/
+    '''
+
+    def __init__(self, path):
+        self.path = path
+        self.corpusDirectory = parentDir + path
+        self.stateDirectory = stateDirectory(path)
+        self.vocabulary = []
+        self.ids = {}
+        self.tokenCounts = np.zeros(0, dtype=np.int64)
+        self.documentFrequencies = np.zeros(0, dtype=np.int64)
+        # document name -> [size, modification time] of the .json file counted
+        self.documents = {}
+        # counts of the documents added since the statistics were saved, files of the counts removed
+        self.added = {}
+        self.removed = set()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def numberOfTokens(self):
+        return int(self.tokenCounts.sum())
+
+    def documentFile(self, name):
+        '''
+        Input: document name
+        Output: file of the document counts, named after the state of the .json file counted, so that the counts of a
+        changed document never overwrite the counts saved
+        '''
+        size, mtime = self.documents[name]
+        return join(self.stateDirectory, 'documents', name + '_' + str(size) + '_' + str(mtime) + '.npy')
+
+    def documentCounts(self, name):
+        '''
+        Input: document name
+        Output: int64 arrays, token ids of the document (order of first appearance) and their number of occurrences
+        '''
+        if name in self.added:
+            return self.added[name]
+        counts = np.load(self.documentFile(name))
+        return counts[0], counts[1]
+
+    def addDocuments(self, names):
+        '''
+        Count the tokens of new documents of the corpus and add them to the statistics (a document already counted is
+        counted again)
+        Input: list of document names (.json files of the corpus directory)
+        '''
+        self.removeDocuments([name for name in names if name in self.documents])
+
+        documents = []
+        for name in names:
+            file = join(self.corpusDirectory, name)
+            state = fileState(file)
+            counts = Counter()
+            for tokens in streamTokenLists(file):
+                counts.update(tokens)
+            for token in counts:
+                if token not in self.ids:
+                    self.ids[token] = len(self.vocabulary)
+                    self.vocabulary.append(token)
+            ids = np.array([self.ids[token] for token in counts], dtype=np.int64)
+            documents.append((name, state, ids, np.array(list(counts.values()), dtype=np.int64)))
+
+        newIds = np.zeros(len(self.vocabulary) - len(self.tokenCounts), dtype=np.int64)
+        self.tokenCounts = np.concatenate([self.tokenCounts, newIds])
+        self.documentFrequencies = np.concatenate([self.documentFrequencies, newIds])
+        for name, state, ids, occurrences in documents:
+            # token ids are unique within a document
+            self.tokenCounts[ids] += occurrences
+            self.documentFrequencies[ids] += 1
+            self.documents[name] = state
+            self.added[name] = (ids, occurrences)
+            self.removed.discard(self.documentFile(name))
+
+    def removeDocuments(self, names):
+        '''
+        Remove documents from the statistics
+        Input: list of document names
+        '''
+        for name in names:
+            if name not in self.documents:
+                continue
+            ids, occurrences = self.documentCounts(name)
+            self.tokenCounts[ids] -= occurrences
+            self.documentFrequencies[ids] -= 1
+
+            if name in self.added:
+                del self.added[name]
+            else:
+                self.removed.add(self.documentFile(name))
+            del self.documents[name]
+
+    def update(self):
+        '''
+        Apply the changes of the corpus directory since the last update: removed documents are removed, new and
+        changed documents (size or modification time) are counted
+        Output: number of documents added, number of documents removed
+        '''
+        names = [f for f in listdir(self.corpusDirectory) if isfile(join(self.corpusDirectory, f))]
+        current = set(names)
+        removed = [name for name in self.documents if name not in current]
+        added = [name for name in names
+                 if name not in self.documents or self.documents[name] != fileState(join(self.corpusDirectory, name))]
+
+        self.removeDocuments(removed)
+        self.addDocuments(added)
+        # documents kept in the order of the corpus directory, as when the .json files are read
+        self.documents = {name: self.documents[name] for name in names}
+        return len(added), len(removed)
+
+    def corpusMatrix(self):
+        '''
+        Document-term matrix of the corpus, rebuilt from the documents counts, identical to tokenStore.corpusMatrix:
+        documents in order of the corpus directory (as of the last update), token ids in order of first appearance
+        Output: vocabulary (list of tokens, a token id is its index), scipy.sparse.csr_matrix (documents x token ids)
+        '''
+        from scipy.sparse import csr_matrix
+
+        counts = [self.documentCounts(name) for name in self.documents]
+        ids = np.concatenate([np.zeros(0, dtype=np.int64)] + [ids for ids, occurrences in counts])
+        occurrences = np.concatenate([np.zeros(0, dtype=np.int64)] + [occurrences for ids, occurrences in counts])
+
+        # corpus tokens, in order of first appearance (tokens of removed documents only are dropped)
+        tokens, first = np.unique(ids, return_index=True)
+        order = tokens[np.argsort(first)]
+        newIds = np.zeros(len(self.vocabulary), dtype=np.int64)
+        newIds[order] = np.arange(len(order))
+
+        indptr = np.concatenate([[0], np.cumsum([len(i) for i, o in counts], dtype=np.int64)])
+        matrix = csr_matrix((occurrences, newIds[ids], indptr), shape=(len(counts), len(order)))
+        matrix.sort_indices()
+        return [self.vocabulary[i] for i in order.tolist()], matrix
+
+    def save(self):
+        '''
+        Save the statistics, only the counts of the documents added since the last save are written
+        '''
+        os.makedirs(join(self.stateDirectory, 'documents'), exist_ok=True)
+        for name, (ids, occurrences) in self.added.items():
+            np.save(self.documentFile(name), np.stack([ids, occurrences]))
+        saveReplace(join(self.stateDirectory, 'counts.npy'),
+                    lambda f: np.save(f, np.stack([self.tokenCounts, self.documentFrequencies])), 'wb')
+        saveReplace(join(self.stateDirectory, 'vocabulary.json'), lambda f: json.dump(self.vocabulary, f))
+
+        # written last: statistics whose counts and vocabulary do not match state.json are not loaded
+        state = {'version': STATE_VERSION, 'vocabularySize': len(self.vocabulary),
+                 'numberOfTokens': self.numberOfTokens(),
+                 'documents': [[name] + state for name, state in self.documents.items()]}
+        saveReplace(join(self.stateDirectory, 'state.json'), lambda f: json.dump(state, f))
+
+        for file in self.removed:
+            if isfile(file):
+                os.remove(file)
+        self.added = {}
+        self.removed = set()
+
+
+def stateDirectory(path):
+    '''
+    Input: pre-processed corpus path, e.g., /preprocessedCorpora/BooksWiki/
+    Output: statistics directory of the corpus (absolute path)
+    '''
+    return parentDir + path.rstrip('/') + STATE_SUFFIX + '/'
+
+
+def fileState(file):
+    '''
+    Input: document .json file
+    Output: [size, modification time] of the file
+    '''
+    stat = os.stat(file)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def saveReplace(file, write, mode='w'):
+    '''
+    Write a file through a temporary file, replaced at once: the file is never partially written
+    Input: file, function writing the content into an open file, open mode
+    '''
+    temporaryFile = file + '.tmp'
+    with open(temporaryFile, mode, **({} if 'b' in mode else {'encoding': 'utf-8'})) as f:
+        write(f)
+    os.replace(temporaryFile, file)
+
+
+def loadLexiconStatistics(path):
+    '''
+    Load the statistics of a pre-processed corpus
+    Input: pre-processed corpus path
+    Output: LexiconStatistics, empty if the corpus has no statistics (or statistics of a previous version)
+    '''
+    statistics = LexiconStatistics(path)
+    target = statistics.stateDirectory
+    if not isfile(join(target, 'state.json')):
+        return statistics
+    with open(join(target, 'state.json'), 'r', encoding="utf-8") as infile:
+        state = json.load(infile)
+    if state['version'] != STATE_VERSION:
+        return statistics
+
+    with open(join(target, 'vocabulary.json'), 'r', encoding="utf-8") as infile:
+        vocabulary = json.load(infile)
+    tokenCounts, documentFrequencies = np.load(join(target, 'counts.npy'))
+    if len(vocabulary) != state['vocabularySize'] or int(tokenCounts.sum()) != state['numberOfTokens']:
+        print('Lexicon statistics of', path, 'are incomplete, the corpus is counted again')
+        return statistics
+
+    statistics.vocabulary = vocabulary
+    statistics.ids = {token: i for i, token in enumerate(vocabulary)}
+    statistics.tokenCounts = tokenCounts
+    statistics.documentFrequencies = documentFrequencies
+    statistics.documents = {document[0]: document[1:] for document in state['documents']}
+    return statistics
+
+
+def updateLexiconStatistics(path):
+    '''
+    Update the statistics of a pre-processed corpus with the changes of its .json files and save them
+    Input: pre-processed corpus path
+    Output: LexiconStatistics
+    '''
+    statistics = loadLexiconStatistics(path)
+    added, removed = statistics.update()
+    if added or removed or not isfile(join(statistics.stateDirectory, 'state.json')):
+        statistics.save()
+    print('Lexicon statistics of', path, ':', added, 'documents added,', removed, 'documents removed,',
+          len(statistics), 'documents,', statistics.numberOfTokens(), 'tokens')
+    return statistics
+
+
+if __name__ == '__main__':
+    for corpusPath in sys.argv[1:]:
+        updateLexiconStatistics(corpusPath)
@@ -0,0 +1,188 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+membershipIndex.py keeps the WordNet and ECSS glossary membership used to validate the lexica (entityVal.runVal,
+thresholdSweep) between runs, in a binary (pickle) cache: checking a lexicon becomes set lookups instead of WordNet
+queries and list searches.
+
+- WordNet: a word is in WordNet if it has synsets (DEA_methods.check_wordNet). The index holds the set of all WordNet
+  lemma names, a lower-cased lemma name always has synsets. The other words, e.g., inflected forms found by the WordNet
+  morphology ('satellites'), are checked once with wordnet.synsets and their result is kept in the index. The WordNet
+  part is keyed by the NLTK version and WordNet corpus, and rebuilt when they change.
+- ECSS: glossary of terms and acronyms (DEA_methods.loadEcssGlossary), rebuilt when a glossary file changes.
+
+The cache is shared by all corpora and runs, so validating new lexica only queries WordNet for the words never seen.
+'''
+
+import hashlib
+import os
+import pickle
+import sys
+
+from collections import Counter
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+sys.path.append(parentDir)
+
+from DEA_methods import ECSS_GLOSSARY, ecssDirectory, loadEcssGlossary
+
+# Increment when the content of the index changes, invalidates previous caches
+CACHE_VERSION = 1
+
+cacheFile = parentDir + '/OntologyEntitiesFinder/cache/membershipIndex.pkl'
+
+
+class MembershipIndex:
+    '''
+    WordNet and ECSS glossary membership of words
+    key: WordNet key (see wordNetKey) the WordNet sets were built with
+    lemmaNames: set of all WordNet lemma names
+    checked: dictionary word -> True if in WordNet, for the words which are not lemma names checked so far
+    ecssState: state of the ECSS glossary files the glossary was loaded from (see ecssState)
+    ecssMultiwords: ECSS glossary terms, in files order (a term can appear several times)
+    '''
+
+    def __init__(self, key, lemmaNames, checked, ecssState, ecssMultiwords):
+        self.key = key
+        self.lemmaNames = lemmaNames
+        self.checked = checked
+        self.ecssState = ecssState
+        self.setEcss(ecssMultiwords)
+        # True if words were checked with WordNet or the glossary reloaded since the index was loaded (to be saved)
+        self.changed = False
+
+    def setEcss(self, ecssMultiwords):
+        self.ecssMultiwords = ecssMultiwords
+        # number of times each term is listed in the glossary
+        self.ecssCounts = Counter(ecssMultiwords)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['ecssCounts'], state['changed']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.ecssCounts = Counter(self.ecssMultiwords)
+        self.changed = False
+
+    def wordNetWords(self, words):
+        '''
+        Input: iterable of words
+        Output: set of the words found in WordNet, the words never checked are looked up in WordNet
+        '''
+        lemmaNames = self.lemmaNames
+        checked = self.checked
+        words = set(words)
+        unseen = [word for word in words if word.lower() not in lemmaNames and word not in checked]
+        if unseen:
+            from nltk.corpus import wordnet as wn
+
+            for word in unseen:
+                checked[word] = bool(wn.synsets(word))
+            self.changed = True
+        return {word for word in words if word.lower() in lemmaNames or checked[word]}
+
+    def checkWordNet(self, dictionary):
+        '''
+        Same as DEA_methods.check_wordNet, from the index
+        Input: list of terms (dictionary) to check
+        Output: list of terms not found in WordNet and list of terms found in WordNet
+        '''
+        found = self.wordNetWords(dictionary)
+        return [i for i in dictionary if i not in found], [i for i in dictionary if i in found]
+
+    def ecssWords(self, words):
+        '''
+        Input: iterable of words
+        Output: set of the words found in the ECSS glossary
+        '''
+        return set(words) & self.ecssCounts.keys()
+
+
+def wordNetKey():
+    '''
+    Identifies the WordNet data: cache version, NLTK version, WordNet corpus location and modification time
+    Output: hexadecimal hash
+    '''
+    import nltk
+
+    h = hashlib.sha1()
+    h.update(str(CACHE_VERSION).encode('utf-8'))
+    h.update(nltk.__version__.encode('utf-8'))
+    path = nltk.data.find('corpora/wordnet')
+    path = getattr(path, 'path', str(path))
+    h.update(path.encode('utf-8'))
+    if os.path.exists(path):
+        h.update(str(os.stat(path).st_mtime_ns).encode('utf-8'))
+    return h.hexdigest()
+
+
+def ecssState():
+    '''
+    Output: list of [size, modification time] of each ECSS glossary file (None for a missing file), and NLTK version
+    (the glossary terms are tokenized with word_tokenize)
+    '''
+    import nltk
+
+    state = [nltk.__version__]
+    for file in ECSS_GLOSSARY:
+        if os.path.isfile(ecssDirectory + file):
+            stat = os.stat(ecssDirectory + file)
+            state.append([stat.st_size, stat.st_mtime_ns])
+        else:
+            state.append(None)
+    return state
+
+
+def loadMembershipIndex():
+    '''
+    Load the index from the cache, the WordNet sets are rebuilt if the WordNet data changed, the ECSS glossary is
+    reloaded if a glossary file changed (the index is then saved)
+    Output: MembershipIndex
+    '''
+    key = wordNetKey()
+    index = None
+    if os.path.isfile(cacheFile):
+        try:
+            with open(cacheFile, 'rb') as f:
+                index = pickle.load(f)
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            index = None
+
+    if index is None or index.key != key:
+        from nltk.corpus import wordnet as wn
+
+        index = MembershipIndex(key, set(wn.all_lemma_names()), {}, None, [])
+        index.changed = True
+
+    state = ecssState()
+    if index.ecssState != state:
+        index.ecssState = state
+        index.setEcss(loadEcssGlossary())
+        index.changed = True
+
+    if index.changed:
+        saveMembershipIndex(index)
+    return index
+
+
+def saveMembershipIndex(index):
+    '''
+    Input: MembershipIndex, written to a temporary file then renamed, a cache is never partially written (only saved
+    if words were checked with WordNet or the glossary was reloaded since it was loaded)
+    '''
+    if not index.changed:
+        return
+    os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+    temporaryFile = cacheFile + '.tmp'
+    with open(temporaryFile, 'wb') as f:
+        pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporaryFile, cacheFile)
+    index.changed = False
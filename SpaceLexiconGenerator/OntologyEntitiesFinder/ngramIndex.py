@@ -0,0 +1,298 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+ngramIndex.py discovers multiword terms at corpus scale, to propose new entries for the multiwords glossary
+(NLPPipeline/NLPInputs/ecss_*grams.txt, spacemissiondesign_ngrams.txt), instead of per document collocations.
+
+- NgramIndex: suffix array of the integer token stream of a pre-processed corpus (see tokenStore.corpusTokenStream),
+  built once. The suffixes are sorted on their first maxLength tokens (prefix doubling with NumPy), so that the
+  occurrences of any n-gram up to maxLength tokens are adjacent in the suffix array, and the n-grams of a length and
+  their counts are read from the longest common prefixes of adjacent suffixes. N-grams never cross a sentence.
+- cValues: C-value of the multiword candidates (Frantzi, Ananiadou and Mima, 2000), the frequency of a candidate
+  weighted by its length and discounted by the longer candidates it is nested in
+- likelihoodRatios: Dunning log-likelihood ratio of the candidates, the lowest over the splits of a candidate into
+  two parts (the weakest association between its parts)
+- proposeMultiwords: candidates with a significant likelihood ratio, not already in the glossary (and without repeated
+  tokens), ranked by C-value
+
+Propose multiwords from a corpus, from the SpaceLexiconGenerator directory:
+python OntologyEntitiesFinder/ngramIndex.py /preprocessedCorpora/BooksWiki/ --output /Outputs/proposedMultiwords.txt
+'''
+
+import argparse
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+sys.path.append(parentDir)
+
+from preprocessedCorpora.tokenStore import corpusTokenStream
+
+# Longest n-gram counted (longest multiword of the ECSS glossary)
+MAX_LENGTH = 9
+# Minimum number of occurrences of a multiword candidate
+MIN_COUNT = 5
+# Minimum likelihood ratio of a proposed multiword (chi-square with one degree of freedom, p < 0.001)
+MIN_LIKELIHOOD_RATIO = 10.83
+
+# Separator of the text between two sentences
+SENTINEL = -1
+
+
+class NgramIndex:
+    '''
+    N-gram counts of a corpus, from the suffix array of its token stream
+    Input: int array of the token ids of all sentences (one sentence after the other), int64 array of the start of each
+    sentence (+ number of tokens), vocabulary size, maximum n-gram length
+    '''
+
+    def __init__(self, tokenIds, sentenceOffsets, numberOfTypes, maxLength=MAX_LENGTH):
+        self.maxLength = maxLength
+        self.numberOfTokens = len(tokenIds)
+        self.unigramCounts = np.bincount(tokenIds, minlength=numberOfTypes)
+
+        # Text: sentences separated by a sentinel, position of each token in the text, number of tokens from each
+        # token to the end of its sentence (at most maxLength)
+        sentenceLengths = np.diff(sentenceOffsets)
+        sentences = np.repeat(np.arange(len(sentenceLengths), dtype=np.int64), sentenceLengths)
+        positions = np.arange(len(tokenIds), dtype=np.int64) + sentences
+        self.text = np.full(len(tokenIds) + len(sentenceLengths) + maxLength, SENTINEL, dtype=np.int64)
+        self.text[positions] = tokenIds
+        remaining = np.minimum(sentenceOffsets[1:][sentences] - np.arange(len(tokenIds)), maxLength)
+
+        # Suffix array of the token positions, sorted on their first maxLength tokens (suffixes sharing their first
+        # maxLength tokens in any order, they count the same n-grams)
+        order = np.argsort(prefixRanks(self.text, maxLength)[positions])
+        self.suffixArray = positions[order]
+        self.remaining = remaining[order]
+        self.commonPrefixes = commonPrefixes(self.text, self.suffixArray, maxLength)
+
+    def ngrams(self, n, minCount=1):
+        '''
+        All n-grams of a length and their number of occurrences, from the runs of adjacent suffixes sharing n tokens
+        Input: n-gram length (at most maxLength), minimum number of occurrences
+        Output: int64 array (n-grams x n) of token ids, in suffix array order, int64 array of their counts
+        '''
+        first = np.flatnonzero(self.commonPrefixes < n)
+        counts = np.diff(np.append(first, len(self.suffixArray)))
+        keep = (counts >= minCount) & (self.remaining[first] >= n)
+        starts = self.suffixArray[first[keep]]
+        return self.text[starts[:, None] + np.arange(n)], counts[keep]
+
+    def counts(self, minCount=MIN_COUNT, minLength=2):
+        '''
+        Input: minimum number of occurrences, minimum n-gram length
+        Output: dictionary n-gram (tuple of token ids) -> number of occurrences, for all n-grams from minLength to
+        maxLength tokens, shortest first
+        '''
+        counts = {}
+        for n in range(minLength, self.maxLength + 1):
+            ngrams, ngramCounts = self.ngrams(n, minCount)
+            counts.update(zip(map(tuple, ngrams.tolist()), ngramCounts.tolist()))
+        return counts
+
+
+def prefixRanks(text, length):
+    '''
+    Rank of the first tokens of each suffix of a text, by prefix doubling: the ranks on 2h tokens are the ranks of the
+    pairs (ranks on h tokens, ranks on h tokens h positions further)
+    Input: int64 array, text (ending with at least length sentinels), number of tokens ranked
+    Output: int64 array, rank of each suffix, equal for suffixes sharing their first length tokens, ordered as their
+    first length tokens (ranks are not consecutive)
+    '''
+    # token ids are already ranks, the sentinel first
+    ranks = {1: text - SENTINEL}
+    h = 1
+    while 2 * h <= length:
+        ranks[2 * h] = denseRanks(combineRanks(ranks[h], ranks[h], h))
+        h = 2 * h
+    # length as a sum of powers of 2, e.g., 9 = 8 + 1
+    rank, ranked = ranks[h], h
+    while ranked < length:
+        step = 1 << int(math.log2(length - ranked))
+        rank = combineRanks(rank, ranks[step], ranked)
+        ranked = ranked + step
+        if ranked < length:
+            rank = denseRanks(rank)
+    return rank
+
+
+def combineRanks(first, second, shift):
+    '''
+    Input: int64 arrays of ranks, on first tokens and on second tokens, shift (number of tokens ranked by first)
+    Output: int64 array, rank of each suffix on the first tokens followed by the second tokens (ranks are not
+    consecutive, at most (first rank + 1) * (second rank + 1))
+    '''
+    shifted = np.zeros(len(second), dtype=np.int64)
+    shifted[:len(second) - shift] = second[shift:]
+    return first * (int(second.max()) + 1) + shifted
+
+
+def denseRanks(keys):
+    '''
+    Input: int64 array
+    Output: int64 array, rank of each value among the distinct values (0 to number of distinct values - 1)
+    '''
+    order = np.argsort(keys)
+    sortedKeys = keys[order]
+    ranks = np.empty(len(keys), dtype=np.int64)
+    ranks[order] = np.cumsum(np.concatenate([[False], sortedKeys[1:] != sortedKeys[:-1]]))
+    return ranks
+
+
+def commonPrefixes(text, suffixArray, length):
+    '''
+    Input: text, suffix array, maximum prefix length
+    Output: int64 array, number of tokens shared by each suffix and the previous suffix of the suffix array (0 for the
+    first suffix), at most length, sentinels never shared
+    '''
+    common = np.zeros(len(suffixArray), dtype=np.int64)
+    shared = np.ones(len(suffixArray) - 1, dtype=bool) if len(suffixArray) else np.zeros(0, dtype=bool)
+    for d in range(length):
+        tokens = text[suffixArray + d]
+        shared &= (tokens[1:] == tokens[:-1]) & (tokens[1:] != SENTINEL)
+        common[1:] += shared
+    return common
+
+
+def cValues(counts):
+    '''
+    C-value of multiword candidates (Frantzi, Ananiadou and Mima, 2000): log2(length) * (frequency - average frequency
+    of the longer candidates the candidate is nested in), the occurrences of a nested candidate counted once
+    Input: dictionary candidate (tuple of token ids) -> frequency
+    Output: dictionary candidate -> C-value
+    '''
+    nestedFrequencies = {}
+    nestedCounts = {}
+    values = {}
+    for candidate in sorted(counts, key=len, reverse=True):
+        frequency = counts[candidate]
+        if candidate in nestedCounts:
+            values[candidate] = math.log2(len(candidate)) * (frequency - nestedFrequencies[candidate] /
+                                                             nestedCounts[candidate])
+            frequency = frequency - nestedFrequencies[candidate]
+        else:
+            values[candidate] = math.log2(len(candidate)) * frequency
+
+        # candidates nested in the candidate, each counted once
+        nested = {candidate[i:i + n] for n in range(2, len(candidate)) for i in range(len(candidate) - n + 1)}
+        for substring in nested:
+            if substring in counts:
+                nestedFrequencies[substring] = nestedFrequencies.get(substring, 0) + frequency
+                nestedCounts[substring] = nestedCounts.get(substring, 0) + 1
+    return values
+
+
+def likelihoodRatio(k11, k1, k2, n):
+    '''
+    Dunning log-likelihood ratio of the 2x2 contingency tables of pairs (first part, second part), 0 for parts which
+    occur together less than expected
+    Input: float arrays of the counts of the pairs, of the first parts and of the second parts, number of tokens
+    Output: float array of the likelihood ratios
+    '''
+    observed = [k11, k1 - k11, k2 - k11, n - k1 - k2 + k11]
+    expected = [k1 * k2 / n, k1 * (n - k2) / n, (n - k1) * k2 / n, (n - k1) * (n - k2) / n]
+    ratio = np.zeros(len(k11))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for o, e in zip(observed, expected):
+            ratio += np.where(o > 0, o * np.log(o / e), 0.0)
+    return np.where(k11 > expected[0], 2 * ratio, 0.0)
+
+
+def likelihoodRatios(counts, unigramCounts, numberOfTokens):
+    '''
+    Likelihood ratio of multiword candidates, the lowest over the splits of a candidate into two parts
+    Input: dictionary candidate (tuple of token ids) -> frequency (all parts of two tokens or more of a candidate
+    included), int array of the number of occurrences of each token id, number of tokens
+    Output: dictionary candidate -> likelihood ratio
+    '''
+    def partCount(part):
+        return unigramCounts[part[0]] if len(part) == 1 else counts[part]
+
+    ratios = {}
+    for n in sorted({len(candidate) for candidate in counts}):
+        candidates = [candidate for candidate in counts if len(candidate) == n]
+        k11 = np.array([counts[candidate] for candidate in candidates], dtype=float)
+        lowest = np.full(len(candidates), np.inf)
+        for split in range(1, n):
+            k1 = np.array([partCount(candidate[:split]) for candidate in candidates], dtype=float)
+            k2 = np.array([partCount(candidate[split:]) for candidate in candidates], dtype=float)
+            lowest = np.minimum(lowest, likelihoodRatio(k11, k1, k2, float(numberOfTokens)))
+        ratios.update(zip(candidates, lowest.tolist()))
+    return ratios
+
+
+def knownMultiwords():
+    '''
+    Output: set of the multiwords of the glossary files used by the NLP pipeline, words joined with '_'
+    '''
+    from NLPPipeline.pipelineResources import multiwordsFiles
+
+    known = set()
+    for file in multiwordsFiles:
+        with open(file, 'r', encoding="utf-8") as inputFile:
+            known.update('_'.join(line.lower().split()) for line in inputFile if line.strip())
+    return known
+
+
+def proposeMultiwords(path, minCount=MIN_COUNT, minLikelihoodRatio=MIN_LIKELIHOOD_RATIO, maxLength=MAX_LENGTH):
+    '''
+    Multiword terms of a pre-processed corpus which are not in the glossary, from the n-gram counts of its suffix array
+    Input: pre-processed corpus path, e.g., /preprocessedCorpora/BooksWiki/, minimum number of occurrences, minimum
+    likelihood ratio, maximum number of tokens of a multiword
+    Output: list of proposed multiwords, highest C-value first: dictionaries of the multiword (words separated by
+    spaces), its number of tokens, occurrences, C-value and likelihood ratio
+    '''
+    vocabulary, tokenIds, sentenceOffsets = corpusTokenStream(path)
+    index = NgramIndex(tokenIds, sentenceOffsets, len(vocabulary), maxLength)
+    counts = index.counts(minCount)
+    values = cValues(counts)
+    ratios = likelihoodRatios(counts, index.unigramCounts, index.numberOfTokens)
+    print('N-gram index of', path, ':', index.numberOfTokens, 'tokens,', len(counts), 'n-grams of 2 to', maxLength,
+          'tokens occurring at least', minCount, 'times')
+
+    known = knownMultiwords()
+    proposed = []
+    for candidate, count in counts.items():
+        tokens = [vocabulary[i] for i in candidate]
+        if values[candidate] <= 0 or ratios[candidate] < minLikelihoodRatio or '_'.join(tokens) in known:
+            continue
+        # repeated tokens are enumerations, e.g., lists of satellites names, not terms
+        if len(set(candidate)) < len(candidate):
+            continue
+        proposed.append({'multiword': ' '.join(tokens).replace('_', ' '), 'length': len(candidate), 'count': count,
+                         'cValue': round(values[candidate], 2), 'likelihoodRatio': round(ratios[candidate], 2)})
+    proposed.sort(key=lambda p: (-p['cValue'], -p['count']))
+    print(len(proposed), 'multiwords proposed')
+    return proposed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Propose multiwords for the glossary from the n-grams of a corpus')
+    parser.add_argument('corpus', help='pre-processed corpus path, e.g., /preprocessedCorpora/BooksWiki/')
+    parser.add_argument('--output', default='/Outputs/proposedMultiwords.txt',
+                        help='proposed multiwords, one per line (glossary format), scores saved in the .json file of '
+                             'the same name')
+    parser.add_argument('--min-count', type=int, default=MIN_COUNT)
+    parser.add_argument('--min-likelihood-ratio', type=float, default=MIN_LIKELIHOOD_RATIO)
+    parser.add_argument('--max-length', type=int, default=MAX_LENGTH)
+    args = parser.parse_args()
+
+    proposed = proposeMultiwords(args.corpus, args.min_count, args.min_likelihood_ratio, args.max_length)
+    output = parentDir + args.output
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w', encoding="utf-8") as outfile:
+        outfile.write('\n'.join(p['multiword'] for p in proposed))
+    with open(os.path.splitext(output)[0] + '.json', 'w', encoding="utf-8") as outfile:
+        json.dump(proposed, outfile)
+    print(output)
@@ -5,106 +5,64 @@
 # -------------------------------- Author: Audrey Berquand --------------------------------
 # ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
 
-import matplotlib.pyplot as plt
 import numpy as np
-import pandas
 import re, os
 import sys
-import statistics
 import json
 import math
 import itertools
 
-from os import listdir
-from os.path import isfile, join
-from sklearn.feature_extraction.text import TfidfVectorizer
 from DEA_methods import *
-from operator import itemgetter
-from statistics import mean
 from nltk import FreqDist
-from nltk.collocations import *
 from preprocessedCorpora.corpusInsight import corpusInsight
+from OntologyEntitiesFinder.frequencyEngine import loadCorpusFrequencies, frequencyRanking
+from OntologyEntitiesFinder.referenceCorpus import loadReferenceCorpus, BNC_REFERENCE
+from OntologyEntitiesFinder.posTagCache import cachedTagger
 
 fileDir = os.path.dirname(os.path.abspath(__file__))  #
 parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
 
-def ontologyEntityDefinition(inputPath, outputPath):
+def ontologyEntityDefinition(inputPath, outputPath, referenceCorpus=BNC_REFERENCE, incremental=False, workers=1):
     '''
     Statistical analysis of the parsed and pre-processed texts to identify concepts (ontology candidate entities)
     specific to input Corpus: Frequency of words + Weirdness Index or tf-idf filtering, comparison with WordNet and ECSS
     glossary of terms and acronyms
 
-    Input: .json files containing preprocessed raw text per corpus element (NLP pipeline outputs)
+    Input: .json files containing preprocessed raw text per corpus element (NLP pipeline outputs), general language
+    reference corpus of the Weirdness Index (see weirdnessIndex), incremental: if True only the documents added, changed
+    or removed since the last run are read, the corpus statistics are kept between runs (see lexiconStatistics.py),
+    workers: number of processes counting the .json files, the lexica are identical whatever the number of workers
     Output: a .json file with all identified candidate concepts/entities: 3 lexica, one frequency-based, one frequency-based
     + TF-IDF, and one frequency-based + Weirdness Index
     '''
+    # matplotlib is only imported when the stage runs (slow import)
+    import matplotlib.pyplot as plt
 
     fileDir = os.path.dirname(os.path.abspath(__file__))  #
     parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
 
-    # Extract all tokenized sentences from corpus
-    for path in inputPath:
-        print('Corpus Insight:\n')
-        #corpusInsight(path)
-
-        documents = [f for f in listdir(parentDir+path) if isfile(parentDir+path+f)]
-        allCorpusTokensPerSentence=[]
-        tokensPerDoc=[]
-
-        for d in documents:
-            with open(parentDir+path+ d, 'r') as infile:
-                input = json.load(infile)
-            tokensPerDoc.append(list(itertools.chain(*input)))
-            # retrieve tokens per sentence
-            for item in input:
-                allCorpusTokensPerSentence.append(item)
-
-    # Join tokenized sentences
-    allTokens = list(itertools.chain(*allCorpusTokensPerSentence))
-    print('Number of documents:', len(tokensPerDoc))
-    print('Initial Number of tokens:', len(allTokens))
-
-    # Corpus dictionary
-    dic = set(allTokens)
-    print('Initial Dictionary Size:', len(dic))
-
-    # Filter out all POS which are not Nouns (NN)
-    tags, taggedWords=tagger(dic)
-    nouns = [[item[0] for item in taggedWords if item[1] == 'NN']]
-    nouns.append([item[0] for item in taggedWords if item[1] == 'NNS'])
-    nouns = list(itertools.chain(*nouns))
-
-    # only use nouns for entities identification
-    dic=nouns
-    numberOfWords = len(dic)
-
-    # only use tokens which are in the dictionary of nouns
-    f_tokens=[token for token in allTokens if token in dic]
-    print('Number of tokens, after filtering out all non-nouns:', len(f_tokens))
-    print('New dictionary size after noun filtering:', numberOfWords)
+    # Corpus dictionary restricted to nouns, counts by integer id
+    frequencies, nounIds, numberOfWords = corpusNouns(inputPath, incremental, workers)
+    tokenCounts = frequencies.tokenCounts
+    nounCounts = tokenCounts[nounIds]
 
 
     # ------------------------------------------------------------------------------------------------------------------
     # Frequency Analysis -----------------------------------------------------------------------------------------------
     # ------------------------------------------------------------------------------------------------------------------
 
-    # Get all Frequencies per words over all corpus:
-    fdist1 = FreqDist(f_tokens)
-    allFrequencies = [frequency for (word, frequency) in fdist1.most_common(numberOfWords)]
-    allWordsWithFrequency = [[word, frequency] for (word, frequency) in fdist1.most_common(numberOfWords)]
-
-    # Frequency Average
-    aveFreq = math.floor(sum(fdist1.values()) / numberOfWords)
+    # Get all Frequencies per words over all corpus, most frequent first, frequency average and z-scores
+    rankedIds, allFrequencies, aveFreq, allZscores = frequencyScores(nounIds, nounCounts, numberOfWords)
 
     # Set Threshold
     freqThreshold = aveFreq
 
     # Frequency per word plot
     fig1 = plt.figure()
-    plt.plot(sorted(fdist1.values()))
+    plt.plot(np.sort(nounCounts))
     thresholdCurve = [aveFreq for i in range(numberOfWords)]
     plt.plot(thresholdCurve)
-    plt.yticks(np.arange(0, max(fdist1.values()), step=150))
+    plt.yticks(np.arange(0, nounCounts.max(), step=150))
     fig1.suptitle('Corpus Words Frequency-based Dictionary')
     plt.ylabel('Frequency')
     plt.grid()
@@ -113,24 +71,12 @@ def ontologyEntityDefinition(inputPath, outputPath):
     plt.close
 
     # Count how many values higher or equal to average frequency
-    L = len([i for i in fdist1.values() if i >= freqThreshold])
+    L = int(np.count_nonzero(nounCounts >= freqThreshold))
 
     # ------------------------------------------------------------------------------------------------------------------
     # First filtering of candidate entities based on frequency z-score -------------------------------------------------
     # ------------------------------------------------------------------------------------------------------------------
 
-    # standard deviation:
-    standardDev = statistics.stdev(allFrequencies)
-
-    # Compute z-scores of all words
-    allZscores = []
-    wordsZscores = []
-
-    for item in allWordsWithFrequency:
-        score = zscore(item[1], standardDev, aveFreq)
-        wordsZscores.append([item[0], score])
-        allZscores.append(score)
-
     # Show z-score as histogram
     fig2 = plt.figure()
     plt.hist(allZscores, np.arange(-0.5, 6, 0.25))
@@ -143,7 +89,8 @@ def ontologyEntityDefinition(inputPath, outputPath):
 
     # Filter words based on z-score, only z-score >= zscoreThreshold are accepted
     zscoreThreshold = 0
-    candidateEntities = [i[0] for i in wordsZscores if i[1] >= zscoreThreshold]
+    candidateIds = rankedIds[allZscores >= zscoreThreshold]
+    candidateEntities = frequencies.tokens(candidateIds)
 
     print('\n---> Frequency Analysis')
     print('Initial Input of Words (dictionary):', numberOfWords)
@@ -156,33 +103,19 @@ def ontologyEntityDefinition(inputPath, outputPath):
     # ------------------------------------------------------------------------------------------------------------------
 
     print('\n---> TF-IDF Filtering')
-    # For each candidate entity from candidate entities
-    allTfIdf = []
-    allWords=[word for [word, f] in allWordsWithFrequency ]
-    for token in candidateEntities:
-        # Get Term frequency
-        tf = allWordsWithFrequency[allWords.index(token)][1]
-
-        # Get Term IDF
-        df = 0
-        for doc in tokensPerDoc:
-            if token in doc:
-                df=df+1
-
-        idf = math.log10(len(tokensPerDoc)/df)
-
-        # Compute and save TF-IDF
-        tfidf = tf*idf
-        allTfIdf.append([token, tfidf])
+    # For each candidate entity from candidate entities: term frequency * log10(number of documents / df), from the
+    # document-term matrix
+    allTfIdf = frequencies.tfIdf(candidateIds)
 
     # Get average TF-IDF
-    # get average
-    allScores = [item[1] for item in allTfIdf]
-    av_tfidf = round(sum(allScores) / len(allScores), 2)
-
-    # select all above average tf-idf, and all with average above tf
-    candidateEntities2 = [item for item in allTfIdf if item[1] > av_tfidf and item[0] in candidateEntities]
-    candidateEntities2 = sorted(candidateEntities2, reverse=True, key=itemgetter(1))
+    # get average (summed in candidate order, as floats)
+    av_tfidf = averageTfIdf(allTfIdf)
+
+    # select all above average tf-idf, highest first
+    selected = np.flatnonzero(allTfIdf > av_tfidf)
+    selected = selected[np.argsort(-allTfIdf[selected], kind='stable')]
+    candidateEntities2 = [[candidateEntities[i], score] for i, score in zip(selected.tolist(),
+                                                                             allTfIdf[selected].tolist())]
     print('The average tf-idf is ', av_tfidf, '. There are', len(candidateEntities2), 'words above the average TF-IDF')
 
 
@@ -196,7 +129,7 @@ def ontologyEntityDefinition(inputPath, outputPath):
     fdist1 = FreqDist(input_weird)
     # Get all Frequencies per words:
     allWordsWithFrequency = [[word, frequency] for (word, frequency) in fdist1.most_common(len(input_weird))]
-    candidateEntities3 = weirdnessIndex(input_weird, allWordsWithFrequency, len(input_weird))
+    candidateEntities3 = weirdnessIndex(input_weird, allWordsWithFrequency, len(input_weird), referenceCorpus)
 
     # ------------------------------------------------------------------------------------------------------------------
     # RESULTS ----------------------------------------------------------------------------------------------------------
@@ -223,76 +156,124 @@ def ontologyEntityDefinition(inputPath, outputPath):
         json.dump({'candidateFreq': candidateEntities, 'candidateTFIDF': candidateEntities2, 'candidateWeird': candidateEntities3}, outfile)
     return
 
-def weirdnessIndex(vocab, vocabWithFrequency, CorpusNumberOfTokens):
+def corpusNouns(inputPath, incremental=False, workers=1):
     '''
-    Application of Weirdness Factor filtering to pre-selected set of candidate entities based on their term frequency
-    Input: list of candidate entities after frequency filtering, candidate entities frequencies, total number of tokens
-           in pre-processed corpus
-    Output: new set of candidate entities with a weirdness index higher than threshold
+    Count all tokens of the pre-processed corpora and restrict the corpus dictionary to nouns
+    Input: pre-processed corpus paths, incremental and workers (see ontologyEntityDefinition)
+    Output: CorpusFrequencies of the corpora, array of the ids of the nouns (in order of first appearance in corpus),
+    number of nouns
     '''
-    fileDir = os.path.dirname(os.path.abspath(__file__))  #
-    parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+    # Count all tokens of corpus, from the corpus token stores if available, otherwise streamed from the .json files,
+    # or from the corpus statistics of the previous runs (incremental)
+    # Tokens are interned once to integer ids (order of first appearance in corpus), all counts are arrays by id
+    for path in inputPath:
+        print('Corpus Insight:\n')
+        #corpusInsight(path)
+    frequencies = loadCorpusFrequencies(inputPath, incremental, workers)
 
-    # Load BNC Corpus words frequency pairs ----------------------------------------------------------------------------
-    temp = []
-    bncfrequency = []
+    print('Number of documents:', frequencies.numberOfDocuments)
+    print('Initial Number of tokens:', frequencies.numberOfTokens)
 
-    with open(parentDir + '/AdditionalDocuments/BNCWordFrequency.txt', encoding="utf-8") as inputfile:
-        for line in inputfile:
-            temp.append(line.strip())  # .split('\t'))
-        for item in temp:
-            new=item.split(' ¦ ')
-            new[1]=int(new[1])
-            bncfrequency.append(new)
+    # Corpus dictionary
+    dic = set(frequencies.vocabulary)
+    print('Initial Dictionary Size:', len(dic))
 
-    # Get BNC number of tokens
-    BNCNumberOfTokens = len(bncfrequency)
-    print(BNCNumberOfTokens)
-    j = 1 # placement of word frequency in file
+    # Filter out all POS which are not Nouns (NN), tags of the words already tagged by previous runs are cached
+    taggedWords = cachedTagger(dic)
+    nouns = [[item[0] for item in taggedWords if item[1] == 'NN']]
+    nouns.append([item[0] for item in taggedWords if item[1] == 'NNS'])
+    nouns = list(itertools.chain(*nouns))
+
+    # only use nouns for entities identification
+    numberOfWords = len(nouns)
 
-    # For each tokens (pre-filtered with frequency analysis), find token frequency in the BNC --------------------------
-    vocabFrequencyCorpusAndBNC = []
+    # only use tokens which are in the dictionary of nouns (ids kept in order of first appearance in corpus)
+    nounIds = np.flatnonzero(frequencies.mask(nouns))
+    print('Number of tokens, after filtering out all non-nouns:', int(frequencies.tokenCounts[nounIds].sum()))
+    print('New dictionary size after noun filtering:', numberOfWords)
+    return frequencies, nounIds, numberOfWords
 
-    for i in vocab:
-        inBNC = False
+def frequencyScores(nounIds, nounCounts, numberOfWords):
+    '''
+    Frequency z-scores of the nouns
+    Input: array of the ids of the nouns, their number of occurrences, number of nouns
+    Output: ids and frequencies sorted by decreasing frequency, frequency average, z-score of each sorted id
+    '''
+    rankedIds, allFrequencies = frequencyRanking(nounIds, nounCounts)
 
-        for sublist in bncfrequency:
-            if i in sublist:
-                inBNC = True
-                vocabFrequencyCorpusAndBNC.append([i, vocabWithFrequency[vocab.index(i)][1], sublist[j]])
+    # Frequency Average
+    aveFreq = math.floor(int(nounCounts.sum()) / numberOfWords)
 
+    # standard deviation:
+    standardDev = np.std(allFrequencies, ddof=1)
 
-        if not inBNC:
-            vocabFrequencyCorpusAndBNC.append([i, vocabWithFrequency[vocab.index(i)][1], 0])
+    # Compute z-scores of all words
+    allZscores = zscore(allFrequencies, standardDev, aveFreq)
+    return rankedIds, allFrequencies, aveFreq, allZscores
 
-    # ------------------------------------------------------------------------------------------------------------------
-    # Calculate Weirdness Index of each word
-    # ------------------------------------------------------------------------------------------------------------------
+def averageTfIdf(allTfIdf):
+    '''
+    Input: float array of the tf-idf of the candidate entities
+    Output: average tf-idf (summed in candidate order, as floats), rounded to 2 decimals
+    '''
+    return round(sum(allTfIdf.tolist()) / len(allTfIdf), 2)
 
+def weirdnessScores(bnc, corpusFrequencies, BNCNumberOfTokens, CorpusNumberOfTokens):
+    '''
+    Weirdness Index z-scores of the reference entries of the candidate entities
+    Input: int64 arrays of the reference and corpus frequencies of each entry, number of tokens (entries) of the
+           reference and of the corpus
+    Output: entries sorted by decreasing Weirdness Index, sorted Weirdness Indexes, average Weirdness Index, z-score of
+            each sorted entry
+    '''
     # Weirdness Index is defined as "a measure of the use of a word in special language compared to its use in a
     # representative corpus of general language texts", in this case, the BNC
 
-    weird = []
-    for line in vocabFrequencyCorpusAndBNC:
-        weirdnessFactor = round((BNCNumberOfTokens * line[1]) / ((1 + line[2]) * CorpusNumberOfTokens), 0)
-        weird.append([line[0], weirdnessFactor])
-    weird_sorted = sorted(weird, reverse=True, key=itemgetter(1))
+    weird = np.round((BNCNumberOfTokens * corpusFrequencies) / ((1 + bnc) * CorpusNumberOfTokens), 0)
+    order = np.argsort(-weird, kind='stable')
+    Wscores = weird[order]
 
     # Average Weirdness Index
-    averageWeirdness = round(mean([row[1] for row in weird]), 0)
+    averageWeirdness = float(round(weird.sum() / len(weird), 0))
 
     # Standard Deviation
-    Wscores = [score for (word, score) in weird_sorted]
-    standardDev = statistics.stdev(Wscores)
+    standardDev = np.std(Wscores, ddof=1)
 
     # ------------------------------------------------------------------------------------------------------------------
     # Calculate z-factor of each candidate entity
     # ------------------------------------------------------------------------------------------------------------------
-    wordsZscores = []
-    for item in weird_sorted:
-        score = zscore(item[1], standardDev, averageWeirdness)
-        wordsZscores.append([item[0], score])
-    Zscores = [score for (word, score) in wordsZscores]
+    Zscores = zscore(Wscores, standardDev, averageWeirdness)
+    return order, Wscores, averageWeirdness, Zscores
+
+def weirdnessIndex(vocab, vocabWithFrequency, CorpusNumberOfTokens, referenceCorpus=BNC_REFERENCE):
+    '''
+    Application of Weirdness Factor filtering to pre-selected set of candidate entities based on their term frequency
+    Input: list of candidate entities after frequency filtering, candidate entities frequencies, total number of tokens
+           in pre-processed corpus, general language reference corpus (file in AdditionalDocuments or reference
+           store name, see referenceCorpus.py), by default the BNC word frequencies
+    Output: new set of candidate entities with a weirdness index higher than threshold
+    '''
+    import matplotlib.pyplot as plt
+
+    # Load BNC Corpus words frequency pairs, from the reference store (see referenceCorpus.py) -------------------------
+    reference = loadReferenceCorpus(referenceCorpus)
+
+    # Get BNC number of tokens (number of entries of the reference)
+    BNCNumberOfTokens = reference.numberOfEntries
+    print(BNCNumberOfTokens)
+
+    # For each tokens (pre-filtered with frequency analysis), find token frequency in the BNC (0 if not in BNC) --------
+    # one row per BNC entry of the token
+    rowIndex, bnc = reference.lookup(vocab)
+    rows = [vocab[i] for i in rowIndex.tolist()]
+    corpusFrequencies = np.array([frequency for (word, frequency) in vocabWithFrequency], dtype=np.int64)[rowIndex]
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Calculate Weirdness Index of each word
+    # ------------------------------------------------------------------------------------------------------------------
+
+    order, Wscores, averageWeirdness, Zscores = weirdnessScores(bnc, corpusFrequencies, BNCNumberOfTokens,
+                                                                CorpusNumberOfTokens)
 
     # Show z-score as histogram
     fig2 = plt.figure()
@@ -308,7 +289,7 @@ def weirdnessIndex(vocab, vocabWithFrequency, CorpusNumberOfTokens):
     # ------------------------------------------------------------------------------------------------------------------
     # only z-score >= zscoreThreshold are accepted
     zscoreThreshold = 0
-    candidates = [i[0] for i in wordsZscores if i[1] >= zscoreThreshold]
+    candidates = [rows[i] for i in order[Zscores >= zscoreThreshold].tolist()]
 
     print('\n---> Weirdness Analysis')
     print('Initial Input of candidate entities:', len(vocab))
@@ -0,0 +1,121 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+posTagCache.py keeps the Part-Of-Speech tags of the corpus dictionary words between runs of the lexicon generator
+(noun filtering of ontologyEntityDefinition): a word -> tag binary (pickle) cache, keyed by the NLTK version and tagger
+model, is consulted first and only the words never tagged are sent to nltk.pos_tag, in batches. The cache is shared
+by all corpora and runs, so re-running the lexicon generator after adding a few documents only tags their new words.
+
+The dictionary is tagged as a sequence of words, the tag of a word depends on its neighbours in the sequence (and the
+dictionary order differs between runs): a cached word keeps the tag given when it was first tagged.
+'''
+
+import hashlib
+import os
+import pickle
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+
+# Increment when the tagging of the words changes, invalidates previous caches
+CACHE_VERSION = 1
+
+# Number of words tagged per nltk.pos_tag call
+BATCH_SIZE = 10000
+
+# NLTK tagger models (nltk.pos_tag default tagger), the first one found identifies the model used
+TAGGER_MODELS = ['taggers/averaged_perceptron_tagger_eng/', 'taggers/averaged_perceptron_tagger/']
+
+cacheFile = parentDir + '/OntologyEntitiesFinder/cache/posTags.pkl'
+
+
+class PosTagCache:
+    '''
+    POS tags of all words tagged so far
+    tags: dictionary word -> tag
+    key: tagger key (see taggerKey) the tags were given with
+    '''
+
+    def __init__(self, tags, key):
+        self.tags = tags
+        self.key = key
+
+
+def taggerKey():
+    '''
+    Identifies the tagger: cache version, NLTK version, tagger model location and modification time
+    Output: hexadecimal hash
+    '''
+    import nltk
+
+    h = hashlib.sha1()
+    h.update(str(CACHE_VERSION).encode('utf-8'))
+    h.update(nltk.__version__.encode('utf-8'))
+    for model in TAGGER_MODELS:
+        try:
+            path = nltk.data.find(model)
+        except LookupError:
+            continue
+        path = getattr(path, 'path', str(path))
+        h.update(path.encode('utf-8'))
+        if os.path.exists(path):
+            h.update(str(os.stat(path).st_mtime_ns).encode('utf-8'))
+        break
+    return h.hexdigest()
+
+
+def loadPosTagCache(key):
+    '''
+    Input: tagger key
+    Output: PosTagCache, empty if there is no cache or if it was built with another tagger
+    '''
+    if os.path.isfile(cacheFile):
+        try:
+            with open(cacheFile, 'rb') as f:
+                cache = pickle.load(f)
+            if cache.key == key:
+                return cache
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            pass
+    return PosTagCache({}, key)
+
+
+def savePosTagCache(cache):
+    '''
+    Input: PosTagCache, written to a temporary file then renamed, a cache is never partially written
+    '''
+    os.makedirs(os.path.dirname(cacheFile), exist_ok=True)
+    temporaryFile = cacheFile + '.tmp'
+    with open(temporaryFile, 'wb') as f:
+        pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temporaryFile, cacheFile)
+
+
+def cachedTagger(tokens, useCache=True, batchSize=BATCH_SIZE):
+    '''
+    Part-Of-Speech Tagging of a dictionary of words, with nltk tagger, tags read from the cache if available
+    Input: iterable of words, useCache: if False all words are tagged and the cache is not updated, number of words
+    tagged per nltk.pos_tag call
+    Outputs: list of (word, tag), in tokens order
+    '''
+    import nltk
+
+    words = list(tokens)
+    cache = loadPosTagCache(taggerKey()) if useCache else PosTagCache({}, None)
+    tags = cache.tags
+
+    # Words never tagged, in tokens order
+    unseen = [word for word in dict.fromkeys(words) if word not in tags]
+    for start in range(0, len(unseen), batchSize):
+        tags.update(nltk.pos_tag(unseen[start:start + batchSize]))
+
+    if useCache and unseen:
+        savePosTagCache(cache)
+    print('POS tagging:', len(words) - len(unseen), 'words from cache,', len(unseen), 'words tagged')
+
+    return [(word, tags[word]) for word in words]
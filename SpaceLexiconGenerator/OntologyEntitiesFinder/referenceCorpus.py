@@ -0,0 +1,227 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+referenceCorpus.py stores the general language reference corpora of the Weirdness Index (word frequency lists such as
+AdditionalDocuments/BNCWordFrequency.txt, one 'word ¦ frequency' entry per line) in a compact binary format, parsed
+once and loaded in milliseconds afterwards:
+
+AdditionalDocuments/<reference name>_referenceStore/
+    vocabulary.npy: sorted array of the UTF-8 encoded words, a word id is its index (looked up by binary search)
+    offsets.npy: int64 array, start of the frequencies of each word id in frequencies.npy (+ number of frequencies)
+    frequencies.npy: int64 array, frequencies of the entries of each word id, in file order
+    source.json: reference file size and modification time, number of entries of the reference
+
+A store is rebuilt when its reference file changes (see loadReferenceCorpus). A store can also be built from a
+pre-processed corpus, e.g., a general Wikipedia dump, and is then used without reference file:
+python OntologyEntitiesFinder/referenceCorpus.py BNCWordFrequency.txt
+python OntologyEntitiesFinder/referenceCorpus.py --corpus /preprocessedCorpora/WikiGeneral/ --name wikiGeneral
+'''
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from itertools import chain
+from os.path import isfile, join
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+sys.path.append(parentDir)
+
+REFERENCE_DIRECTORY = parentDir + '/AdditionalDocuments/'
+BNC_REFERENCE = 'BNCWordFrequency.txt'
+STORE_SUFFIX = '_referenceStore'
+SEPARATOR = ' ¦ '
+
+
+class ReferenceCorpus:
+    '''
+    Word frequencies of a general language reference corpus
+    Input: vocabulary (sorted bytes array of UTF-8 encoded words), int64 arrays of the offsets of each word frequencies
+    and of the frequencies, number of entries of the reference (lines of the reference file)
+    '''
+
+    def __init__(self, vocabulary, offsets, frequencies, numberOfEntries):
+        self.vocabulary = vocabulary
+        self.offsets = offsets
+        self.frequencies = frequencies
+        self.numberOfEntries = numberOfEntries
+
+    def __len__(self):
+        return len(self.vocabulary)
+
+    def wordIds(self, words):
+        '''
+        Input: list of words
+        Output: int64 array, id of each word, -1 for the words which are not in the reference
+        '''
+        encoded = np.array([word.encode('utf-8') for word in words], dtype=bytes)
+        ids = np.searchsorted(self.vocabulary, encoded).astype(np.int64)
+        inVocabulary = ids < len(self.vocabulary)
+        inVocabulary[inVocabulary] = self.vocabulary[ids[inVocabulary]] == encoded[inVocabulary]
+        ids[~inVocabulary] = -1
+        return ids
+
+    def lookup(self, words):
+        '''
+        Reference frequencies of a set of words, one entry per reference entry containing the word (in file order),
+        one entry of frequency 0 for a word which is not in the reference
+        Input: list of words
+        Output: int64 arrays, index in words and reference frequency of each entry
+        '''
+        ids = self.wordIds(words)
+        found = ids >= 0
+        starts = np.where(found, self.offsets[ids], 0)
+        counts = np.where(found, self.offsets[ids + 1] - starts, 1)
+
+        rows = np.repeat(np.arange(len(words), dtype=np.int64), counts)
+        # position of each entry among the entries of its word
+        positions = np.arange(len(rows), dtype=np.int64) - np.repeat(np.cumsum(counts) - counts, counts)
+        inReference = np.repeat(found, counts)
+        frequencies = np.zeros(len(rows), dtype=np.int64)
+        frequencies[inReference] = self.frequencies[(np.repeat(starts, counts) + positions)[inReference]]
+        return rows, frequencies
+
+
+def storeDirectory(name):
+    '''
+    Input: reference file name or reference name, e.g., BNCWordFrequency.txt
+    Output: reference store directory (absolute path)
+    '''
+    return REFERENCE_DIRECTORY + os.path.splitext(name)[0] + STORE_SUFFIX + '/'
+
+
+def fileState(file):
+    '''
+    Input: reference file (absolute path)
+    Output: [size, modification time] of the file, None if there is no file
+    '''
+    if not isfile(file):
+        return None
+    stat = os.stat(file)
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def readReferenceFile(file):
+    '''
+    Parse a reference file, one entry per line: word ¦ frequency (¦ other fields). A word can appear in several
+    entries, and any field but the frequency identifies the entry, as the word lists were searched before
+    Input: reference file (absolute path)
+    Output: ReferenceCorpus
+    '''
+    entries = {}
+    numberOfEntries = 0
+    with open(file, encoding="utf-8") as inputfile:
+        for line in inputfile:
+            fields = line.strip().split(SEPARATOR)
+            if fields == ['']:
+                continue
+            frequency = int(fields[1])
+            for field in dict.fromkeys(fields[:1] + fields[2:]):
+                entries.setdefault(field, []).append(frequency)
+            numberOfEntries = numberOfEntries + 1
+
+    return sortedReference(list(entries), list(entries.values()), numberOfEntries)
+
+
+def sortedReference(words, frequencies, numberOfEntries):
+    '''
+    Input: list of words, list of the frequencies of the entries of each word, number of entries of the reference
+    Output: ReferenceCorpus, words sorted for the binary search
+    '''
+    vocabulary = np.array([word.encode('utf-8') for word in words], dtype=bytes)
+    order = np.argsort(vocabulary, kind='stable')
+    frequencies = [frequencies[i] for i in order.tolist()]
+    offsets = np.zeros(len(words) + 1, dtype=np.int64)
+    np.cumsum([len(f) for f in frequencies], out=offsets[1:])
+    frequencies = np.fromiter(chain.from_iterable(frequencies), dtype=np.int64, count=int(offsets[-1]))
+    return ReferenceCorpus(vocabulary[order], offsets, frequencies, numberOfEntries)
+
+
+def saveReferenceStore(reference, name, state=None):
+    '''
+    Input: ReferenceCorpus, reference file name or reference name, state of the reference file (see fileState)
+    '''
+    target = storeDirectory(name)
+    os.makedirs(target, exist_ok=True)
+    if isfile(join(target, 'source.json')):
+        os.remove(join(target, 'source.json'))
+    np.save(join(target, 'offsets.npy'), reference.offsets)
+    np.save(join(target, 'frequencies.npy'), reference.frequencies)
+    np.save(join(target, 'vocabulary.npy'), reference.vocabulary)
+    # written last: a store without source.json is incomplete and never loaded
+    with open(join(target, 'source.json'), 'w', encoding="utf-8") as outfile:
+        json.dump({'state': state, 'numberOfEntries': reference.numberOfEntries}, outfile)
+
+
+def readReferenceStore(name):
+    '''
+    Input: reference file name or reference name
+    Output: ReferenceCorpus, state of the reference file the store was built from
+    '''
+    target = storeDirectory(name)
+    with open(join(target, 'source.json'), 'r', encoding="utf-8") as infile:
+        source = json.load(infile)
+    reference = ReferenceCorpus(np.load(join(target, 'vocabulary.npy')), np.load(join(target, 'offsets.npy')),
+                                np.load(join(target, 'frequencies.npy')), source['numberOfEntries'])
+    return reference, source['state']
+
+
+def loadReferenceCorpus(name=BNC_REFERENCE):
+    '''
+    Load a reference corpus from its store if up to date, otherwise parse the reference file and save its store
+    Input: reference file name in AdditionalDocuments, e.g., BNCWordFrequency.txt, or name of a store built from a
+    pre-processed corpus (see referenceFromCorpus)
+    Output: ReferenceCorpus
+    '''
+    file = REFERENCE_DIRECTORY + name
+    state = fileState(file)
+    if isfile(join(storeDirectory(name), 'source.json')):
+        reference, storeState = readReferenceStore(name)
+        if state is None or storeState == state:
+            return reference
+        print('Reference store of', name, 'is out of date, rebuilt from', file)
+
+    reference = readReferenceFile(file)
+    saveReferenceStore(reference, name, state)
+    return reference
+
+
+def referenceFromCorpus(path, name):
+    '''
+    Build a reference store from a pre-processed corpus, one entry per token of the corpus dictionary
+    Input: pre-processed corpus path, e.g., /preprocessedCorpora/WikiGeneral/, reference name
+    Output: ReferenceCorpus
+    '''
+    from preprocessedCorpora.tokenStore import corpusArrays
+
+    vocabulary, tokenCounts, documentFrequencies, numberOfDocuments, numberOfTokens = corpusArrays(path)
+    reference = sortedReference(vocabulary, [[count] for count in tokenCounts.tolist()], len(vocabulary))
+    saveReferenceStore(reference, name)
+    return reference
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the binary store of a Weirdness Index reference corpus')
+    parser.add_argument('reference', nargs='?', default=BNC_REFERENCE, help='reference file in AdditionalDocuments')
+    parser.add_argument('--corpus', help='pre-processed corpus path, the reference is built from its token counts')
+    parser.add_argument('--name', help='reference name, required with --corpus')
+    args = parser.parse_args()
+
+    if args.corpus:
+        if not args.name:
+            parser.error('--name is required with --corpus')
+        reference = referenceFromCorpus(args.corpus, args.name)
+        name = args.name
+    else:
+        reference = loadReferenceCorpus(args.reference)
+        name = args.reference
+    print('Reference store of', name, ':', reference.numberOfEntries, 'entries,', len(reference), 'words')
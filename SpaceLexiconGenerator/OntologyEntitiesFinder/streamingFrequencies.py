@@ -0,0 +1,384 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+streamingFrequencies.py is an approximate streaming mode of the lexicon generator (ontologyEntityDefinition) for
+corpora too large for an exact dictionary in memory: the documents are read once, one sentence at a time, and the token
+statistics are kept in structures whose size is set by error bounds, not by the corpus size:
+
+- CountMinSketch (Cormode and Muthukrishnan, 2005): number of occurrences and number of documents of the tokens,
+  an estimate is never below the exact count, and above it by at most epsilon * total with probability 1 - delta
+- TopTokens: heavy hitters, the topK tokens of highest estimated number of occurrences, re-estimated as the corpus is
+  read: a token whose number of occurrences is above the lowest estimate kept is always kept
+- DistinctSample: uniform sample of the corpus dictionary, the sampleSize tokens of smallest hash (bottom-k sketch),
+  counted exactly: estimates the dictionary size, and the frequency average and standard deviation of the nouns used by
+  the z-score filtering
+
+The three lexica of ontologyEntityDefinition are computed from the nouns of the top tokens: frequency z-score
+filtering, then TF-IDF (document frequencies of the sketch) or Weirdness Index filtering, nouns of equal estimates in
+order of first appearance as ontologyEntityDefinition. The lexica are identical to ontologyEntityDefinition when the
+estimates are exact (e.g., dictionary smaller than the top tokens and the sample), otherwise an overestimated count can
+change the rank of a noun, or its selection near a threshold.
+
+Run from the SpaceLexiconGenerator directory:
+python OntologyEntitiesFinder/streamingFrequencies.py /preprocessedCorpora/BooksWiki/ --output
+/Outputs/entityFinderOutputs/conceptsIdentificationBooksWikiStreaming.json --epsilon 1e-5 --top-k 50000
+'''
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+from collections import Counter
+from os import listdir
+from os.path import isfile, join
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+sys.path.append(parentDir)
+
+from DEA_methods import zscore
+from NLPPipeline.documentStream import streamTokenLists
+from OntologyEntitiesFinder.frequencyEngine import tfIdf
+from OntologyEntitiesFinder.ontologyEntityDefinition import averageTfIdf, weirdnessIndex
+from OntologyEntitiesFinder.posTagCache import cachedTagger
+from OntologyEntitiesFinder.referenceCorpus import BNC_REFERENCE
+
+# Relative error and failure probability of the count-min sketches
+EPSILON = 1e-5
+DELTA = 0.01
+# Number of heavy hitters kept, size of the dictionary sample
+TOP_K = 50000
+SAMPLE_SIZE = 20000
+# Number of tokens read between two updates of the statistics
+BATCH_SIZE = 1000000
+
+
+def tokenHashes(tokens):
+    '''
+    Input: list of tokens
+    Output: uint64 array, hash of each token (stable between runs)
+    '''
+    return np.array([int.from_bytes(hashlib.blake2b(token.encode('utf-8'), digest_size=8).digest(), 'little')
+                     for token in tokens], dtype=np.uint64)
+
+
+class CountMinSketch:
+    '''
+    Approximate counts of tokens in a fixed size table: depth rows of width counters, a token is counted in one counter
+    per row and its estimate is the lowest of its counters
+    Input: epsilon, delta: an estimate exceeds the exact count by at most epsilon * total with probability 1 - delta
+    '''
+
+    def __init__(self, epsilon=EPSILON, delta=DELTA):
+        self.width = math.ceil(math.e / epsilon)
+        self.depth = math.ceil(math.log(1 / delta))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    def cells(self, hashes):
+        '''
+        Input: uint64 array of token hashes
+        Output: list of int64 arrays, counter of each token in each row (double hashing of the two halves of the hash)
+        '''
+        low = hashes & np.uint64(0xffffffff)
+        high = hashes >> np.uint64(32)
+        return [((low + np.uint64(i) * high) % np.uint64(self.width)).astype(np.int64) for i in range(self.depth)]
+
+    def add(self, hashes, counts):
+        '''
+        Input: uint64 array of token hashes (distinct), int64 array of their counts
+        '''
+        for row, cells in zip(self.table, self.cells(hashes)):
+            row += np.bincount(cells, weights=counts, minlength=self.width).astype(np.int64)
+        self.total = self.total + int(counts.sum())
+
+    def estimate(self, hashes):
+        '''
+        Input: uint64 array of token hashes
+        Output: int64 array of their estimated counts
+        '''
+        estimates = np.full(len(hashes), np.iinfo(np.int64).max, dtype=np.int64)
+        for row, cells in zip(self.table, self.cells(hashes)):
+            estimates = np.minimum(estimates, row[cells])
+        return estimates
+
+    def errorBound(self):
+        '''
+        Output: largest overestimate of a count, with probability 1 - delta
+        '''
+        return math.e / self.width * self.total
+
+
+class TopTokens:
+    '''
+    Heavy hitters: tokens of highest estimated counts, with the rank of their first appearance in the corpora (order of
+    the corpus dictionary of ontologyEntityDefinition, a token dropped and kept again later gets the rank of its new
+    appearance)
+    Input: number of tokens kept
+    '''
+
+    def __init__(self, size=TOP_K):
+        self.size = size
+        self.tokens = []
+        self.hashes = np.zeros(0, dtype=np.uint64)
+        self.estimates = np.zeros(0, dtype=np.int64)
+        self.firstSeen = np.zeros(0, dtype=np.int64)
+
+    def update(self, sketch, tokens, hashes, firstRank):
+        '''
+        Re-estimate the tokens kept and the tokens of a batch, keep the size tokens of highest estimates
+        Input: CountMinSketch of the numbers of occurrences (batch included), tokens of the batch (in order of first
+        appearance) and their hashes, rank of the first token of the batch
+        '''
+        kept = set(self.tokens)
+        new = [i for i, token in enumerate(tokens) if token not in kept]
+        allTokens = self.tokens + [tokens[i] for i in new]
+        allHashes = np.concatenate([self.hashes, hashes[new]])
+        firstSeen = np.concatenate([self.firstSeen, firstRank + np.array(new, dtype=np.int64)])
+        estimates = sketch.estimate(allHashes)
+        if len(allTokens) > self.size:
+            keep = np.sort(np.argpartition(-estimates, self.size - 1)[:self.size])
+            allTokens = [allTokens[i] for i in keep.tolist()]
+            allHashes = allHashes[keep]
+            firstSeen = firstSeen[keep]
+            estimates = estimates[keep]
+        self.tokens, self.hashes, self.estimates, self.firstSeen = allTokens, allHashes, estimates, firstSeen
+
+    def lowestEstimate(self):
+        '''
+        Output: lowest estimate kept if all size tokens are kept (a token not kept occurs at most as often), else 0
+        '''
+        return int(self.estimates.min()) if len(self.tokens) == self.size else 0
+
+
+class DistinctSample:
+    '''
+    Uniform sample of the distinct tokens of a corpus: the tokens of smallest hashes, counted exactly (a token of the
+    final sample had a hash below the sample threshold since its first occurrence)
+    Input: number of tokens sampled
+    '''
+
+    def __init__(self, size=SAMPLE_SIZE):
+        self.size = size
+        # token -> [hash, number of occurrences]
+        self.counts = {}
+        # largest hash kept, once the sample is full
+        self.threshold = np.iinfo(np.uint64).max
+
+    def add(self, tokens, hashes, counts):
+        '''
+        Input: tokens of a batch (distinct), their hashes and counts
+        '''
+        sample = self.counts
+        for i in np.flatnonzero(hashes <= np.uint64(self.threshold)).tolist():
+            if tokens[i] in sample:
+                sample[tokens[i]][1] += int(counts[i])
+            else:
+                sample[tokens[i]] = [int(hashes[i]), int(counts[i])]
+        if len(sample) > self.size:
+            kept = sorted(sample, key=lambda token: sample[token][0])[:self.size]
+            self.counts = {token: sample[token] for token in kept}
+            self.threshold = self.counts[kept[-1]][0]
+
+    def dictionarySize(self):
+        '''
+        Output: estimated number of distinct tokens (exact while the sample is not full)
+        '''
+        if len(self.counts) < self.size:
+            return len(self.counts)
+        return int(round((self.size - 1) / ((self.threshold + 1) / 2 ** 64)))
+
+
+class StreamingStatistics:
+    '''
+    Token statistics of corpora read once: count-min sketches of the numbers of occurrences and of documents, top
+    tokens, dictionary sample, number of documents
+    '''
+
+    def __init__(self, epsilon=EPSILON, delta=DELTA, topK=TOP_K, sampleSize=SAMPLE_SIZE):
+        self.tokenCounts = CountMinSketch(epsilon, delta)
+        self.documentFrequencies = CountMinSketch(epsilon, delta)
+        self.top = TopTokens(topK)
+        self.sample = DistinctSample(sampleSize)
+        self.numberOfDocuments = 0
+        # number of tokens of all batches so far, distinct per batch (rank of the first token of the next batch)
+        self.numberOfRanks = 0
+
+    def addBatch(self, counts, documents):
+        '''
+        Input: Counter of the numbers of occurrences of the tokens of a batch of documents (in order of first
+        appearance), Counter of their number of documents
+        '''
+        tokens = list(counts)
+        hashes = tokenHashes(tokens)
+        occurrences = np.array([counts[token] for token in tokens], dtype=np.int64)
+        self.tokenCounts.add(hashes, occurrences)
+        self.documentFrequencies.add(hashes, np.array([documents[token] for token in tokens], dtype=np.int64))
+        self.top.update(self.tokenCounts, tokens, hashes, self.numberOfRanks)
+        self.sample.add(tokens, hashes, occurrences)
+        self.numberOfRanks = self.numberOfRanks + len(tokens)
+
+
+def streamCorpusStatistics(inputPath, epsilon=EPSILON, delta=DELTA, topK=TOP_K, sampleSize=SAMPLE_SIZE,
+                           batchSize=BATCH_SIZE):
+    '''
+    Read pre-processed corpora once, one sentence at a time, the statistics are updated every batchSize tokens
+    Input: list of pre-processed corpus paths, error bounds and sizes of the statistics (see StreamingStatistics),
+    number of tokens per batch
+    Output: StreamingStatistics
+    '''
+    statistics = StreamingStatistics(epsilon, delta, topK, sampleSize)
+    counts = Counter()
+    documents = Counter()
+    batchTokens = 0
+    for path in inputPath:
+        corpusDirectory = parentDir + path
+        for d in [f for f in listdir(corpusDirectory) if isfile(join(corpusDirectory, f))]:
+            documentCounts = Counter()
+            for tokens in streamTokenLists(join(corpusDirectory, d)):
+                documentCounts.update(tokens)
+            counts.update(documentCounts)
+            documents.update(documentCounts.keys())
+            statistics.numberOfDocuments = statistics.numberOfDocuments + 1
+            batchTokens = batchTokens + sum(documentCounts.values())
+            if batchTokens >= batchSize:
+                statistics.addBatch(counts, documents)
+                counts, documents, batchTokens = Counter(), Counter(), 0
+    if counts:
+        statistics.addBatch(counts, documents)
+    return statistics
+
+
+def nounStatistics(top, sample, tags):
+    '''
+    Frequency statistics of the nouns of the corpus dictionary, estimated by strata: the nouns of the top tokens (counts
+    of the sketch, exact for the tokens of the sample) and the other nouns (tail), from the sample tokens which are not
+    top tokens, a uniform sample of the tail
+    Input: TopTokens, DistinctSample, dictionary token -> POS tag of the top and sample tokens
+    Output: estimated number of nouns, frequency average (rounded down, as ontologyEntityDefinition), standard deviation
+    '''
+    nouns = {token for token, tag in tags.items() if tag in ('NN', 'NNS')}
+    counts = np.array([sample.counts[token][1] if token in sample.counts else estimate
+                       for token, estimate in zip(top.tokens, top.estimates.tolist()) if token in nouns],
+                      dtype=np.float64)
+    kept = set(top.tokens)
+    tail = [token for token in sample.counts if token not in kept]
+    tailNouns = np.array([sample.counts[token][1] for token in tail if token in nouns], dtype=np.float64)
+    # number of tail tokens represented by each sampled tail token
+    scale = max(sample.dictionarySize() - len(kept), len(tail)) / len(tail) if tail else 0.0
+
+    numberOfWords = len(counts) + scale * len(tailNouns)
+    numberOfTokens = counts.sum() + scale * tailNouns.sum()
+    sumOfSquares = (counts ** 2).sum() + scale * (tailNouns ** 2).sum()
+    average = numberOfTokens / numberOfWords
+    standardDev = math.sqrt(max(sumOfSquares - numberOfWords * average ** 2, 0.0) / (numberOfWords - 1))
+    return int(round(numberOfWords)), math.floor(average), standardDev
+
+
+def streamingEntityDefinition(inputPath, outputPath, referenceCorpus=BNC_REFERENCE, epsilon=EPSILON, delta=DELTA,
+                              topK=TOP_K, sampleSize=SAMPLE_SIZE):
+    '''
+    Lexica of ontologyEntityDefinition from the streaming statistics of the corpora, memory independent of the corpus
+    size
+    Input: .json files containing preprocessed raw text per corpus element, output path (list, the first path is used),
+           general language reference corpus of the Weirdness Index, error bounds of the count-min sketches (epsilon,
+           delta), number of top tokens kept (the candidate entities are among them), size of the dictionary sample
+    Output: a .json file with the 3 lexica of ontologyEntityDefinition (approximate) and the statistics error bounds
+    '''
+    statistics = streamCorpusStatistics(inputPath, epsilon, delta, topK, sampleSize)
+    top = statistics.top
+    sample = statistics.sample
+
+    print('Number of documents:', statistics.numberOfDocuments)
+    print('Initial Number of tokens:', statistics.tokenCounts.total)
+    print('Estimated Dictionary Size:', sample.dictionarySize())
+    print('Count-min sketches:', statistics.tokenCounts.depth, 'x', statistics.tokenCounts.width, 'counters, counts '
+          'overestimated by at most', round(statistics.tokenCounts.errorBound(), 1), 'occurrences and',
+          round(statistics.documentFrequencies.errorBound(), 1), 'documents (probability', 1 - delta, ')')
+
+    # Filter out all POS which are not Nouns (NN), for the top tokens and the dictionary sample
+    tags = dict(cachedTagger(list(dict.fromkeys(top.tokens + list(sample.counts)))))
+    isNoun = [tags[token] in ('NN', 'NNS') for token in top.tokens]
+
+    # Frequency average and standard deviation of the nouns: top tokens and dictionary sample
+    numberOfWords, aveFreq, standardDev = nounStatistics(top, sample, tags)
+    print('Estimated number of nouns:', numberOfWords)
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Frequency Analysis: nouns of the top tokens, most frequent first (equal estimates in order of first appearance)
+    # ------------------------------------------------------------------------------------------------------------------
+    nouns = np.flatnonzero(isNoun)
+    nouns = nouns[np.lexsort((top.firstSeen[nouns], -top.estimates[nouns]))]
+    allFrequencies = top.estimates[nouns]
+    allZscores = zscore(allFrequencies, standardDev, aveFreq)
+
+    zscoreThreshold = 0
+    candidates = nouns[allZscores >= zscoreThreshold]
+    candidateEntities = [top.tokens[i] for i in candidates.tolist()]
+
+    print('\n---> Frequency Analysis')
+    print('The average frequency is ', aveFreq, '. After Frequency Index z-score filtering (threshold of z-score:',
+          zscoreThreshold, '), the number of candidate entities is:', len(candidateEntities))
+    if top.lowestEstimate() > aveFreq + zscoreThreshold * standardDev:
+        print('Warning: the', topK, 'top tokens all occur more often than the frequency threshold, candidate entities '
+              'might be missing, increase the number of top tokens')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Option 1: TF-IDF Filtering, document frequencies of the sketch (at most the number of documents)
+    # ------------------------------------------------------------------------------------------------------------------
+    print('\n---> TF-IDF Filtering')
+    documentFrequencies = np.minimum(statistics.documentFrequencies.estimate(top.hashes[candidates]),
+                                     statistics.numberOfDocuments)
+    allTfIdf = tfIdf(top.estimates[candidates], documentFrequencies, statistics.numberOfDocuments)
+    av_tfidf = averageTfIdf(allTfIdf)
+    selected = np.flatnonzero(allTfIdf > av_tfidf)
+    selected = selected[np.argsort(-allTfIdf[selected], kind='stable')]
+    candidateEntities2 = [[candidateEntities[i], score] for i, score in zip(selected.tolist(),
+                                                                             allTfIdf[selected].tolist())]
+    print('The average tf-idf is ', av_tfidf, '. There are', len(candidateEntities2), 'words above the average TF-IDF')
+
+    # ------------------------------------------------------------------------------------------------------------------
+    # Option 2: Weirdness Indexing Filtering, as ontologyEntityDefinition
+    # ------------------------------------------------------------------------------------------------------------------
+    print('\n---> Weirdness Index')
+    candidateEntities3 = weirdnessIndex(candidateEntities, [[word, 1] for word in candidateEntities],
+                                        len(candidateEntities), referenceCorpus)
+
+    # Save Outputs
+    outputPath = parentDir + outputPath[0]
+    print(outputPath)
+    with open(outputPath, 'w') as outfile:
+        json.dump({'candidateFreq': candidateEntities, 'candidateTFIDF': candidateEntities2,
+                   'candidateWeird': candidateEntities3,
+                   'streamingStatistics': {'epsilon': epsilon, 'delta': delta, 'topK': topK, 'sampleSize': sampleSize,
+                                           'numberOfTokens': statistics.tokenCounts.total,
+                                           'countErrorBound': statistics.tokenCounts.errorBound(),
+                                           'documentErrorBound': statistics.documentFrequencies.errorBound(),
+                                           'lowestTopEstimate': top.lowestEstimate()}}, outfile)
+    return
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Approximate lexica of the lexicon generator, streaming frequencies')
+    parser.add_argument('corpus', nargs='+', help='pre-processed corpus paths, e.g., /preprocessedCorpora/BooksWiki/')
+    parser.add_argument('--output', required=True, help='output .json path, e.g., /Outputs/entityFinderOutputs/'
+                                                        'conceptsIdentificationBooksWikiStreaming.json')
+    parser.add_argument('--reference', default=BNC_REFERENCE, help='Weirdness Index reference corpus')
+    parser.add_argument('--epsilon', type=float, default=EPSILON, help='relative error of the count-min sketches')
+    parser.add_argument('--delta', type=float, default=DELTA, help='failure probability of the count-min sketches')
+    parser.add_argument('--top-k', type=int, default=TOP_K, help='number of top tokens kept')
+    parser.add_argument('--sample-size', type=int, default=SAMPLE_SIZE, help='size of the dictionary sample')
+    args = parser.parse_args()
+
+    streamingEntityDefinition(args.corpus, [args.output], args.reference, args.epsilon, args.delta, args.top_k,
+                              args.sample_size)
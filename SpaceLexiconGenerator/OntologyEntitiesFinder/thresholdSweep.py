@@ -0,0 +1,198 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+thresholdSweep.py explores the thresholds of the lexicon generator (ontologyEntityDefinition) in a single run: the
+scores of the corpus nouns (frequency z-score, tf-idf, Weirdness Index) are computed once as arrays, then the three
+lexica are extracted for a grid of thresholds:
+
+- frequency z-score threshold of the Frequency lexicon (zscoreThreshold = 0 in ontologyEntityDefinition)
+- TF-IDF cutoff, a multiple of the average tf-idf of the frequency candidates (1 = above average, as
+  ontologyEntityDefinition)
+- Weirdness Index z-score threshold (zscoreThreshold = 0 in weirdnessIndex)
+
+The TF-IDF and Weirdness lexica are filtered from the Frequency lexicon of each frequency z-score threshold. The lexica
+of the grid point (0, 1, 0) are the lexica of ontologyEntityDefinition. Each lexicon comes with its size and its
+overlap with WordNet and the ECSS glossary of terms and acronyms, as entityVal.runVal: number and percentage of the
+lexicon words found in WordNet and in the ECSS glossary, number and percentage of the ECSS glossary terms found in the
+lexicon.
+
+The frequency candidates of any threshold are the most frequent nouns (a prefix of the nouns ranked by frequency), so
+that the tf-idf, the reference corpus frequencies and the WordNet/ECSS membership are computed once for the largest
+candidate set, and every lexicon is a selection of array indexes.
+
+Run from the SpaceLexiconGenerator directory:
+python OntologyEntitiesFinder/thresholdSweep.py /preprocessedCorpora/BooksWiki/ --output
+/Outputs/entityFinderOutputs/conceptsIdentificationBooksWikiSweep.json --frequency-zscores -0.25 0 0.5 1
+'''
+
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+sys.path.append(parentDir)
+
+from OntologyEntitiesFinder.ontologyEntityDefinition import corpusNouns, frequencyScores, averageTfIdf, \
+    weirdnessScores
+from OntologyEntitiesFinder.referenceCorpus import loadReferenceCorpus, BNC_REFERENCE
+from OntologyEntitiesFinder.membershipIndex import loadMembershipIndex, saveMembershipIndex
+
+# Default grid of thresholds, the thresholds of ontologyEntityDefinition included
+FREQUENCY_ZSCORES = [-0.25, 0, 0.25, 0.5, 1, 2]
+TFIDF_CUTOFFS = [0.5, 0.75, 1, 1.5, 2]
+WEIRDNESS_ZSCORES = [-0.5, -0.25, 0, 0.25, 0.5, 1]
+
+
+class LexiconOverlap:
+    '''
+    WordNet and ECSS glossary membership of a list of words, checked once, and overlap of any lexicon of these words
+    Input: list of words, WordNet and ECSS membership index (see membershipIndex.py)
+    '''
+
+    def __init__(self, words, index):
+        inWordNet = index.wordNetWords(words)
+        self.inWordNet = np.array([word in inWordNet for word in words], dtype=bool)
+        # number of times each word is listed in the glossary
+        self.ecssCounts = np.array([index.ecssCounts[word] for word in words], dtype=np.int64)
+        self.numberOfEcss = len(index.ecssMultiwords)
+
+    def metrics(self, indexes):
+        '''
+        Input: int array, index in words of each lexicon entry (a word can have several entries)
+        Output: dictionary of the lexicon size, number and percentage of entries found in WordNet and in the ECSS
+        glossary, number and percentage of the ECSS glossary terms found in the lexicon
+        '''
+        size = len(indexes)
+        inWordNet = int(np.count_nonzero(self.inWordNet[indexes]))
+        inEcss = int(np.count_nonzero(self.ecssCounts[indexes]))
+        ecssFound = int(self.ecssCounts[np.unique(indexes)].sum())
+        return {'size': size,
+                'inWordNet': inWordNet, 'inWordNetPercent': percentage(inWordNet, size),
+                'inEcss': inEcss, 'inEcssPercent': percentage(inEcss, size),
+                'ecssFound': ecssFound, 'ecssFoundPercent': percentage(ecssFound, self.numberOfEcss)}
+
+
+def percentage(part, total):
+    '''
+    Input: number of items, total number of items
+    Output: percentage rounded to 1 decimal, 0 for an empty total
+    '''
+    return round(part / total * 100, 1) if total else 0.0
+
+
+def thresholdSweep(inputPath, outputPath, referenceCorpus=BNC_REFERENCE, incremental=False, workers=1,
+                   frequencyZscores=FREQUENCY_ZSCORES, tfidfCutoffs=TFIDF_CUTOFFS, weirdnessZscores=WEIRDNESS_ZSCORES,
+                   saveLexica=True):
+    '''
+    Lexica of ontologyEntityDefinition for a grid of thresholds, scores computed once
+    Input: .json files containing preprocessed raw text per corpus element, output path (list, the first path is used,
+           as ontologyEntityDefinition), referenceCorpus, incremental and workers (see ontologyEntityDefinition), grid of
+           frequency z-score thresholds, of TF-IDF cutoffs (multiples of the average tf-idf) and of Weirdness Index
+           z-score thresholds, saveLexica: if False only the sizes and overlaps of the lexica are saved
+    Output: a .json file with, for each lexicon ('candidateFreq', 'candidateTFIDF', 'candidateWeird'), one entry per grid
+            point: thresholds, size and WordNet/ECSS overlap, lexicon
+    '''
+    # Scores of the nouns ----------------------------------------------------------------------------------------------
+    frequencies, nounIds, numberOfWords = corpusNouns(inputPath, incremental, workers)
+    rankedIds, allFrequencies, aveFreq, allZscores = frequencyScores(nounIds, frequencies.tokenCounts[nounIds],
+                                                                     numberOfWords)
+
+    # nouns are ranked by decreasing frequency z-score: the candidates of a threshold are the first ranked nouns
+    numberOfCandidates = [int(np.count_nonzero(allZscores >= threshold)) for threshold in frequencyZscores]
+    largest = max(numberOfCandidates, default=0)
+    words = frequencies.tokens(rankedIds[:largest])
+    allTfIdf = frequencies.tfIdf(rankedIds[:largest])
+
+    reference = loadReferenceCorpus(referenceCorpus)
+    # one row per reference entry of each word, rows in words order
+    rowIndex, bnc = reference.lookup(words)
+
+    index = loadMembershipIndex()
+    overlap = LexiconOverlap(words, index)
+    saveMembershipIndex(index)
+
+    # Lexica of each grid point ----------------------------------------------------------------------------------------
+    sweep = {'averageFrequency': aveFreq, 'frequencyZscores': list(frequencyZscores),
+             'tfidfCutoffs': list(tfidfCutoffs), 'weirdnessZscores': list(weirdnessZscores),
+             'candidateFreq': [], 'candidateTFIDF': [], 'candidateWeird': []}
+
+    def addPoint(lexicon, thresholds, indexes, entries):
+        point = dict(thresholds, **overlap.metrics(indexes))
+        if saveLexica:
+            point['lexicon'] = entries
+        sweep[lexicon].append(point)
+
+    for frequencyZscore, k in zip(frequencyZscores, numberOfCandidates):
+        candidates = np.arange(k)
+        addPoint('candidateFreq', {'frequencyZscore': frequencyZscore}, candidates, words[:k])
+
+        # TF-IDF: candidates above a multiple of their average tf-idf, highest first
+        candidateTfIdf = allTfIdf[:k]
+        av_tfidf = averageTfIdf(candidateTfIdf) if k else 0.0
+        for cutoff in tfidfCutoffs:
+            selected = np.flatnonzero(candidateTfIdf > av_tfidf * cutoff)
+            selected = selected[np.argsort(-candidateTfIdf[selected], kind='stable')]
+            addPoint('candidateTFIDF', {'frequencyZscore': frequencyZscore, 'tfidfCutoff': cutoff,
+                                        'threshold': av_tfidf * cutoff},
+                     selected, [[words[i], score] for i, score in zip(selected.tolist(),
+                                                                       candidateTfIdf[selected].tolist())])
+
+        # Weirdness Index: computed over the reference entries of the candidates, each candidate occurring once in the
+        # input of weirdnessIndex (see ontologyEntityDefinition), the corpus size is the number of candidates
+        # (all Weirdness Indexes equal: no z-score, no candidate selected, as weirdnessIndex)
+        rows = int(np.searchsorted(rowIndex, k))
+        if rows > 1:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                order, Wscores, averageWeirdness, Zscores = weirdnessScores(bnc[:rows], np.ones(rows, dtype=np.int64),
+                                                                            reference.numberOfEntries, k)
+        for weirdnessZscore in weirdnessZscores:
+            selected = rowIndex[order[Zscores >= weirdnessZscore]] if rows > 1 else np.zeros(0, dtype=np.int64)
+            addPoint('candidateWeird', {'frequencyZscore': frequencyZscore, 'weirdnessZscore': weirdnessZscore},
+                     selected, [words[i] for i in selected.tolist()])
+
+    # Summary ----------------------------------------------------------------------------------------------------------
+    print('\n---> Threshold Sweep')
+    print('The average frequency is ', aveFreq, ', number of candidate entities of the largest lexicon:', largest)
+    print('Lexicon ¦ thresholds ¦ size ¦ in WordNet (%) ¦ in ECSS (%) ¦ ECSS found (%)')
+    for lexicon, thresholdNames in [('candidateFreq', ['frequencyZscore']),
+                                    ('candidateTFIDF', ['frequencyZscore', 'tfidfCutoff']),
+                                    ('candidateWeird', ['frequencyZscore', 'weirdnessZscore'])]:
+        for point in sweep[lexicon]:
+            print(lexicon, '¦', ', '.join(name + '=' + str(point[name]) for name in thresholdNames), '¦',
+                  point['size'], '¦', point['inWordNetPercent'], '¦', point['inEcssPercent'], '¦',
+                  point['ecssFoundPercent'])
+
+    # Save Outputs
+    outputPath = parentDir + outputPath[0]
+    print(outputPath)
+    with open(outputPath, 'w') as outfile:
+        json.dump(sweep, outfile)
+    return sweep
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Lexica of the lexicon generator for a grid of thresholds')
+    parser.add_argument('corpus', nargs='+', help='pre-processed corpus paths, e.g., /preprocessedCorpora/BooksWiki/')
+    parser.add_argument('--output', required=True, help='output .json path, e.g., /Outputs/entityFinderOutputs/'
+                                                        'conceptsIdentificationBooksWikiSweep.json')
+    parser.add_argument('--reference', default=BNC_REFERENCE, help='Weirdness Index reference corpus')
+    parser.add_argument('--frequency-zscores', nargs='+', type=float, default=FREQUENCY_ZSCORES)
+    parser.add_argument('--tfidf-cutoffs', nargs='+', type=float, default=TFIDF_CUTOFFS,
+                        help='multiples of the average tf-idf')
+    parser.add_argument('--weirdness-zscores', nargs='+', type=float, default=WEIRDNESS_ZSCORES)
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--incremental', action='store_true')
+    parser.add_argument('--no-lexica', action='store_true', help='only save the sizes and overlaps of the lexica')
+    args = parser.parse_args()
+
+    thresholdSweep(args.corpus, [args.output], args.reference, args.incremental, args.workers,
+                   args.frequency_zscores, args.tfidf_cutoffs, args.weirdness_zscores, not args.no_lexica)
@@ -6,15 +6,12 @@
 # ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
 
 import time
-import matplotlib.pyplot as plt
 import os
 import json
 import numpy
 
 from gensim.models import Word2Vec
-from os import listdir
-from os.path import isfile, join
-from sklearn.decomposition import PCA
+from preprocessedCorpora.tokenStore import corpusSentences
 
 def wordtovec(entityFinderOutputs, preprocessedCorpus, cosTreshold, trainNewModel):
     '''
@@ -37,21 +34,10 @@ def wordtovec(entityFinderOutputs, preprocessedCorpus, cosTreshold, trainNewMode
     print('All candidate entities loaded - ', len(candidateEntities), ' entities.')
 
     # import NLP pipeline output
-    # preprocess for word2vec input: must be in Line of sentences format
-    documents = [f for f in listdir(parentDir+preprocessedCorpus) if isfile(join(parentDir+preprocessedCorpus, f))]
-    parsedSentences = []
-    print(len(documents), ' corpus documents found')
-
-    for d in documents:
-        # open document
-        with open(parentDir + preprocessedCorpus + d, 'r') as infile:
-            inputDoc = json.load(infile)
-
-        # retrieve tokens per sentence
-        for sen in inputDoc:
-            parsedSentences.append(sen)
-
-    print('Number of sentences to analyse', len(parsedSentences))
+    # preprocess for word2vec input: must be in Line of sentences format, sentences are read from the corpus token
+    # store (or streamed from the documents) at each training pass instead of being all loaded in memory
+    parsedSentences, numberOfDocuments = corpusSentences(preprocessedCorpus)
+    print(numberOfDocuments, ' corpus documents found')
 
     # word2vec method with Gensim
     # ---> TRAIN A NEW MODEL <---
@@ -67,6 +53,7 @@ def wordtovec(entityFinderOutputs, preprocessedCorpus, cosTreshold, trainNewMode
         # Assign name to model
         nb_model = 'cbow_ns_bookswiki'
         model = Word2Vec(parsedSentences, min_count=2, size=200, workers=3, window=2, sg=0, hs=0, negative=5)
+        print('Number of sentences analysed', model.corpus_count)
         model.save(parentDir + "/SynonymLayer/Savedword2vecmodels/word2vec_"+str(nb_model)+".model")
         print('New Model saved')
         print('It took', round((time.time() - start) / 60, 2),'minutes to generate the new model.')
@@ -129,7 +116,10 @@ def wordtovec(entityFinderOutputs, preprocessedCorpus, cosTreshold, trainNewMode
             print(sub[0], round(sub[1], 4))
         print('------')
 
-    # PCA visualisation
+    # PCA visualisation, matplotlib and scikit-learn are only imported here (slow imports)
+    import matplotlib.pyplot as plt
+    from sklearn.decomposition import PCA
+
     X = model[topwords]
     pca = PCA(n_components=2)
     result = pca.fit_transform(X)
@@ -143,6 +133,8 @@ def wordtovec(entityFinderOutputs, preprocessedCorpus, cosTreshold, trainNewMode
     return
 
 def plotw2c():
+    import matplotlib.pyplot as plt
+    from sklearn.decomposition import PCA
 
     fileDir = os.path.dirname(os.path.abspath(__file__))  #
     parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
@@ -34,9 +34,9 @@ Apache Tika library).
 --> run main.py '''
 
 # Modules Importation
-from NLPPipeline.NLP_Pipeline import applyNLPPipeline
-from OntologyEntitiesFinder.ontologyEntityDefinition import ontologyEntityDefinition
-from SynonymLayer.wordtovec import wordtovec
+# The modules of each building block (and their heavy dependencies: NLTK, scikit-learn, matplotlib, gensim...) are
+# imported in the block itself, so that only the blocks selected below pay for their imports. Import times can be
+# measured with: python Benchmarks/stageBenchmark.py --imports-only
 import os
 
 fileDir = os.path.dirname(os.path.abspath(__file__))  #
@@ -69,63 +69,133 @@ False = Will not run block and will use previous saved outputs to run next block
 
 Note that the outputs of the NLP Pipeline are saved into ./Outputs/NLPOutputs,
 while the path of Find_CandidateEntities might be ./preprocessedCorpora
+A pre-processed corpus can be converted into a binary token store, loaded faster and with less memory by
+Find_Candidate_Entities and Find_Candidate_Entities_Merging: python preprocessedCorpora/tokenStore.py <corpus path>
+New multiwords for the glossary (./NLPPipeline/NLPInputs) can be proposed from the n-grams of a pre-processed corpus,
+scored by C-value and likelihood ratio: python OntologyEntitiesFinder/ngramIndex.py <corpus path>
+
+NLPWorkers = number of processes the NLP pipeline spreads the documents over (1 = one document at a time),
+outputs are identical whatever the number of workers
+NLPIncremental = True: the NLP pipeline only processes new or changed documents and deletes the outputs of removed
+documents, False: all previous outputs are deleted and all documents are processed
+NLPInstrumentation = True: the time spent in each NLP pipeline step is measured, per document and for the run, and
+saved in ./Outputs/NLPMetrics.json and ./Outputs/NLPMetrics.prom (Prometheus text format)
+NLPTokenizer = 'nltk': NLTK word_tokenize, 'regex': faster regular expression tokenizer, tokens almost identical (see
+python Benchmarks/tokenizerAccuracy.py for the agreement with word_tokenize on the corpora), 'spacy': sentences
+tokenized and lemmatised in batches by spaCy (optional, see ./NLPPipeline/spacyBackend.py for the pipeline used)
+NLPSpacyBatchSize = sentences per nlp.pipe batch of the 'spacy' tokenizer
+NLPSpacyProcesses = processes used by nlp.pipe of the 'spacy' tokenizer (keep 1 when NLPWorkers > 1, the documents are
+already spread over processes)
+NLPBoilerplate = paths of NLPPipelineInput whose boilerplate (page chrome, footers... repeated across the documents) is
+removed before the NLP pipeline, e.g., ['/Corpora/Wiki/'], the sentences and tokens removed are reported and saved in
+./Outputs/boilerplateReport.json (see ./NLPPipeline/boilerplateFilter.py), [] = no filtering
+weirdnessReference = general language reference corpus of the Weirdness Index, a word frequency file of
+./AdditionalDocuments (e.g., 'BNCWordFrequency.txt', parsed once into a binary store) or the name of a store built from
+a pre-processed corpus, see ./OntologyEntitiesFinder/referenceCorpus.py
+entityFinderIncremental = True: the corpus statistics of Find_Candidate_Entities are kept between runs and only updated
+with the documents added, changed or removed since the last run (see ./OntologyEntitiesFinder/lexiconStatistics.py),
+the lexica are identical to a full run, False: all documents are read
+entityFinderWorkers = number of processes Find_Candidate_Entities spreads the reading of the pre-processed documents
+over (1 = one process), the lexica are identical whatever the number of workers
+entityFinderSweep = True: Find_Candidate_Entities generates the lexica of a grid of thresholds (frequency and Weirdness
+Index z-scores, TF-IDF cutoffs) in one run, with their size and overlap with WordNet and the ECSS glossary, saved in
+<entityFinderOutputs>Sweep.json (see ./OntologyEntitiesFinder/thresholdSweep.py for the grid), False: the lexica of the
+default thresholds only
+entityFinderStreaming = True: Find_Candidate_Entities reads the pre-processed documents once and keeps approximate
+frequencies (count-min sketches, top tokens, dictionary sample) whose memory does not grow with the corpus size, for
+corpora too large for the exact corpus dictionary, the lexica are approximate (see
+./OntologyEntitiesFinder/streamingFrequencies.py for the error bounds), False: exact frequencies
 '''
 
-print('\n ---> Welcome to the DEA Space Lexicon Generator <--- \n')
-Apply_NLP_Pipeline = False
-Find_Candidate_Entities = False
-Find_Candidate_Entities_Merging = True
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Step 1: NLP pipeline
-# ---------------------------------------------------------------------------------------------------------------------
-'''
-Pre-processing of parsed text: tokenization, abbreviation expansion, multi words, lemmatization, removal of stop words
-Input: .json files containing raw extracted text per corpus element 
-Outputs: .json files containing preprocessed raw text per corpus element
-'''
-if Apply_NLP_Pipeline:
-    print('\n <---------------')
-    print('Initiating NLP Pipeline')
-    applyNLPPipeline(NLPPipelineInput)
-    print('\n NLP Pipeline Done')
-    print('---------------> \n')
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Step 2:  Entities/Concepts Identification - dictionary of words filtered by frequency and Weirdness Index
-# ---------------------------------------------------------------------------------------------------------------------
-'''
-Frequency analysis of the pre-processed texts to identify concepts (ontology candidate entities) 
-specific to input Corpus: Frequency of words + Weirdness Index Filtering or tf-idf, comparison with WordNet and ECSS terms
-Input: .json files containing preprocessed raw text per corpus element (NLP pipeline outputs)
-Output: a .json file with all identified candidate concepts/entities: 3 lexica, one frequency-based, one frequency-based 
-+ TF-IDF, and one frequency-based + Weirdness Index 
-'''
-if Find_Candidate_Entities:
-    print('\n <---------------')
-    print(' Term Layer: generate domain specific lexica')
-    ontologyEntityDefinition(entityFinderInputs, entityFinderOutputs)
-    print('\n Term Layer Done')
-    print('---------------> \n')
-
-# ---------------------------------------------------------------------------------------------------------------------
-# Step 3:  Merging of similar entities: HAL Space or Word2vec + CosineSimilarity
-# ---------------------------------------------------------------------------------------------------------------------
-'''
-Applies word embedding to find similar concepts (merge similar ontology entities, which represent the same concepts)
-word2vec + cosine similarity
-Input:  - a .json file with all identified candidate concepts/entities [list], frequency threshold used [double]
-        and the term frequency associated to each candidate concepts/entities [list]. (Find_candidate_entities Output)
-        - the threshold for cosine similarity, cosThreshold, defined below by User. concepts with a cosine similarity 
-        below this threshold are not considered similar.
-Output: per word embedding method, a txt file identifying candidate entities' (from previous step) similar concepts 
-        (with a cosine similarity above threshold)
-'''
-if Find_Candidate_Entities_Merging:
-    # Cosine Similarity Threshold, all below not considered as similar concepts
-    cosThreshold = 0.9
-    print('Synonyms Layer: merge similar conceps with word2vec embedding and cosine similarity.')
-    trainNewModel = 2 # if 1: will train a new model, if 0: load previously saved model
-    wordtovec('/Outputs/entityFinderOutputs/conceptsIdentificationBooksWiki.json','/preprocessedCorpora/BooksWiki/', cosThreshold, trainNewModel)
-    print('\n Synonym Layer Done')
-    print('---------------> \n')
+if __name__ == '__main__':
+    # Guard required by the NLP pipeline process pool (workers re-import this module on Windows/macOS)
+    print('\n ---> Welcome to the DEA Space Lexicon Generator <--- \n')
+    Apply_NLP_Pipeline = False
+    Find_Candidate_Entities = False
+    Find_Candidate_Entities_Merging = True
+    NLPWorkers = 1
+    NLPIncremental = False
+    NLPInstrumentation = False
+    NLPTokenizer = 'nltk'
+    NLPSpacyBatchSize = 1000
+    NLPSpacyProcesses = 1
+    NLPBoilerplate = []
+    weirdnessReference = 'BNCWordFrequency.txt'
+    entityFinderIncremental = False
+    entityFinderWorkers = 1
+    entityFinderSweep = False
+    entityFinderStreaming = False
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Step 1: NLP pipeline
+    # -----------------------------------------------------------------------------------------------------------------
+    '''
+    Pre-processing of parsed text: tokenization, abbreviation expansion, multi words, lemmatization, removal of stop words
+    Input: .json files containing raw extracted text per corpus element 
+    Outputs: .json files containing preprocessed raw text per corpus element
+    '''
+    if Apply_NLP_Pipeline:
+        from NLPPipeline.NLP_Pipeline import applyNLPPipeline
+        from NLPPipeline.instrumentation import Instrumentation
+        print('\n <---------------')
+        print('Initiating NLP Pipeline')
+        instrumentation = Instrumentation() if NLPInstrumentation else None
+        applyNLPPipeline(NLPPipelineInput, workers=NLPWorkers, incremental=NLPIncremental,
+                         instrumentation=instrumentation, tokenizer=NLPTokenizer, boilerplate=NLPBoilerplate,
+                         spacyBatchSize=NLPSpacyBatchSize, spacyProcesses=NLPSpacyProcesses)
+        if instrumentation is not None:
+            instrumentation.summary()
+            instrumentation.save('./Outputs/NLPMetrics.json')
+            instrumentation.save('./Outputs/NLPMetrics.prom')
+        print('\n NLP Pipeline Done')
+        print('---------------> \n')
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Step 2:  Entities/Concepts Identification - dictionary of words filtered by frequency and Weirdness Index
+    # -----------------------------------------------------------------------------------------------------------------
+    '''
+    Frequency analysis of the pre-processed texts to identify concepts (ontology candidate entities) 
+    specific to input Corpus: Frequency of words + Weirdness Index Filtering or tf-idf, comparison with WordNet and ECSS terms
+    Input: .json files containing preprocessed raw text per corpus element (NLP pipeline outputs)
+    Output: a .json file with all identified candidate concepts/entities: 3 lexica, one frequency-based, one frequency-based 
+    + TF-IDF, and one frequency-based + Weirdness Index 
+    '''
+    if Find_Candidate_Entities:
+        from OntologyEntitiesFinder.ontologyEntityDefinition import ontologyEntityDefinition
+        print('\n <---------------')
+        print(' Term Layer: generate domain specific lexica')
+        if entityFinderSweep:
+            from OntologyEntitiesFinder.thresholdSweep import thresholdSweep
+            thresholdSweep(entityFinderInputs, [os.path.splitext(entityFinderOutputs[0])[0] + 'Sweep.json'],
+                           weirdnessReference, entityFinderIncremental, entityFinderWorkers)
+        elif entityFinderStreaming:
+            from OntologyEntitiesFinder.streamingFrequencies import streamingEntityDefinition
+            streamingEntityDefinition(entityFinderInputs, entityFinderOutputs, weirdnessReference)
+        else:
+            ontologyEntityDefinition(entityFinderInputs, entityFinderOutputs, weirdnessReference,
+                                     entityFinderIncremental, entityFinderWorkers)
+        print('\n Term Layer Done')
+        print('---------------> \n')
+
+    # -----------------------------------------------------------------------------------------------------------------
+    # Step 3:  Merging of similar entities: HAL Space or Word2vec + CosineSimilarity
+    # -----------------------------------------------------------------------------------------------------------------
+    '''
+    Applies word embedding to find similar concepts (merge similar ontology entities, which represent the same concepts)
+    word2vec + cosine similarity
+    Input:  - a .json file with all identified candidate concepts/entities [list], frequency threshold used [double]
+            and the term frequency associated to each candidate concepts/entities [list]. (Find_candidate_entities Output)
+            - the threshold for cosine similarity, cosThreshold, defined below by User. concepts with a cosine similarity 
+            below this threshold are not considered similar.
+    Output: per word embedding method, a txt file identifying candidate entities' (from previous step) similar concepts 
+            (with a cosine similarity above threshold)
+    '''
+    if Find_Candidate_Entities_Merging:
+        from SynonymLayer.wordtovec import wordtovec
+        # Cosine Similarity Threshold, all below not considered as similar concepts
+        cosThreshold = 0.9
+        print('Synonyms Layer: merge similar conceps with word2vec embedding and cosine similarity.')
+        trainNewModel = 2 # if 1: will train a new model, if 0: load previously saved model
+        wordtovec('/Outputs/entityFinderOutputs/conceptsIdentificationBooksWiki.json','/preprocessedCorpora/BooksWiki/', cosThreshold, trainNewModel)
+        print('\n Synonym Layer Done')
+        print('---------------> \n')
@@ -4,36 +4,23 @@
 # ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
 # -------------------------------- Author: Audrey Berquand --------------------------------
 # ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
-import json
-import itertools
-import os
+from preprocessedCorpora.tokenStore import corpusStatistics
 
-from os import listdir
-from os.path import isfile
-
-def corpusInsight(path):
+def corpusInsight(path, workers=1):
     '''
     Provides some information on document corpus: number of tokens, average tokens per document/sentence and dictionary
     size
-    Input: list of tokenized documents
+    Input: pre-processed corpus path (token store used if up to date, see tokenStore.py), number of processes reading
+    the .json files
     '''
 
-    fileDir = os.path.dirname(os.path.abspath(__file__))  #
-    parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
-
-    documents = [f for f in listdir(parentDir+ path) if isfile(parentDir+path+f)]
-
-    allTokens = []
-    for d in documents:
-        with open(parentDir+path +d, 'r') as infile:
-               input = json.load(infile)
-        allTokens.append(input)
-    allTokensPerDoc = list(itertools.chain.from_iterable(allTokens))
-    allTokens = list(itertools.chain.from_iterable(allTokensPerDoc))
-    print('Number of Documents', len(documents))
-    print('Total Number of tokens:', len(allTokens))
-    print('Average number of tokens per document:', round(len(allTokens)/len(documents),0))
-    dic = list(set(allTokens))
-    print('Corpus Dictionary size:', len(dic))
+    vocabulary, documentTermMatrix, numberOfSentences = corpusStatistics(path, workers)
+    numberOfDocuments = documentTermMatrix.shape[0]
+    numberOfTokens = int(documentTermMatrix.sum())
+    print('Number of Documents', numberOfDocuments)
+    print('Total Number of tokens:', numberOfTokens)
+    print('Average number of tokens per document:', round(numberOfTokens/numberOfDocuments,0))
+    print('Average number of tokens per sentence:', round(numberOfTokens/numberOfSentences,1))
+    print('Corpus Dictionary size:', len(vocabulary))
 
     return
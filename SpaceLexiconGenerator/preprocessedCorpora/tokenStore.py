@@ -0,0 +1,393 @@
+# This Source Code Form is subject to the terms of the Mozilla Public ---------------------
+# License, v. 2.0. If a copy of the MPL was not distributed with this ---------------------
+# file, You can obtain one at http://mozilla.org/MPL/2.0/. */ -----------------------------
+# ---------------- Copyright (C) 2020 University of Strathclyde and Author ----------------
+# -------------------------------- Author: Audrey Berquand --------------------------------
+# ------------------------- e-mail: audrey.berquand@strath.ac.uk --------------------------
+
+'''
+tokenStore.py stores a pre-processed corpus (directory of NLP pipeline outputs, one .json list of tokenized sentences
+per document) in a compact binary format, memory-mapped when loaded instead of re-parsed:
+
+<corpus directory name>_tokenStore/
+    vocabulary.json: list of tokens, a token id is its index (ids given in order of first appearance in the corpus)
+    tokenIds.npy: int32 array, ids of all tokens of the corpus, sentence after sentence
+    sentenceOffsets.npy: int64 array, start of each sentence in tokenIds (+ total number of tokens)
+    documentOffsets.npy: int64 array, first sentence of each document in sentenceOffsets (+ total number of sentences)
+    documents.json: documents names, sizes and modification times of the .json files converted
+
+A store is only used while its .json files are unchanged, otherwise the .json files are read (see loadTokenStore).
+Consumers should go through corpusSentences, corpusTokenStream (token ids of all sentences), corpusMatrix (sparse
+document-term matrix), corpusCounts and corpusArrays, which fall back on the .json files, read in parallel by several
+processes if requested (corpusStatistics).
+
+Convert a corpus, from the SpaceLexiconGenerator directory:
+python preprocessedCorpora/tokenStore.py /preprocessedCorpora/BooksWiki/
+'''
+
+import json
+import os
+import sys
+
+import numpy as np
+
+from array import array
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from os import listdir
+from os.path import isfile, join
+
+fileDir = os.path.dirname(os.path.abspath(__file__))  #
+parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
+sys.path.append(parentDir)
+
+from NLPPipeline.documentStream import streamTokenLists, CorpusSentences
+
+STORE_SUFFIX = '_tokenStore'
+
+# Shards per worker process when the .json files are counted in parallel (see corpusStatistics)
+SHARDS_PER_WORKER = 4
+
+
+class TokenStore:
+    '''
+    Memory-mapped pre-processed corpus, the token ids of a document or sentence are read without copy
+    Input: store directory (absolute path)
+    '''
+
+    def __init__(self, storeDirectory):
+        self.storeDirectory = storeDirectory
+        with open(join(storeDirectory, 'vocabulary.json'), 'r', encoding="utf-8") as infile:
+            self.vocabulary = json.load(infile)
+        with open(join(storeDirectory, 'documents.json'), 'r', encoding="utf-8") as infile:
+            self.documents = json.load(infile)
+        self.tokenIds = np.load(join(storeDirectory, 'tokenIds.npy'), mmap_mode='r')
+        self.sentenceOffsets = np.load(join(storeDirectory, 'sentenceOffsets.npy'), mmap_mode='r')
+        self.documentOffsets = np.load(join(storeDirectory, 'documentOffsets.npy'), mmap_mode='r')
+
+    def __len__(self):
+        return len(self.documents)
+
+    def numberOfTokens(self):
+        return len(self.tokenIds)
+
+    def numberOfSentences(self):
+        return len(self.sentenceOffsets) - 1
+
+    def documentTokenIds(self, i):
+        '''
+        Input: document index
+        Output: token ids of the document (memory-mapped view)
+        '''
+        sentences = self.documentOffsets[i], self.documentOffsets[i + 1]
+        return self.tokenIds[self.sentenceOffsets[sentences[0]]:self.sentenceOffsets[sentences[1]]]
+
+    def __iter__(self):
+        '''
+        Re-iterable over all tokenized sentences of the corpus, as lists of tokens (e.g., word2vec input)
+        '''
+        vocabulary = self.vocabulary
+        offsets = self.sentenceOffsets
+        for s in range(self.numberOfSentences()):
+            yield [vocabulary[i] for i in self.tokenIds[offsets[s]:offsets[s + 1]].tolist()]
+
+    def tokenCounts(self):
+        '''
+        Output: number of occurrences of each token id in the corpus
+        '''
+        return np.bincount(self.tokenIds, minlength=len(self.vocabulary))
+
+    def documentFrequencies(self):
+        '''
+        Output: number of documents each token id appears in
+        '''
+        return np.bincount(self.documentTermMatrix().indices, minlength=len(self.vocabulary))
+
+    def documentTermMatrix(self):
+        '''
+        Output: scipy.sparse.csr_matrix (documents x token ids), number of occurrences of each token id per document
+        '''
+        documentLengths = np.diff(self.sentenceOffsets[self.documentOffsets])
+        return documentTermMatrix(self.tokenIds, documentLengths, len(self.vocabulary))
+
+
+def documentTermMatrix(tokenIds, documentLengths, numberOfTypes):
+    '''
+    Sparse document-term matrix, the inverted index of a corpus: the documents of a token id are the non-zero rows of
+    its column, their number is its document frequency
+    Input: token ids of all documents, one document after the other, number of tokens of each document, vocabulary size
+    Output: scipy.sparse.csr_matrix (documents x token ids) of int64 numbers of occurrences
+    '''
+    # scipy is only imported when a matrix is built (slow import)
+    from scipy.sparse import csr_matrix
+
+    numberOfDocuments = len(documentLengths)
+    documents = np.repeat(np.arange(numberOfDocuments, dtype=np.int64), documentLengths)
+    # one key per (document, token id) pair, sorted by document then token id
+    pairs, counts = np.unique(documents * numberOfTypes + np.asarray(tokenIds, dtype=np.int64), return_counts=True)
+    rows, columns = np.divmod(pairs, max(numberOfTypes, 1))
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(rows, minlength=numberOfDocuments))])
+    return csr_matrix((counts.astype(np.int64), columns, indptr), shape=(numberOfDocuments, numberOfTypes))
+
+
+def tokenListsMatrix(documents):
+    '''
+    Intern the tokens of documents to ids and build their document-term matrix
+    Input: iterable of documents, each an iterable of tokens
+    Output: vocabulary (list of tokens, a token id is its index, ids given in order of first appearance),
+    scipy.sparse.csr_matrix (documents x token ids)
+    '''
+    ids = {}
+    tokenIds = array('i')
+    documentLengths = []
+    for tokens in documents:
+        start = len(tokenIds)
+        tokenIds.extend([ids.setdefault(token, len(ids)) for token in tokens])
+        documentLengths.append(len(tokenIds) - start)
+    return list(ids), documentTermMatrix(np.frombuffer(tokenIds, dtype=np.int32), documentLengths, len(ids))
+
+
+def storeDirectory(path):
+    '''
+    Input: pre-processed corpus path, e.g., /preprocessedCorpora/BooksWiki/
+    Output: token store directory of the corpus (absolute path)
+    '''
+    return parentDir + path.rstrip('/') + STORE_SUFFIX + '/'
+
+
+def documentsState(corpusDirectory):
+    '''
+    Input: pre-processed corpus directory (absolute path)
+    Output: list of [document name, size, modification time] of the corpus .json files
+    '''
+    documents = [f for f in listdir(corpusDirectory) if isfile(join(corpusDirectory, f))]
+    states = []
+    for d in documents:
+        stat = os.stat(join(corpusDirectory, d))
+        states.append([d, stat.st_size, stat.st_mtime_ns])
+    return states
+
+
+def convertToTokenStore(path):
+    '''
+    Convert the .json NLP pipeline outputs of a pre-processed corpus into a token store, documents are streamed
+    Input: pre-processed corpus path, e.g., /preprocessedCorpora/BooksWiki/
+    Output: TokenStore
+    '''
+    corpusDirectory = parentDir + path
+    target = storeDirectory(path)
+    os.makedirs(target, exist_ok=True)
+
+    documents = documentsState(corpusDirectory)
+    ids = {}
+    tokenIds = array('i')
+    sentenceOffsets = array('q', [0])
+    documentOffsets = array('q', [0])
+
+    for d, size, mtime in documents:
+        for tokens in streamTokenLists(join(corpusDirectory, d)):
+            for token in tokens:
+                if token not in ids:
+                    ids[token] = len(ids)
+                tokenIds.append(ids[token])
+            sentenceOffsets.append(len(tokenIds))
+        documentOffsets.append(len(sentenceOffsets) - 1)
+
+    np.save(join(target, 'tokenIds.npy'), np.frombuffer(tokenIds, dtype=np.int32))
+    np.save(join(target, 'sentenceOffsets.npy'), np.frombuffer(sentenceOffsets, dtype=np.int64))
+    np.save(join(target, 'documentOffsets.npy'), np.frombuffer(documentOffsets, dtype=np.int64))
+    with open(join(target, 'vocabulary.json'), 'w', encoding="utf-8") as outfile:
+        json.dump(list(ids), outfile)
+    # written last: a store without documents.json is incomplete and never loaded
+    with open(join(target, 'documents.json'), 'w', encoding="utf-8") as outfile:
+        json.dump(documents, outfile)
+
+    print('Token store of', path, ':', len(documents), 'documents,', len(sentenceOffsets) - 1, 'sentences,',
+          len(tokenIds), 'tokens,', len(ids), 'token types')
+    return TokenStore(target)
+
+
+def loadTokenStore(path):
+    '''
+    Load the token store of a pre-processed corpus
+    Input: pre-processed corpus path, e.g., /preprocessedCorpora/BooksWiki/
+    Output: TokenStore, None if there is no store or if the corpus .json files changed since the conversion
+    '''
+    target = storeDirectory(path)
+    if not isfile(join(target, 'documents.json')):
+        return None
+    store = TokenStore(target)
+    if store.documents != documentsState(parentDir + path):
+        print('Token store of', path, 'is out of date, .json files are used')
+        return None
+    return store
+
+
+def corpusSentences(path):
+    '''
+    Re-iterable over all tokenized sentences of a pre-processed corpus, read from its token store if up to date,
+    otherwise streamed from the .json files
+    Input: pre-processed corpus path
+    Output: iterable of lists of tokens, number of documents
+    '''
+    store = loadTokenStore(path)
+    if store is not None:
+        return store, len(store)
+    sentences = CorpusSentences(parentDir + path)
+    return sentences, len(sentences.documents)
+
+
+def corpusTokenStream(path):
+    '''
+    Token ids of all sentences of a pre-processed corpus, from its token store if up to date, otherwise streamed from
+    the .json files
+    Input: pre-processed corpus path
+    Output: vocabulary (list of tokens, a token id is its index, ids given in order of first appearance in the corpus),
+    int32 array of the token ids of all sentences, one sentence after the other, int64 array of the start of each
+    sentence (+ total number of tokens)
+    '''
+    store = loadTokenStore(path)
+    if store is not None:
+        return store.vocabulary, np.asarray(store.tokenIds), np.asarray(store.sentenceOffsets)
+
+    ids = {}
+    tokenIds = array('i')
+    sentenceOffsets = array('q', [0])
+    for tokens in CorpusSentences(parentDir + path):
+        tokenIds.extend([ids.setdefault(token, len(ids)) for token in tokens])
+        sentenceOffsets.append(len(tokenIds))
+    return list(ids), np.frombuffer(tokenIds, dtype=np.int32), np.frombuffer(sentenceOffsets, dtype=np.int64)
+
+
+def countShard(files):
+    '''
+    Map step of the corpus statistics: document-term matrix of a shard of documents
+    Input: list of .json files (absolute paths)
+    Output: shard vocabulary (ids given in order of first appearance in the shard), scipy.sparse.csr_matrix (documents
+    x shard ids), number of sentences
+    '''
+    ids = {}
+    tokenIds = array('i')
+    documentLengths = []
+    numberOfSentences = 0
+    for file in files:
+        start = len(tokenIds)
+        for tokens in streamTokenLists(file):
+            tokenIds.extend([ids.setdefault(token, len(ids)) for token in tokens])
+            numberOfSentences = numberOfSentences + 1
+        documentLengths.append(len(tokenIds) - start)
+    matrix = documentTermMatrix(np.frombuffer(tokenIds, dtype=np.int32), documentLengths, len(ids))
+    return list(ids), matrix, numberOfSentences
+
+
+def mergeMatrices(parts):
+    '''
+    Reduce step of the corpus statistics: stack the document-term matrices of consecutive sets of documents, identical
+    to the matrix of all documents counted at once
+    Input: iterable of (vocabulary, scipy.sparse.csr_matrix)
+    Output: vocabulary (token ids given in order of first appearance in the parts), scipy.sparse.csr_matrix
+    (documents x token ids)
+    '''
+    from scipy.sparse import csr_matrix, vstack
+
+    ids = {}
+    blocks = []
+    for vocabulary, matrix in parts:
+        # ids of the part tokens in the merged vocabulary
+        index = np.array([ids.setdefault(token, len(ids)) for token in vocabulary], dtype=np.int64)
+        blocks.append((matrix.data, index[matrix.indices], matrix.indptr, matrix.shape[0]))
+    matrix = vstack([csr_matrix((data, indices, indptr), shape=(n, len(ids))) for data, indices, indptr, n in blocks]
+                    or [csr_matrix((0, len(ids)), dtype=np.int64)], format='csr')
+    matrix.sort_indices()
+    return list(ids), matrix
+
+
+def reduceShards(shards):
+    '''
+    Merge the shards counted by countShard, in documents order
+    Input: iterable of countShard outputs
+    Output: vocabulary, scipy.sparse.csr_matrix (documents x token ids), number of sentences
+    '''
+    shards = list(shards)
+    vocabulary, matrix = mergeMatrices((shardVocabulary, shardMatrix) for shardVocabulary, shardMatrix, n in shards)
+    return vocabulary, matrix, sum(n for shardVocabulary, shardMatrix, n in shards)
+
+
+def shardDocuments(files, numberOfShards):
+    '''
+    Split documents into contiguous shards of similar sizes (in bytes), documents order is kept
+    Input: list of files, number of shards
+    Output: list of lists of files
+    '''
+    sizes = np.cumsum([os.path.getsize(file) for file in files])
+    if len(files) == 0:
+        return []
+    # shard of each document: position of its end in the corpus
+    shards = np.minimum((numberOfShards * (sizes - 1)) // max(int(sizes[-1]), 1), numberOfShards - 1)
+    return [[file for file, shard in zip(files, shards.tolist()) if shard == i]
+            for i in range(numberOfShards) if (shards == i).any()]
+
+
+def corpusStatistics(path, workers=1):
+    '''
+    Document-term matrix and number of sentences of a pre-processed corpus, built from its token store if up to date,
+    otherwise streamed from the .json files: documents are split into shards counted by workers processes (map) then
+    merged (reduce), the statistics are identical whatever the number of workers
+    Input: pre-processed corpus path, number of processes reading the .json files
+    Output: vocabulary (list of tokens, a token id is its index, ids given in order of first appearance in the corpus),
+    scipy.sparse.csr_matrix (documents x token ids), number of sentences
+    '''
+    store = loadTokenStore(path)
+    if store is not None:
+        return store.vocabulary, store.documentTermMatrix(), store.numberOfSentences()
+
+    corpusDirectory = parentDir + path
+    files = [join(corpusDirectory, f) for f in listdir(corpusDirectory) if isfile(join(corpusDirectory, f))]
+    if workers > 1 and len(files) > 1:
+        # several shards per worker, so that a large document does not keep the other workers waiting
+        shards = shardDocuments(files, min(SHARDS_PER_WORKER * workers, len(files)))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # shards are returned in documents order, whatever the order in which they are completed
+            return reduceShards(executor.map(countShard, shards))
+    return reduceShards([countShard(files)])
+
+
+def corpusMatrix(path, workers=1):
+    '''
+    Document-term matrix of a pre-processed corpus (see corpusStatistics)
+    Input: pre-processed corpus path, number of processes reading the .json files
+    Output: vocabulary (list of tokens, a token id is its index), scipy.sparse.csr_matrix (documents x token ids)
+    '''
+    vocabulary, matrix, numberOfSentences = corpusStatistics(path, workers)
+    return vocabulary, matrix
+
+
+def corpusArrays(path, workers=1):
+    '''
+    Corpus statistics of a pre-processed corpus by token id, computed from its document-term matrix (see corpusMatrix)
+    Input: pre-processed corpus path, number of processes reading the .json files
+    Output: vocabulary (list of tokens, a token id is its index), int64 arrays of the number of occurrences and of
+    documents of each token id, number of documents, number of tokens
+    '''
+    vocabulary, matrix = corpusMatrix(path, workers)
+    tokenCounts = np.asarray(matrix.sum(axis=0)).ravel()
+    documentFrequencies = np.bincount(matrix.indices, minlength=len(vocabulary))
+    return vocabulary, tokenCounts, documentFrequencies, matrix.shape[0], int(tokenCounts.sum())
+
+
+def corpusCounts(path, workers=1):
+    '''
+    Corpus statistics of a pre-processed corpus, computed from its token store if up to date, otherwise streamed from
+    the .json files
+    Input: pre-processed corpus path, number of processes reading the .json files
+    Output: Counter of tokens (in order of first appearance), Counter of documents frequencies, number of documents,
+    number of tokens
+    '''
+    vocabulary, tokenCounts, documentFrequencies, numberOfDocuments, numberOfTokens = corpusArrays(path, workers)
+    return (Counter(dict(zip(vocabulary, tokenCounts.tolist()))),
+            Counter(dict(zip(vocabulary, documentFrequencies.tolist()))), numberOfDocuments, numberOfTokens)
+
+
+if __name__ == '__main__':
+    for corpusPath in sys.argv[1:]:
+        convertToTokenStore(corpusPath)
@@ -26,6 +26,7 @@ the paper results is saved under LDAmodels\semisupervised.
 
 '''
 
+import itertools
 import math
 import re, os, time
 import pyLDAvis
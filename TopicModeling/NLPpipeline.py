@@ -20,72 +20,59 @@ Minor methods ------------------------------------------------------------------
 1. corpusInsight: Provides some information on document corpus: number of tokens, average tokens per document/sentence
                  and dictionary size
 
-2. replacementAction:  Replace tokens in a list of tokens by the equivalent multi word, provided the multi word is known
-                      to be within the tokens list
+2. loadMultiwordMatcher: ECSS multiwords matcher (token trie) of the preprocessing core 'topic' profile
 
 3. replace_acronyms: Search for acronyms within tokens, expand if acronyms are found
 
 4. tf-idf: Generates the tf-idf ranking of each corpus dictionary item, used to filter out words with lowest tf-idf
+   (document-term matrix shared with corpusInsight, see SpaceLexiconGenerator/preprocessedCorpora/tokenStore.py)
 
 '''
 
-import itertools
-import nltk
 import json
-import re, os
+import os, sys
 import numpy as np
 import pandas as pd
 
-from sklearn.feature_extraction.text import TfidfVectorizer
-from nltk import word_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from nltk.collocations import *
+from sklearn.feature_extraction.text import TfidfTransformer
 from os import listdir
 from os.path import isfile, join
 
 fileDir = os.path.dirname(os.path.abspath(__file__))  #
 parentDir = os.path.dirname(fileDir)  # Directory of the Module directory
 
+# Preprocessing core shared with the Space Lexicon Generator NLP pipeline, 'topic' profile
+sys.path.append(parentDir + '/SpaceLexiconGenerator')
+from NLPPipeline.preprocessingCore import loadPreprocessor, loadProfileResources, replaceCollocations, \
+    SPACY_BATCH_SIZE, SPACY_PROCESSES
+from NLPPipeline.boilerplateFilter import findBoilerplate
+from preprocessedCorpora.tokenStore import tokenListsMatrix
+
 # ------------------------------------------------------------------------------------------------------------
 #                                       METHOD
 # ------------------------------------------------------------------------------------------------------------
 
-def corpusInsight(documents):
+def corpusInsight(vocabulary, documentTermMatrix):
     '''
     Provides some information on document corpus: number of tokens, average tokens per document/sentence and dictionary
     size
-    Input: list of tokenized documents
+    Input: vocabulary and document-term matrix of the tokenized documents (see tokenListsMatrix)
     '''
 
-    lenght = []
-    for d in documents:
-        lenght.append(len(d))
-    print('Total Number of tokens:', sum(lenght))
+    lenght = np.asarray(documentTermMatrix.sum(axis=1)).ravel()
+    print('Total Number of tokens:', lenght.sum())
     print('Average number of tokens per document:', round(np.mean(lenght), 0))
 
-    allTokens = list(itertools.chain.from_iterable(documents))
-    dic = list(set(allTokens))
-    #print('Dictionary size:', len(dic))
+    #print('Dictionary size:', len(vocabulary))
 
     return
 
-def replacementAction(multiword, tokens):
+def loadMultiwordMatcher():
     '''
-    Replace tokens in a list of tokens by the equivalent multi word,
-    provided the multi word is known to be within the tokens list
-
-    Input: multiword, list of tokens
-    Output: new list of tokens where the tokens of interest have been replaced by the multi word
+    Load the ECSS multiwords + additional validated terms into a multiword matcher (token trie), once per process
+    Output: MultiwordMatcher
     '''
-    new_token = '_'.join(multiword)
-    wordIndex = tokens.index(multiword[0])
-    tokens[wordIndex] = new_token
-    indices = []
-    for item in multiword[1:len(multiword)]:
-        indices.append(tokens.index(item))
-    tokens = [v for i, v in enumerate(tokens) if i not in indices]
-    return tokens
+    return loadProfileResources('topic').multiwordMatcher
 
 def replaceMultiwords(tokens, stopset):
     '''
@@ -99,39 +86,8 @@ def replaceMultiwords(tokens, stopset):
     #                  USING ECSS GLOSSARY & ADDITIONAL VALIDATED TERMS
     #----------------------------------------------------------------------------------
 
-    # Get ECSS multiwords + additional validated terms
-    inputFiles=['./Inputs4NLP/ecss_2grams.txt', './Inputs4NLP/ecss_3grams.txt', './Inputs4NLP/ecss_4grams.txt',
-                    './Inputs4NLP/ecss_6grams.txt','./Inputs4NLP/ecss_9grams.txt', './Inputs4NLP/spacemissiondesign_ngrams.txt']
-
-    ecssMultiwords= []
-    wordsChanged = []
-
-    for file in inputFiles:
-        with open(file, 'r') as input:
-            words = input.read().split('\n')
-            words = [x for x in words if x]
-            for w in words:
-                ecssMultiwords.append(word_tokenize(w))
-
-    # Find and replace within corpus:
-    for word in ecssMultiwords:
-        # Look if an ecss multiword can be found in the tokens
-        if word[0] in tokens:
-            i = 1
-            wordIndex = tokens.index(word[0])
-            if wordIndex != len(tokens) - 1 and len(word) != 1:
-                while i <= len(word)-1:
-                    if word[i] == tokens[wordIndex+i] and wordIndex + i <= len(tokens)-1:
-                        ecssWords = True
-                        i = i + 1
-                    else:
-                        ecssWords = False
-                        break
-
-                # If a multiword has been found, replace within tokens
-                if ecssWords == True:
-                    tokens = replacementAction(word, tokens)
-                    wordsChanged.append(word)
+    # Find and replace within corpus, every occurrence, longest multiword first
+    tokens, wordsChanged = loadMultiwordMatcher().replace(tokens)
 
     if wordsChanged:
         print(len(wordsChanged), ' ecss multiwords found and replaces: ', wordsChanged)
@@ -145,36 +101,8 @@ def replaceMultiwords(tokens, stopset):
     tokens = [i for i in tokens if not i in stopset]
 
     # Add collocation analysis over tokens: there might be some multiwords other than those
-    # Trigrams
-    trigramsCount = []
-    trigram_measures = nltk.collocations.TrigramAssocMeasures()
-    finder = TrigramCollocationFinder.from_words(tokens)
-    finder.apply_freq_filter(10)
-    trigrams = finder.nbest(trigram_measures.likelihood_ratio, 5)
-    # Replace trigrams in tokens
-    if trigrams:
-        for word in trigrams:
-            tokens = replacementAction(word, tokens)
-            trigramsCount.append(word)
-
-    # Bigrams
-    bigramsCount = []
-    bigram_measures = nltk.collocations.BigramAssocMeasures()
-    finder = BigramCollocationFinder.from_words(tokens)
-    finder.apply_freq_filter(10)
-    bigrams = finder.nbest(bigram_measures.likelihood_ratio, 3)
-    # Replace trigrams in tokens
-    if bigrams:
-        for word in bigrams:
-            tokens = replacementAction(word, tokens)
-            bigramsCount.append(word)
-
-    '''
-    if trigramsCount:
-        print(len(trigramsCount), ' trigrams found and replaces', trigramsCount)
-    if bigramsCount:
-        print(len(bigramsCount), ' bigrams found and replaces', bigramsCount)
-    '''
+    # Trigrams then bigrams, every occurrence replaced
+    tokens = replaceCollocations(tokens)
 
     return tokens
 
@@ -182,55 +110,26 @@ def replace_acronyms(req):
     '''
     Search for acronyms within tokens, expand if acronyms are found
     Input: tokens
-    Outputs: tokens with expanded acronyms when applicable
+    Outputs: tokens with expanded acronyms when applicable (every occurrence)
     '''
-    # Load acronyms list, manually defined and validated
-    acronymsList = []
-    with open(parentDir + '/TopicModeling\Inputs4NLP/acronyms.txt', 'r',
-              encoding="utf-8") as inputFile:
-        acLine = inputFile.read().split('\n')
-        for line in acLine:
-            if line:
-                acronymsList.append(line.split(', '))
-
-    acronyms = [word_tokenize(x[0]) for x in acronymsList]
-    acronyms = list(itertools.chain.from_iterable(acronyms))
-    expansions = [word_tokenize(x[1]) for x in acronymsList]
-
-    for word in req:
-        if word in acronyms:
-            # Replace by acronym expansion
-            expansionToUse = expansions[acronyms.index(word)]
-            start_index = req.index(word)
-            req[req.index(word)] = expansionToUse[0]
-            i = 1
-            while i <= len(expansionToUse) - 1:
-                req.insert(start_index + 1, expansionToUse[i])
-                start_index = start_index + 1
-                i = i + 1
+    # Load acronyms list, manually defined and validated - read once per process
+    acronymExpander = loadProfileResources('topic').acronymExpander
+
+    req, found = acronymExpander.expand(req)
     return req
 
-def tf_idf(corpus):
+def tf_idf(vocabulary, documentTermMatrix):
     '''
     Generates the tf-idf ranking of each corpus dictionary item, used to filter out words with lowest tf-idf
-    Input: tokens
+    Input: vocabulary and document-term matrix of the tokenized documents (see tokenListsMatrix)
     Outputs: .txt file with tf-idf ranking per words, starting from lowest tf-idf
     '''
 
-    # corpus is provided as list of tokens,
-    # whereas tfidf needs it as a list of sentences.
-    sen = []
-    for c in corpus:
-        sen.append(" ".join(c))
-
-    vectorizer = TfidfVectorizer()
-    tfidf_vectorizer_vectors = vectorizer.fit_transform(sen)
-
-    terms = vectorizer.get_feature_names()
-    sums = tfidf_vectorizer_vectors.sum(axis=0)
+    # tf-idf weights of each document (TfidfVectorizer weighting), summed over all documents
+    sums = TfidfTransformer().fit_transform(documentTermMatrix).sum(axis=0)
 
     data = []
-    for col, term in enumerate(terms):
+    for col, term in enumerate(vocabulary):
         data.append((term, sums[0, col]))
 
     pd.set_option('display.max_rows', 4000)
@@ -257,83 +156,41 @@ def tf_idf(corpus):
 
     return
 
-def NLPPipe(sentences):
-    '''
-    Natural Language Processing steps
-    Input: sentences
+def NLPPipe(sentences, metrics=None, tokenizer='nltk', spacyBatchSize=SPACY_BATCH_SIZE,
+            spacyProcesses=SPACY_PROCESSES):
+    '''
+    Natural Language Processing steps ('topic' profile of the preprocessing core, see
+    SpaceLexiconGenerator/NLPPipeline/preprocessingCore.py): lower case, tokenize, trim, remove numbers, urls, non
+    English/number characters and punctuation, additional cleaning for wikipedia, expand acronyms, replace multiwords
+    and bigrams/trigrams, remove stop words, lemmatization
+    Input: sentences, Metrics to time each step (None: instrumentation disabled, see
+    SpaceLexiconGenerator/NLPPipeline/instrumentation.py), tokenizer backend ('nltk': word_tokenize, 'regex': faster
+    regular expression tokenizer, see SpaceLexiconGenerator/NLPPipeline/regexTokenizer.py, 'spacy': spaCy tokenizer and
+    lemmatizer, see SpaceLexiconGenerator/NLPPipeline/spacyBackend.py), texts per nlp.pipe batch and processes used by
+    nlp.pipe (spaCy backend only)
     Outputs: processed list of tokens
     '''
+    # Stop words, acronyms and multiwords are loaded once per process
+    preprocessor = loadPreprocessor('topic', tokenizer=tokenizer, spacyBatchSize=spacyBatchSize,
+                                    spacyProcesses=spacyProcesses)
 
-    # Initialisation ---------------------------------------------------------------------------------------------------
-    # create and update English stop words list
-    with open(parentDir + "/TopicModeling/Inputs4NLP/non_character_words.txt", encoding="utf-8") as Punctuation:
-        filterPunctuation = word_tokenize(Punctuation.read())
-    with open(parentDir + "/TopicModeling/Inputs4NLP/wiki_common_words.txt", encoding="utf-8") as wikiCommonWords:
-        filterCommonWords = word_tokenize(wikiCommonWords.read())
-    stopset = stopwords.words('english')
-
-    for i in filterPunctuation:
-        stopset.append(i)
-    for i in filterCommonWords:
-        stopset.append(i)
-
-    # Initialise Lemmatizer
-    wnl = WordNetLemmatizer()
-
-    # Start Preprocessing ----------------------------------------------------------------------------------------------
-    # Lower case
-    tokens = sentences.lower()
-
-    # Tokenize
-    tokens = word_tokenize(tokens)
-
-    # Trim
-    tokens = [word.strip() for word in tokens]
-
-    # Remove tokens that are only numbers
-    tokens = [x for x in tokens if re.findall('[a-zA-Z]', x)]
-
-    # Remove two tokens cannot remove otherwise
-    tokens = [i for i in tokens if i not in ['\\mathbf', '\\displaystyle']]
-
-    # Remove urls
-    tokens = [re.sub(r'www.*[\r\n]*', '', token) for token in tokens]
-
-    # Remove non English/number characters:
-    tokens = [re.sub('[^A-Za-z0-9_\-/]+', '', token) for token in tokens]
-
-    # Remove punctuation
-    tokens = [i for i in tokens if i not in filterPunctuation]
-
-    # Additional cleaning - for wikipedia
-    tokens = [i.replace("'", "") for i in tokens]
-    tokens = [i.replace("\\", "") for i in tokens]
-    tokens = [i.replace("title=", "") for i in tokens]
-    tokens = [re.sub('_$', '', i) for i in tokens]
-    tokens = [re.sub('-', '_', i) for i in tokens]
-    tokens = [''.join(s for s in i if not s.isdigit()) for i in tokens]
-
-    # Remove Empty tokens
-    tokens = [x for x in tokens if x]
-
-    # Expand acronyms
-    tokens = replace_acronyms(tokens)
-
-    # Replace Multiwords + Bigrams/Trigrams
-    tokens = replaceMultiwords(tokens, stopset)
-
-    # Remove stop words from tokens
-    tokens = [i for i in tokens if not i in stopset]
+    wordsChanged = []
+    tokens = preprocessor.process(sentences, wordsChanged, None, metrics)
 
-    # Lemmatization - currently based on wordnet
-    tokens = [wnl.lemmatize(word) for word in tokens]
+    if wordsChanged:
+        print(len(wordsChanged), ' ecss multiwords found and replaces: ', wordsChanged)
 
     return tokens
 
-def corpusProcessing(filepath):
+def corpusProcessing(filepath, instrumentation=None, tokenizer='nltk', removeBoilerplate=False,
+                     spacyBatchSize=SPACY_BATCH_SIZE, spacyProcesses=SPACY_PROCESSES):
     '''
     Corpus preprocessing: Application of NLP Pipeline to all documents contained in corpus
-    Input: directory where .json files are stored
+    Input: directory where .json files are stored, instrumentation: Instrumentation collecting the time spent per NLP
+    step for each document (None: disabled), tokenizer backend of NLPPipe ('nltk', 'regex' or 'spacy'),
+    removeBoilerplate: if True the sentences repeated across the documents (page chrome, footers..., see
+    SpaceLexiconGenerator/NLPPipeline/boilerplateFilter.py) are removed before NLPPipe, e.g., for the wikiCorpus,
+    spacyBatchSize and spacyProcesses: nlp.pipe batch size and processes of the spaCy backend (see NLPPipe)
     Output: list of pre-processed documents
     '''
     # ------------------------------------------------------------------------------------------------------------
@@ -342,6 +199,7 @@ def corpusProcessing(filepath):
     # Load all corpus .json files into a list, 'doc_set'
     # one doc_set element = one page content
     doc_set = []
+    doc_names = []
 
     # get list of .json files
     for path in [filepath]:
@@ -350,24 +208,45 @@ def corpusProcessing(filepath):
             with open(filepath + doc, 'r') as infile:
                 file = json.load(infile)
             doc_set.append(file['content'])
+            doc_names.append(doc)
+
+    if removeBoilerplate:
+        boilerplate = findBoilerplate([filepath + doc for doc in doc_names])
+        boilerplate.summary(filepath)
+        doc_set = [boilerplate.clean(content) for content in doc_set]
 
     print('\n Starting NLP Pipeline')
     doc_preprocessed = []
     c = 0
-    for i in doc_set:
-        if c == 100:
-            print('Analysis document', doc_set.index(i)+1, '/', len(doc_set))
-            c = 0
-        tokens = NLPPipe(i)
-
-        # add tokens to document list
-        doc_preprocessed.append(tokens)
-        c = c + 1
+    if tokenizer == 'spacy' and instrumentation is None:
+        # documents tokenized and lemmatised in batches by nlp.pipe, same tokens as NLPPipe one document at a time
+        preprocessor = loadPreprocessor('topic', tokenizer=tokenizer, spacyBatchSize=spacyBatchSize,
+                                        spacyProcesses=spacyProcesses)
+        wordsChanged = []
+        doc_preprocessed = list(preprocessor.processBatch(doc_set, wordsChanged))
+        if wordsChanged:
+            print(len(wordsChanged), ' ecss multiwords found and replaces: ', wordsChanged)
+    else:
+        for i, name in zip(doc_set, doc_names):
+            if c == 100:
+                print('Analysis document', doc_set.index(i)+1, '/', len(doc_set))
+                c = 0
+            metrics = None if instrumentation is None else instrumentation.newDocument()
+            tokens = NLPPipe(i, metrics, tokenizer, spacyBatchSize, spacyProcesses)
+            if instrumentation is not None:
+                instrumentation.addDocument(name, metrics)
+
+            # add tokens to document list
+            doc_preprocessed.append(tokens)
+            c = c + 1
+
+    # Document-term matrix of the corpus, built once for the tf-idf ranking and the corpus insight
+    vocabulary, documentTermMatrix = tokenListsMatrix(doc_preprocessed)
 
     # TF-IDF filtering: for each token, measure tf-idf, the lower the tf-idf the less interesting the word is,
     # and should therefore be filtered by being added to the stopword list.
-    tf_idf(doc_preprocessed)
-    corpusInsight(doc_preprocessed)
+    tf_idf(vocabulary, documentTermMatrix)
+    corpusInsight(vocabulary, documentTermMatrix)
 
     print('Corpus Preprocessed !\n')
     return doc_preprocessed
@@ -7,6 +7,7 @@
 # ------------------------- Based on the work of Iain McDonald ----------------------------
 # --------------------- e-mail: iain.mcdonald.2015@uni.strath.ac.uk -----------------------
 
+import itertools
 import time
 from sklearn.metrics import accuracy_score
 from gensim import models